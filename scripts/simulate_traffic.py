@@ -1,14 +1,12 @@
-import socket
-import time
-import urllib.request
-import urllib.parse
+import asyncio
 import random
-import sys
+
+import aiohttp
 
 def log(msg):
     print(f"[SIMULATOR] {msg}")
 
-def simulate_http():
+async def simulate_http(session):
     log("Simulating HTTP traffic...")
     base_url = "http://localhost:8080"
     endpoints = [
@@ -19,78 +17,90 @@ def simulate_http():
         "/config.php"
     ]
 
-    # GET requests
+    # GET requests share the session's keep-alive connection pool
     for endpoint in endpoints:
         try:
-            url = f"{base_url}{endpoint}"
-            with urllib.request.urlopen(url) as response:
-                pass
+            async with session.get(f"{base_url}{endpoint}") as response:
+                await response.read()
         except Exception:
             pass
 
     # POST request (Credential harvesting)
     try:
-        data = urllib.parse.urlencode({
+        data = {
             'log': f'admin_{random.randint(1, 100)}',
             'pwd': 'password123',
             'wp-submit': 'Log In'
-        }).encode()
-        req = urllib.request.Request(f"{base_url}/wp-login.php", data=data)
-        with urllib.request.urlopen(req) as response:
-            pass
+        }
+        async with session.post(
+            f"{base_url}/wp-login.php", data=data
+        ) as response:
+            await response.read()
         log("  -> Sent HTTP POST login attempt")
     except Exception as e:
         log(f"  -> HTTP POST failed: {e}")
 
-def simulate_ssh():
+async def simulate_ssh():
     log("Simulating SSH traffic...")
     try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.settimeout(2)
-        s.connect(('localhost', 2222))
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection('localhost', 2222), timeout=2
+        )
         # Receive banner
-        s.recv(1024)
+        await asyncio.wait_for(reader.read(1024), timeout=2)
         # Send fake version string
-        s.send(b"SSH-2.0-OpenSSH_8.2p1 Ubuntu-4ubuntu0.5\r\n")
-        time.sleep(0.5)
-        s.close()
+        writer.write(b"SSH-2.0-OpenSSH_8.2p1 Ubuntu-4ubuntu0.5\r\n")
+        await writer.drain()
+        await asyncio.sleep(0.5)
+        writer.close()
+        await writer.wait_closed()
         log("  -> Sent SSH connection attempt")
     except Exception as e:
         log(f"  -> SSH failed: {e}")
 
-def simulate_ftp():
+async def simulate_ftp():
     log("Simulating FTP traffic...")
     try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.settimeout(2)
-        s.connect(('localhost', 2121))
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection('localhost', 2121), timeout=2
+        )
         # Receive banner
-        s.recv(1024)
+        await asyncio.wait_for(reader.read(1024), timeout=2)
         # Send USER
-        s.send(b"USER anonymous\r\n")
-        s.recv(1024)
+        writer.write(b"USER anonymous\r\n")
+        await writer.drain()
+        await asyncio.wait_for(reader.read(1024), timeout=2)
         # Send PASS
-        s.send(b"PASS test@test.com\r\n")
-        s.recv(1024)
-        s.close()
+        writer.write(b"PASS test@test.com\r\n")
+        await writer.drain()
+        await asyncio.wait_for(reader.read(1024), timeout=2)
+        writer.close()
+        await writer.wait_closed()
         log("  -> Sent FTP login attempt")
     except Exception as e:
         log(f"  -> FTP failed: {e}")
 
-def main():
-    print("🚀 Starting Traffic Simulator for TenebriNET")
-    print("Press Ctrl+C to stop")
-
-    try:
+async def run():
+    timeout = aiohttp.ClientTimeout(total=2)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
         while True:
-            simulate_http()
-            simulate_ssh()
-            simulate_ftp()
+            # The three services are independent, so drive them concurrently
+            await asyncio.gather(
+                simulate_http(session),
+                simulate_ssh(),
+                simulate_ftp(),
+            )
 
             sleep_time = random.uniform(2, 5)
             log(f"Sleeping for {sleep_time:.1f}s...")
-            time.sleep(sleep_time)
+            await asyncio.sleep(sleep_time)
+
+def main():
+    print("🚀 Starting Traffic Simulator for TenebriNET")
+    print("Press Ctrl+C to stop")
 
+    try:
+        asyncio.run(run())
     except KeyboardInterrupt:
         print("\n👋 Simulation stopped")
 
@@ -27,36 +27,41 @@ async def train():
 
     logger.info("ml_training_started")
 
-    # Fetch data
-    async with AsyncSessionLocal() as session:
-        result = await session.execute(
-            select(Attack).where(Attack.threat_type.is_not(None))
+    # Stream only the labelled columns the feature extractor needs,
+    # skipping ORM entity construction and the identity map.
+    stmt = (
+        select(
+            Attack.service,
+            Attack.timestamp,
+            Attack.payload,
+            Attack.threat_type,
         )
-        attacks = result.scalars().all()
+        .where(Attack.threat_type.is_not(None))
+        .execution_options(yield_per=10_000)
+    )
 
-    if not attacks:
+    X = []
+    y = []
+
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(stmt)
+        async for service, timestamp, payload, threat_type in result:
+            X.append({
+                "service": str(service),
+                "timestamp": timestamp,
+                "payload": payload,
+            })
+            # Ensure threat_type is a string
+            y.append(str(threat_type))
+
+    if not X:
         logger.error(
             "ml_training_no_data",
             msg="No labeled attacks found in database"
         )
         return
 
-    logger.info("ml_data_loaded", count=len(attacks))
-
-    # Prepare data
-    X = []
-    y = []
-
-    for attack in attacks:
-        # Convert model to dict-like structure expected by extractor
-        attack_dict = {
-            "service": str(attack.service),
-            "timestamp": attack.timestamp,
-            "payload": attack.payload
-        }
-        X.append(attack_dict)
-        # Ensure threat_type is a string
-        y.append(str(attack.threat_type))
+    logger.info("ml_data_loaded", count=len(X))
 
     # Train model
     classifier = ThreatClassifier(model_path=config.ml.model_path)
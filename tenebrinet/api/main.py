@@ -4,20 +4,45 @@ FastAPI application for TenebriNET REST API.
 
 Provides REST endpoints for accessing honeypot data and managing services.
 """
+import hashlib
+import os
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional, Tuple
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-import os
+from fastapi import FastAPI, Request, Response
 
 from tenebrinet import __version__
+from tenebrinet.api.middleware import WildcardCORSMiddleware
+from tenebrinet.api.responses import ORJSONResponse
 from tenebrinet.api.routes import attacks, health
+from tenebrinet.api.staticfiles import CachedStaticFiles
 from tenebrinet.core.database import init_db
 from tenebrinet.core.logger import configure_logger
 
+# Dashboard locations, resolved once at import time
+DASHBOARD_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dashboard"
+)
+DASHBOARD_HTML_PATH = os.path.join(DASHBOARD_DIR, "index.html")
+DASHBOARD_STATIC_DIR = os.path.join(DASHBOARD_DIR, "static")
+
+# (body, quoted ETag) of the dashboard page, loaded once per process
+_index_page: Optional[Tuple[bytes, str]] = None
+
+
+def _load_index_page() -> Tuple[bytes, str]:
+    """
+    Read the dashboard page into memory and compute its ETag.
+
+    Returns:
+        Tuple of the page bytes and its quoted ETag.
+    """
+    global _index_page
+    with open(DASHBOARD_HTML_PATH, "rb") as f:
+        body = f.read()
+    _index_page = (body, f'"{hashlib.md5(body).hexdigest()}"')
+    return _index_page
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
@@ -29,6 +54,7 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # Startup
     configure_logger(log_level="INFO", log_format="json")
     await init_db()
+    _load_index_page()
     yield
     # Shutdown
     pass
@@ -52,27 +78,23 @@ def create_app() -> FastAPI:
         docs_url="/docs",
         redoc_url="/redoc",
         openapi_url="/openapi.json",
+        default_response_class=ORJSONResponse,
         lifespan=lifespan,
     )
 
-    # Configure CORS
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=["*"],  # Configure appropriately in production
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
-    )
+    # Configure CORS (allows every origin; restrict in production)
+    app.add_middleware(WildcardCORSMiddleware)
 
     # Register routers
     app.include_router(health.router)
     app.include_router(attacks.router, prefix="/api/v1")
 
     # Mount static files
-    static_path = os.path.join(
-        os.path.dirname(os.path.dirname(__file__)), "dashboard", "static"
+    app.mount(
+        "/static",
+        CachedStaticFiles(directory=DASHBOARD_STATIC_DIR, check_dir=False),
+        name="static",
     )
-    app.mount("/static", StaticFiles(directory=static_path), name="static")
 
     return app
 
@@ -82,15 +104,14 @@ app = create_app()
 
 
 @app.get("/", tags=["root"])
-async def root() -> FileResponse:
+async def root(request: Request) -> Response:
     """
     Root endpoint.
 
-    Serves the dashboard.
+    Serves the dashboard from memory, honouring If-None-Match.
     """
-    dashboard_path = os.path.join(
-        os.path.dirname(os.path.dirname(__file__)),
-        "dashboard",
-        "index.html"
-    )
-    return FileResponse(dashboard_path)
+    body, etag = _index_page or _load_index_page()
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=60"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="text/html", headers=headers)
@@ -0,0 +1,96 @@
+# tenebrinet/api/middleware.py
+"""
+ASGI middleware for the TenebriNET API.
+
+Provides a wildcard CORS middleware whose response headers are built once
+at construction instead of being recomputed for every request.
+"""
+from typing import List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+Header = Tuple[bytes, bytes]
+
+
+class WildcardCORSMiddleware:
+    """
+    CORS middleware for an allow-everything policy.
+
+    Behaves like Starlette's ``CORSMiddleware`` configured with
+    ``allow_origins=["*"]``, ``allow_methods=["*"]``, ``allow_headers=["*"]``
+    and ``allow_credentials=True``, but skips the per-request origin,
+    method and header matching that such a policy never needs. The
+    request origin is still echoed back, since browsers reject ``*``
+    for credentialed requests.
+    """
+
+    def __init__(self, app: ASGIApp, max_age: int = 600) -> None:
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application.
+            max_age: Seconds browsers may cache a preflight response.
+        """
+        self.app = app
+        self._simple_headers: List[Header] = [
+            (b"access-control-allow-credentials", b"true"),
+            (b"vary", b"Origin"),
+        ]
+        self._preflight_headers: List[Header] = [
+            (b"access-control-allow-methods",
+             b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"),
+            (b"access-control-max-age", str(max_age).encode()),
+            (b"access-control-allow-credentials", b"true"),
+            (b"vary", b"Origin"),
+            (b"content-type", b"text/plain; charset=utf-8"),
+            (b"content-length", b"2"),
+        ]
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin: Optional[bytes] = None
+        request_method: Optional[bytes] = None
+        request_headers: Optional[bytes] = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            headers = [(b"access-control-allow-origin", origin)]
+            headers.extend(self._preflight_headers)
+            if request_headers is not None:
+                headers.append(
+                    (b"access-control-allow-headers", request_headers)
+                )
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": headers,
+            })
+            await send({"type": "http.response.body", "body": b"OK"})
+            return
+
+        extra = [(b"access-control-allow-origin", origin)]
+        extra.extend(self._simple_headers)
+
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", ())) + extra
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
@@ -0,0 +1,41 @@
+# tenebrinet/api/responses.py
+"""
+Custom response classes for the TenebriNET API.
+
+Provides JSON responses that skip ``jsonable_encoder``: an orjson-backed
+response for plain data and one that serializes Pydantic models directly
+in pydantic-core.
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        """Serialize the response content to JSON bytes."""
+        return orjson.dumps(
+            content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        )
+
+
+class PydanticResponse(JSONResponse):
+    """
+    JSON response for an already-validated Pydantic model.
+
+    The model is serialized straight to bytes by pydantic-core, so the
+    route returning it bypasses both ``jsonable_encoder`` and FastAPI's
+    re-validation against ``response_model``.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        """Serialize the model (or any supported value) to JSON bytes."""
+        return to_json(content)
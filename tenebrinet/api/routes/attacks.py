@@ -4,22 +4,35 @@ Attack API endpoints.
 
 Provides REST endpoints for querying and managing attack records.
 """
+import base64
+import time
 from datetime import datetime, timezone
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func, select
+from sqlalchemy import (
+    bindparam,
+    delete,
+    exists,
+    func,
+    literal,
+    null,
+    select,
+    tuple_,
+    union_all,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import CompoundSelect, Select
 
+from tenebrinet.api.responses import ORJSONResponse, PydanticResponse
 from tenebrinet.api.schemas import (
     AttackListResponse,
     AttackResponse,
     AttackStats,
     CredentialListResponse,
-    CredentialResponse,
     SessionListResponse,
-    SessionResponse,
 )
 from tenebrinet.core.database import get_db_session
 from tenebrinet.core.models import Attack, Credential, Session
@@ -27,11 +40,20 @@ from tenebrinet.core.models import Attack, Credential, Session
 
 router = APIRouter(prefix="/attacks", tags=["attacks"])
 
+# Seconds a computed stats payload is reused in-process and by clients
+STATS_CACHE_TTL = 15
+
+# In-process stats cache: key -> (monotonic expiry, stats payload)
+_stats_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
 
 @router.get("", response_model=AttackListResponse)
 async def list_attacks(
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(
+        None, description="Keyset cursor from a previous page's next_cursor"
+    ),
     service: Optional[str] = Query(None, description="Filter by service"),
     threat_type: Optional[str] = Query(
         None, description="Filter by threat type"
@@ -43,147 +65,284 @@ async def list_attacks(
     ),
     end_date: Optional[datetime] = Query(None, description="Filter to date"),
     db: AsyncSession = Depends(get_db_session),
-) -> AttackListResponse:
+) -> ORJSONResponse:
     """
     List all attacks with optional filtering and pagination.
 
-    Returns a paginated list of attack records.
+    Returns a paginated list of attack records. Rows are fetched as
+    plain mappings and serialized by orjson without building response
+    models.
+
+    Passing ``cursor`` switches to keyset pagination: the page starts
+    right after the cursor row and the total count is skipped.
     """
-    # Build query
-    query = select(Attack)
-
-    # Apply filters
-    if service:
-        query = query.where(Attack.service == service)
-    if threat_type:
-        query = query.where(Attack.threat_type == threat_type)
-    if ip:
-        query = query.where(Attack.ip == ip)
-    if country:
-        query = query.where(Attack.country == country)
-    if start_date:
-        query = query.where(Attack.timestamp >= start_date)
-    if end_date:
-        query = query.where(Attack.timestamp <= end_date)
-
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-
-    # Apply pagination
-    offset = (page - 1) * per_page
-    query = query.order_by(Attack.timestamp.desc())
-    query = query.offset(offset).limit(per_page)
+    # Only the set filters take part; their names pick the cached statement
+    values: Dict[str, Any] = {
+        name: value
+        for name, value in (
+            ("service", service),
+            ("threat_type", threat_type),
+            ("ip", ip),
+            ("country", country),
+            ("start_date", start_date),
+            ("end_date", end_date),
+        )
+        if value
+    }
+    filter_names = tuple(values)
+    values["limit"] = per_page
+
+    total: Optional[int] = None
+    pages: Optional[int] = None
+    if cursor:
+        # Keyset pagination: seek past the cursor row
+        values["cursor_ts"], values["cursor_id"] = _decode_cursor(cursor)
+    else:
+        # Get total count (same WHERE clause, no subquery)
+        total_result = await db.execute(
+            _count_statement(filter_names), values
+        )
+        total = total_result.scalar() or 0
+        pages = (total + per_page - 1) // per_page if total > 0 else 0
+        values["offset"] = (page - 1) * per_page
+
+    query = _list_statement(filter_names, bool(cursor))
 
     # Execute query
-    result = await db.execute(query)
-    attacks = result.scalars().all()
+    result = await db.execute(query, values)
+    items = [dict(row) for row in result.mappings()]
+
+    next_cursor = None
+    if len(items) == per_page:
+        last = items[-1]
+        next_cursor = _encode_cursor(last["timestamp"], last["id"])
+
+    return ORJSONResponse(
+        content={
+            "items": items,
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "pages": pages,
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+def _encode_cursor(timestamp: datetime, attack_id: UUID) -> str:
+    """
+    Build the opaque keyset cursor for a row.
+
+    The ``<timestamp>,<attack id>`` pair is URL-safe base64 encoded, so
+    a ``+`` in the UTC offset survives being put in a URL unescaped.
+
+    Args:
+        timestamp: Timestamp of the last row on the page.
+        attack_id: ID of the last row on the page.
+
+    Returns:
+        Cursor string for the next page.
+    """
+    raw = f"{timestamp.isoformat()},{attack_id}".encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Parse a keyset cursor built by :func:`_encode_cursor`.
 
-    # Calculate total pages
-    pages = (total + per_page - 1) // per_page if total > 0 else 0
+    Args:
+        cursor: Cursor string from a previous page's ``next_cursor``.
 
-    return AttackListResponse(
-        items=[AttackResponse.model_validate(a) for a in attacks],
-        total=total,
-        page=page,
-        per_page=per_page,
-        pages=pages,
+    Returns:
+        Tuple of (timestamp, attack ID).
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, attack_id = raw.decode().rsplit(",", 1)
+        return datetime.fromisoformat(timestamp), UUID(attack_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# Filter clauses by query parameter name, bound by name at execution
+_LIST_FILTERS = {
+    "service": Attack.service == bindparam("service"),
+    "threat_type": Attack.threat_type == bindparam("threat_type"),
+    "ip": Attack.ip == bindparam("ip"),
+    "country": Attack.country == bindparam("country"),
+    "start_date": Attack.timestamp >= bindparam("start_date"),
+    "end_date": Attack.timestamp <= bindparam("end_date"),
+}
+
+
+@lru_cache(maxsize=128)
+def _list_statement(filter_names: Tuple[str, ...], keyset: bool) -> Select:
+    """
+    Build the attack page query for a combination of filters.
+
+    Statements are cached per filter combination and take every value,
+    including the limit and offset or cursor, as bound parameters.
+
+    Args:
+        filter_names: Names of the filters in use, in declaration order.
+        keyset: Whether to seek past a cursor instead of using an offset.
+
+    Returns:
+        The page query.
+    """
+    query = (
+        select(Attack.__table__)
+        .where(*(_LIST_FILTERS[name] for name in filter_names))
+        .order_by(Attack.timestamp.desc(), Attack.id.desc())
+        .limit(bindparam("limit"))
+    )
+    if keyset:
+        return query.where(
+            tuple_(Attack.timestamp, Attack.id)
+            < tuple_(
+                bindparam("cursor_ts", type_=Attack.timestamp.type),
+                bindparam("cursor_id", type_=Attack.id.type),
+            )
+        )
+    return query.offset(bindparam("offset"))
+
+
+@lru_cache(maxsize=128)
+def _count_statement(filter_names: Tuple[str, ...]) -> Select:
+    """
+    Build the attack count query for a combination of filters.
+
+    Args:
+        filter_names: Names of the filters in use, in declaration order.
+
+    Returns:
+        The count query.
+    """
+    return select(func.count(Attack.id)).where(
+        *(_LIST_FILTERS[name] for name in filter_names)
     )
 
 
 @router.get("/stats", response_model=AttackStats)
 async def get_attack_stats(
     db: AsyncSession = Depends(get_db_session),
-) -> AttackStats:
+) -> ORJSONResponse:
     """
     Get attack statistics.
 
     Returns aggregated statistics about attacks.
-    Stats are cached for 30 seconds to reduce database load.
+    Stats are cached in-process for 15 seconds and in Redis for 30
+    seconds to reduce database load. The payload is a plain dict
+    serialized by orjson; ``AttackStats`` only documents its shape.
     """
     from tenebrinet.core.cache import cache
 
-    # Try to get from cache first
+    headers = {"Cache-Control": f"public, max-age={STATS_CACHE_TTL}"}
     cache_key = "stats:attacks"
+
+    # Try the in-process cache first, then Redis
+    now = time.monotonic()
+    local = _stats_cache.get(cache_key)
+    if local and local[0] > now:
+        return ORJSONResponse(local[1], headers=headers)
+
     cached_stats = await cache.get(cache_key)
     if cached_stats:
-        return AttackStats(**cached_stats)
+        _stats_cache[cache_key] = (now + STATS_CACHE_TTL, cached_stats)
+        return ORJSONResponse(cached_stats, headers=headers)
 
-    # Total attacks
-    total_result = await db.execute(select(func.count(Attack.id)))
-    total_attacks = total_result.scalar() or 0
-
-    # Attacks today
+    # All aggregates in a single round-trip
     today_start = datetime.now(timezone.utc).replace(
         hour=0, minute=0, second=0, microsecond=0
     )
-    today_result = await db.execute(
-        select(func.count(Attack.id)).where(Attack.timestamp >= today_start)
-    )
-    attacks_today = today_result.scalar() or 0
+    result = await db.execute(_build_stats_query(today_start))
+
+    totals = {"total": 0, "today": 0, "unique_ips": 0}
+    top_countries = []
+    attacks_by_service = {}
+    attacks_by_threat_type = {}
+    for kind, key, count in result.all():
+        if kind in totals:
+            totals[kind] = count or 0
+        elif kind == "country":
+            top_countries.append({"country": key, "count": count})
+        elif kind == "service":
+            attacks_by_service[key] = count
+        else:
+            attacks_by_threat_type[key] = count
+
+    # UNION ALL does not preserve the per-member ORDER BY
+    top_countries.sort(key=lambda row: row["count"], reverse=True)
+
+    stats = {
+        "total_attacks": totals["total"],
+        "attacks_today": totals["today"],
+        "unique_ips": totals["unique_ips"],
+        "top_countries": top_countries,
+        "attacks_by_service": attacks_by_service,
+        "attacks_by_threat_type": attacks_by_threat_type,
+    }
 
-    # Unique IPs
-    unique_ips_result = await db.execute(
-        select(func.count(func.distinct(Attack.ip)))
-    )
-    unique_ips = unique_ips_result.scalar() or 0
+    # Cache the result locally and in Redis (30 seconds)
+    _stats_cache[cache_key] = (now + STATS_CACHE_TTL, stats)
+    await cache.set(cache_key, stats, ttl=30)
 
-    # Top countries
-    top_countries_query = (
-        select(Attack.country, func.count(Attack.id).label("count"))
+    return ORJSONResponse(stats, headers=headers)
+
+
+def _build_stats_query(today_start: datetime) -> CompoundSelect:
+    """
+    Build the attack statistics query.
+
+    Combines every aggregate into one UNION ALL statement whose rows are
+    tagged ``(kind, key, count)`` so the endpoint needs one round-trip.
+
+    Args:
+        today_start: Start of the current UTC day.
+
+    Returns:
+        The combined statistics query.
+    """
+    # Rows stand for ``count`` identical requests each
+    count = func.sum(Attack.count)
+    top_countries = (
+        select(Attack.country.label("key"), count.label("count"))
         .where(Attack.country.isnot(None))
         .group_by(Attack.country)
-        .order_by(func.count(Attack.id).desc())
+        .order_by(count.desc())
         .limit(10)
+        .subquery()
     )
-    top_countries_result = await db.execute(top_countries_query)
-    top_countries = [
-        {"country": row[0], "count": row[1]}
-        for row in top_countries_result.all()
-    ]
-
-    # Attacks by service
-    by_service_query = (
-        select(Attack.service, func.count(Attack.id).label("count"))
-        .group_by(Attack.service)
-    )
-    by_service_result = await db.execute(by_service_query)
-    attacks_by_service = {
-        row[0]: row[1] for row in by_service_result.all()
-    }
 
-    # Attacks by threat type
-    by_threat_query = (
-        select(Attack.threat_type, func.count(Attack.id).label("count"))
+    return union_all(
+        select(literal("total"), null(), count),
+        select(literal("today"), null(), count).where(
+            Attack.timestamp >= today_start
+        ),
+        select(
+            literal("unique_ips"), null(), func.count(func.distinct(Attack.ip))
+        ),
+        select(
+            literal("country"), top_countries.c.key, top_countries.c.count
+        ),
+        select(literal("service"), Attack.service, count).group_by(
+            Attack.service
+        ),
+        select(literal("threat_type"), Attack.threat_type, count)
         .where(Attack.threat_type.isnot(None))
-        .group_by(Attack.threat_type)
+        .group_by(Attack.threat_type),
     )
-    by_threat_result = await db.execute(by_threat_query)
-    attacks_by_threat_type = {
-        row[0]: row[1] for row in by_threat_result.all()
-    }
-
-    stats = AttackStats(
-        total_attacks=total_attacks,
-        attacks_today=attacks_today,
-        unique_ips=unique_ips,
-        top_countries=top_countries,
-        attacks_by_service=attacks_by_service,
-        attacks_by_threat_type=attacks_by_threat_type,
-    )
-
-    # Cache the result for 30 seconds
-    await cache.set(cache_key, stats.model_dump(), ttl=30)
-
-    return stats
 
 
 @router.get("/{attack_id}", response_model=AttackResponse)
 async def get_attack(
     attack_id: UUID,
     db: AsyncSession = Depends(get_db_session),
-) -> AttackResponse:
+) -> PydanticResponse:
     """
     Get a specific attack by ID.
 
@@ -193,59 +352,51 @@ async def get_attack(
     if not attack:
         raise HTTPException(status_code=404, detail="Attack not found")
 
-    return AttackResponse.model_validate(attack)
+    return PydanticResponse(AttackResponse.model_validate(attack))
 
 
 @router.get("/{attack_id}/credentials", response_model=CredentialListResponse)
 async def get_attack_credentials(
     attack_id: UUID,
     db: AsyncSession = Depends(get_db_session),
-) -> CredentialListResponse:
+) -> ORJSONResponse:
     """
     Get credentials associated with an attack.
 
-    Returns all credential attempts from a specific attack.
+    Returns all credential attempts from a specific attack, serialized
+    from plain row mappings.
     """
-    # Verify attack exists
-    attack = await db.get(Attack, attack_id)
-    if not attack:
-        raise HTTPException(status_code=404, detail="Attack not found")
-
-    # Get credentials
-    query = select(Credential).where(Credential.attack_id == attack_id)
+    # Get credentials; only an empty result needs the existence check
+    query = select(Credential.__table__).where(
+        Credential.attack_id == attack_id
+    )
     result = await db.execute(query)
-    credentials = result.scalars().all()
+    items = [dict(row) for row in result.mappings()]
+    if not items:
+        await _ensure_attack_exists(db, attack_id)
 
-    return CredentialListResponse(
-        items=[CredentialResponse.model_validate(c) for c in credentials],
-        total=len(credentials),
-    )
+    return ORJSONResponse(content={"items": items, "total": len(items)})
 
 
 @router.get("/{attack_id}/sessions", response_model=SessionListResponse)
 async def get_attack_sessions(
     attack_id: UUID,
     db: AsyncSession = Depends(get_db_session),
-) -> SessionListResponse:
+) -> ORJSONResponse:
     """
     Get sessions associated with an attack.
 
-    Returns all sessions (shell interactions) from a specific attack.
+    Returns all sessions (shell interactions) from a specific attack,
+    serialized from plain row mappings.
     """
-    # Verify attack exists
-    attack = await db.get(Attack, attack_id)
-    if not attack:
-        raise HTTPException(status_code=404, detail="Attack not found")
-
-    # Get sessions
-    query = select(Session).where(Session.attack_id == attack_id)
+    # Get sessions; only an empty result needs the existence check
+    query = select(Session.__table__).where(Session.attack_id == attack_id)
     result = await db.execute(query)
-    sessions = result.scalars().all()
+    items = [dict(row) for row in result.mappings()]
+    if not items:
+        await _ensure_attack_exists(db, attack_id)
 
-    return SessionListResponse(
-        items=[SessionResponse.model_validate(s) for s in sessions],
-        total=len(sessions),
-    )
+    return ORJSONResponse(content={"items": items, "total": len(items)})
 
 
 @router.delete("/{attack_id}", status_code=204)
@@ -258,9 +409,29 @@ async def delete_attack(
 
     Removes the attack, its credentials, and sessions.
     """
-    attack = await db.get(Attack, attack_id)
-    if not attack:
+    await db.execute(
+        delete(Credential).where(Credential.attack_id == attack_id)
+    )
+    await db.execute(delete(Session).where(Session.attack_id == attack_id))
+    result = await db.execute(delete(Attack).where(Attack.id == attack_id))
+    if not result.rowcount:
+        await db.rollback()
         raise HTTPException(status_code=404, detail="Attack not found")
 
-    await db.delete(attack)
     await db.commit()
+
+
+async def _ensure_attack_exists(db: AsyncSession, attack_id: UUID) -> None:
+    """
+    Raise a 404 if no attack with the given ID exists.
+
+    Args:
+        db: Database session.
+        attack_id: Attack ID to check.
+
+    Raises:
+        HTTPException: If the attack does not exist.
+    """
+    found = await db.scalar(select(exists().where(Attack.id == attack_id)))
+    if not found:
+        raise HTTPException(status_code=404, detail="Attack not found")
@@ -4,7 +4,9 @@ Health check API endpoints.
 
 Provides endpoints for monitoring service health and status.
 """
+import time
 from datetime import datetime, timezone
+from typing import List
 
 from fastapi import APIRouter, Depends
 from sqlalchemy import text
@@ -17,6 +19,34 @@ from tenebrinet.core.database import get_db_session
 
 router = APIRouter(tags=["health"])
 
+# Resolution of the cached wall-clock timestamp, in seconds
+TIMESTAMP_RESOLUTION = 0.1
+# How long a successful database probe is trusted, in seconds
+DB_PROBE_TTL = 1.0
+
+# [monotonic time of refresh, cached UTC timestamp]
+_clock: List = [float("-inf"), None]
+# Monotonic time of the last successful database probe
+_last_db_ok: List[float] = [float("-inf")]
+
+
+def _now_cached() -> datetime:
+    """
+    Return the current UTC time, refreshed at most every 100 ms.
+
+    Probes are polled far more often than they need a fresh timestamp,
+    so one ``datetime`` is shared across calls within the resolution
+    window.
+
+    Returns:
+        Timezone-aware UTC timestamp.
+    """
+    now = time.monotonic()
+    if now - _clock[0] > TIMESTAMP_RESOLUTION:
+        _clock[0] = now
+        _clock[1] = datetime.now(timezone.utc)
+    return _clock[1]
+
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check(
@@ -28,12 +58,14 @@ async def health_check(
     Returns the overall health status of the application,
     including database connectivity and service status.
     """
-    # Check database connection
+    # Check database connection, reusing a recent successful probe
     db_status = "connected"
-    try:
-        await db.execute(text("SELECT 1"))
-    except Exception:
-        db_status = "disconnected"
+    if time.monotonic() - _last_db_ok[0] > DB_PROBE_TTL:
+        try:
+            await db.execute(text("SELECT 1"))
+            _last_db_ok[0] = time.monotonic()
+        except Exception:
+            db_status = "disconnected"
 
     # TODO: Get actual service status from service registry
     # For now, return placeholder values
@@ -64,7 +96,7 @@ async def health_check(
     return HealthResponse(
         status="healthy" if db_status == "connected" else "degraded",
         version=__version__,
-        timestamp=datetime.now(timezone.utc),
+        timestamp=_now_cached(),
         services=services,
         database=db_status,
     )
@@ -93,4 +125,4 @@ async def liveness_check() -> dict:
 
     Returns 200 if the application is alive.
     """
-    return {"status": "alive", "timestamp": datetime.now(timezone.utc)}
+    return {"status": "alive", "timestamp": _now_cached()}
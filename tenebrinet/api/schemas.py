@@ -5,10 +5,21 @@ Pydantic schemas for API request/response validation.
 Defines the data transfer objects used by the API endpoints.
 """
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field
+from pydantic.dataclasses import dataclass
+
+
+# Read-only DTOs built from ORM rows: immutable, unknown attributes ignored
+_RESPONSE_CONFIG = ConfigDict(
+    from_attributes=True, frozen=True, extra="ignore"
+)
+
+# Leaf DTOs that are only built and serialized: validated pydantic
+# dataclasses with __slots__ instead of a per-instance __dict__
+_leaf_dto = dataclass(slots=True, frozen=True)
 
 
 # --- Attack Schemas ---
@@ -34,27 +45,37 @@ class AttackBase(BaseModel):
 class AttackCreate(AttackBase):
     """Schema for creating a new attack record."""
 
-    payload: Optional[dict] = Field(None, description="Attack payload data")
+    payload: Optional[Dict[str, Any]] = Field(
+        None, description="Attack payload data"
+    )
 
 
 class AttackResponse(AttackBase):
     """Schema for attack response."""
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _RESPONSE_CONFIG
 
     id: UUID
     timestamp: datetime
-    payload: Optional[dict] = None
+    payload: Optional[Dict[str, Any]] = None
+    count: int = Field(1, description="Identical requests in this record")
 
 
 class AttackListResponse(BaseModel):
     """Paginated list of attacks."""
 
     items: List[AttackResponse]
-    total: int
+    total: Optional[int] = Field(
+        None, description="Total matches (omitted in cursor mode)"
+    )
     page: int
     per_page: int
-    pages: int
+    pages: Optional[int] = Field(
+        None, description="Total pages (omitted in cursor mode)"
+    )
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor for the next page, if there is one"
+    )
 
 
 # --- Credential Schemas ---
@@ -63,7 +84,7 @@ class AttackListResponse(BaseModel):
 class CredentialResponse(BaseModel):
     """Schema for credential response."""
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _RESPONSE_CONFIG
 
     id: UUID
     attack_id: UUID
@@ -82,16 +103,26 @@ class CredentialListResponse(BaseModel):
 # --- Session Schemas ---
 
 
+class CommandEntry(BaseModel):
+    """A command captured during a session."""
+
+    model_config = _RESPONSE_CONFIG
+
+    cmd: str
+    arg: Optional[str] = None
+    timestamp: Optional[datetime] = None
+
+
 class SessionResponse(BaseModel):
     """Schema for session response."""
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _RESPONSE_CONFIG
 
     id: UUID
     attack_id: UUID
     start_time: datetime
     end_time: Optional[datetime] = None
-    commands: Optional[List[dict]] = None
+    commands: Optional[List[CommandEntry]] = None
 
 
 class SessionListResponse(BaseModel):
@@ -104,18 +135,28 @@ class SessionListResponse(BaseModel):
 # --- Statistics Schemas ---
 
 
-class AttackStats(BaseModel):
+@_leaf_dto
+class CountryCount:
+    """Attack count for one source country."""
+
+    country: str
+    count: int
+
+
+@_leaf_dto
+class AttackStats:
     """Attack statistics."""
 
     total_attacks: int
     attacks_today: int
     unique_ips: int
-    top_countries: List[dict]
-    attacks_by_service: dict
-    attacks_by_threat_type: dict
+    top_countries: List[CountryCount]
+    attacks_by_service: Dict[str, int]
+    attacks_by_threat_type: Dict[str, int]
 
 
-class ServiceStatus(BaseModel):
+@_leaf_dto
+class ServiceStatus:
     """Status of a honeypot service."""
 
     service: str
@@ -143,6 +184,9 @@ class AttackQueryParams(BaseModel):
 
     page: int = Field(1, ge=1, description="Page number")
     per_page: int = Field(20, ge=1, le=100, description="Items per page")
+    cursor: Optional[str] = Field(
+        None, description="Keyset cursor from a previous page"
+    )
     service: Optional[str] = Field(None, description="Filter by service")
     threat_type: Optional[str] = Field(
         None, description="Filter by threat type"
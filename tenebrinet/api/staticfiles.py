@@ -0,0 +1,76 @@
+# tenebrinet/api/staticfiles.py
+"""
+Static file serving for the TenebriNET dashboard.
+
+Provides a StaticFiles variant that keeps small assets in memory so hot
+dashboard files are served without reopening them on every request.
+"""
+from typing import Dict, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+
+# Files larger than this are streamed from disk as usual
+MAX_CACHED_FILE_SIZE = 256 * 1024
+
+
+def _read_file(path: str) -> bytes:
+    """Read a whole file from disk."""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles that memoizes small file bodies.
+
+    Path resolution, ``stat()`` and conditional-request handling are
+    left to Starlette; only the open/read of plain GETs is replaced by a
+    memory copy. Entries are keyed by path and invalidated when the
+    file's mtime or size changes.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # path -> (mtime_ns, size, body)
+        self._bodies: Dict[str, Tuple[int, int, bytes]] = {}
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        """
+        Return the response for ``path``, from memory when possible.
+
+        Args:
+            path: Requested path relative to the mount point.
+            scope: ASGI connection scope.
+
+        Returns:
+            Response for the requested file.
+        """
+        response = await super().get_response(path, scope)
+        stat_result = getattr(response, "stat_result", None)
+        if (
+            not isinstance(response, FileResponse)
+            or stat_result is None
+            or response.status_code != 200
+            or stat_result.st_size > MAX_CACHED_FILE_SIZE
+            or scope["method"] != "GET"
+            or "range" in Headers(scope=scope)
+        ):
+            return response
+
+        full_path = str(response.path)
+        cached = self._bodies.get(full_path)
+        if (
+            cached is None
+            or cached[0] != stat_result.st_mtime_ns
+            or cached[1] != stat_result.st_size
+        ):
+            body = await run_in_threadpool(_read_file, full_path)
+            cached = (stat_result.st_mtime_ns, stat_result.st_size, body)
+            self._bodies[full_path] = cached
+
+        return Response(cached[2], headers=dict(response.headers))
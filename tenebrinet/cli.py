@@ -6,20 +6,44 @@ Provides CLI commands for starting the honeypot services, managing
 configuration, and monitoring system health.
 """
 import asyncio
-from typing import Any, List
+import signal
+from typing import Any, Dict, List
 
 import click
 import structlog
-import uvicorn
 
 from tenebrinet import __version__
 from tenebrinet.core.config import load_config
-from tenebrinet.core.database import init_db
 from tenebrinet.core.logger import configure_logger
 
 
 logger = structlog.get_logger()
 
+# Uvicorn server tuning shared by the API entry points. "auto" already
+# resolves to uvloop when uvicorn[standard] is installed; the HTTP parser
+# is pinned to httptools so a missing extra fails loudly instead of
+# silently falling back to the pure-Python h11.
+UVICORN_OPTIONS: Dict[str, Any] = {
+    "loop": "auto",
+    "http": "httptools",
+    "backlog": 2048,           # Pending connections queued by the kernel
+    "timeout_keep_alive": 30,  # Keep idle dashboard/probe connections open
+}
+
+
+def _install_uvloop() -> None:
+    """
+    Make asyncio.run() use uvloop when it is available.
+
+    uvloop ships with uvicorn[standard] on POSIX; on platforms without it
+    the default event loop is kept.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
 
 @click.group()
 @click.version_option(version=__version__, prog_name="TenebriNET")
@@ -74,6 +98,7 @@ def start(config: str, log_level: str) -> None:
         click.echo("🚀 Starting honeypot services...")
 
         # Run all services
+        _install_uvloop()
         asyncio.run(_run_services(cfg))
 
     except FileNotFoundError as e:
@@ -88,11 +113,13 @@ def start(config: str, log_level: str) -> None:
 
 async def _run_services(cfg) -> None:
     """Run all honeypot services."""
+    from tenebrinet.core.database import configure_database, init_db
     from tenebrinet.services.ftp import FTPHoneypot
     from tenebrinet.services.http import HTTPHoneypot
     from tenebrinet.services.ssh import SSHHoneypot
 
-    # Initialize database
+    # Initialize database with the configured pool settings
+    configure_database(cfg.database)
     await init_db()
     logger.info("database_initialized")
 
@@ -132,8 +159,8 @@ async def _run_services(cfg) -> None:
 
     try:
         # Keep running until interrupted
-        while True:
-            await asyncio.sleep(1)
+        await _wait_for_shutdown()
+        click.echo("\n👋 Shutting down...")
     except asyncio.CancelledError:
         pass
     finally:
@@ -142,6 +169,31 @@ async def _run_services(cfg) -> None:
             await service.stop()
 
 
+async def _wait_for_shutdown() -> None:
+    """
+    Block until SIGINT or SIGTERM is received.
+
+    Waits on an event set from signal handlers, so the loop stays idle
+    instead of waking on a timer. Where the loop cannot install signal
+    handlers (Windows), falls back to sleeping until cancelled by
+    KeyboardInterrupt.
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    try:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+    except NotImplementedError:
+        while True:
+            await asyncio.sleep(3600)
+
+    try:
+        await stop.wait()
+    finally:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(sig)
+
+
 @main.command()
 @click.option(
     "--config",
@@ -170,6 +222,10 @@ async def _run_services(cfg) -> None:
 )
 def api(config: str, host: str, port: int, reload: bool) -> None:
     """Start the TenebriNET REST API server."""
+    import uvicorn
+
+    from tenebrinet.core.database import configure_database
+
     try:
         cfg = load_config(config)
 
@@ -179,6 +235,9 @@ def api(config: str, host: str, port: int, reload: bool) -> None:
             log_output_path=cfg.logging.output,
         )
 
+        # Applies in-process; a --reload worker falls back to DATABASE_URL
+        configure_database(cfg.database)
+
         click.echo(f"🌐 TenebriNET API v{__version__}")
         click.echo(f"📁 Config: {config}")
         click.echo(f"🔗 Running at: http://{host}:{port}")
@@ -191,6 +250,7 @@ def api(config: str, host: str, port: int, reload: bool) -> None:
             port=port,
             reload=reload,
             log_level="info",
+            **UVICORN_OPTIONS,
         )
 
     except FileNotFoundError as e:
@@ -230,6 +290,7 @@ def run(config: str, api_port: int) -> None:
         click.echo(f"📁 Config: {config}")
         click.echo("")
 
+        _install_uvloop()
         asyncio.run(_run_combined(cfg, api_port))
 
     except FileNotFoundError as e:
@@ -246,11 +307,13 @@ async def _run_combined(cfg, api_port: int) -> None:
     """Run honeypot services and API together."""
     import uvicorn
 
+    from tenebrinet.core.database import configure_database, init_db
     from tenebrinet.services.ftp import FTPHoneypot
     from tenebrinet.services.http import HTTPHoneypot
     from tenebrinet.services.ssh import SSHHoneypot
 
-    # Initialize database
+    # Initialize database with the configured pool settings
+    configure_database(cfg.database)
     await init_db()
     logger.info("database_initialized")
 
@@ -293,6 +356,7 @@ async def _run_combined(cfg, api_port: int) -> None:
         host="0.0.0.0",
         port=api_port,
         log_level="warning",
+        **UVICORN_OPTIONS,
     )
     server = uvicorn.Server(config)
 
@@ -341,6 +405,8 @@ def validate(config: str) -> None:
 @main.command()
 def initdb() -> None:
     """Initialize the database schema."""
+    from tenebrinet.core.database import init_db
+
     click.echo("🗄️  Initializing database...")
     try:
         asyncio.run(init_db())
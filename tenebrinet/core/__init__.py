@@ -5,8 +5,9 @@ Core modules for TenebriNET.
 Includes configuration, logging, database, and models.
 """
 
+from typing import Any
+
 from tenebrinet.core.config import load_config, TenebriNetConfig
-from tenebrinet.core.database import get_db_session, init_db, Base
 from tenebrinet.core.logger import configure_logger
 
 __all__ = [
@@ -17,3 +18,17 @@ __all__ = [
     "Base",
     "configure_logger",
 ]
+
+
+# Database exports are resolved on first access so that importing the
+# package (e.g. for CLI commands that never touch the database) does not
+# pull in SQLAlchemy and create the engine.
+_DATABASE_EXPORTS = frozenset({"get_db_session", "init_db", "Base"})
+
+
+def __getattr__(name: str) -> Any:
+    if name in _DATABASE_EXPORTS:
+        from tenebrinet.core import database
+
+        return getattr(database, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -7,11 +7,17 @@ and validation using Pydantic models.
 """
 import os
 import re
-from typing import List, Literal, Optional
+from typing import Dict, List, Literal, Optional, Tuple
 
 import yaml
 from pydantic import BaseModel, Field
 
+try:
+    # libyaml-backed loader; same safety as SafeLoader, parsed in C
+    from yaml import CSafeLoader as YAMLLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as YAMLLoader  # type: ignore[assignment]
+
 
 class SSHServiceConfig(BaseModel):
     """SSH honeypot service configuration."""
@@ -22,6 +28,7 @@ class SSHServiceConfig(BaseModel):
     banner: str = "OpenSSH_8.2p1 Ubuntu-4ubuntu0.5"
     max_connections: int = 100
     timeout: int = 30
+    host_key_path: str = "data/keys/ssh_host_rsa_key"
 
 
 class HTTPServiceConfig(BaseModel):
@@ -41,6 +48,7 @@ class FTPServiceConfig(BaseModel):
     port: int = 2121
     host: str = "0.0.0.0"
     anonymous_allowed: bool = True
+    max_connections: int = 500
     timeout: int = 30
 
 
@@ -133,22 +141,36 @@ def substitute_env_vars(content: str) -> str:
         String with environment variables substituted.
     """
 
+    # Most configs have no placeholders; skip the regex entirely
+    if "${" not in content:
+        return content
+
+    env_get = os.environ.get
+
     def replace(match: re.Match) -> str:
-        var_name = match.group(1)
-        default_value = match.group(2)
-        return os.environ.get(
+        var_name, default_value = match.groups()
+        return env_get(
             var_name, default_value if default_value is not None else ""
         )
 
     return ENV_VAR_PATTERN.sub(replace, content)
 
 
+# Parsed configs keyed by (absolute path, mtime_ns, size); each entry keeps
+# the raw and env-substituted text so environment changes are detected.
+_config_cache: Dict[
+    Tuple[str, int, int], Tuple[str, str, TenebriNetConfig]
+] = {}
+
+
 def load_config(config_path: str = "config/honeypot.yml") -> TenebriNetConfig:
     """
     Load configuration from a YAML file.
 
     Loads the YAML file, substitutes environment variables,
-    and validates it against the Pydantic schema.
+    and validates it against the Pydantic schema. Results are cached per
+    file: while the file's mtime and size and the substituted environment
+    values are unchanged, the same config instance is returned.
 
     Args:
         config_path: Path to the YAML configuration file.
@@ -160,11 +182,20 @@ def load_config(config_path: str = "config/honeypot.yml") -> TenebriNetConfig:
         FileNotFoundError: If the configuration file doesn't exist.
         ValueError: If the YAML is invalid or fails validation.
     """
-    if not os.path.exists(config_path):
+    try:
+        stat = os.stat(config_path)
+    except OSError:
         raise FileNotFoundError(
             f"Configuration file not found at: {config_path}"
         )
 
+    cache_key = (os.path.abspath(config_path), stat.st_mtime_ns, stat.st_size)
+    cached = _config_cache.get(cache_key)
+    if cached is not None:
+        raw_content, processed_content, config = cached
+        if substitute_env_vars(raw_content) == processed_content:
+            return config
+
     with open(config_path, "r", encoding="utf-8") as f:
         raw_content = f.read()
 
@@ -173,13 +204,15 @@ def load_config(config_path: str = "config/honeypot.yml") -> TenebriNetConfig:
 
     # Parse YAML
     try:
-        config_dict = yaml.safe_load(processed_content)
+        config_dict = yaml.load(processed_content, Loader=YAMLLoader)
     except yaml.YAMLError as e:
         raise ValueError(f"Error parsing YAML configuration: {e}") from e
 
     # Validate with Pydantic
     try:
         config = TenebriNetConfig(**config_dict)
-        return config
     except Exception as e:
         raise ValueError(f"Invalid configuration: {e}") from e
+
+    _config_cache[cache_key] = (raw_content, processed_content, config)
+    return config
@@ -5,20 +5,147 @@ Structured logging configuration for TenebriNET.
 Provides a structured logging setup using structlog with support
 for JSON and console output formats, with rotating file handlers.
 """
+import atexit
 import logging
 import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Optional
 
+import orjson
 import structlog
 from structlog.stdlib import ProcessorFormatter
 
 
+# Background listener writing queued records; replaced on reconfiguration
+_listener: Optional[QueueListener] = None
+
+
+class _PassthroughQueueHandler(QueueHandler):
+    """
+    QueueHandler that enqueues records untouched.
+
+    The stock ``prepare()`` pre-formats the message into a string, which
+    would flatten the structlog event dict before ProcessorFormatter on
+    the listener side can render it.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        # The queue is thread-safe on its own, so skip the handler lock
+        # the stock handle() takes around every emit
+        rv = self.filter(record)
+        if rv:
+            self.emit(record)
+        return rv
+
+
+class _BufferedStreamHandler(logging.StreamHandler):
+    """
+    StreamHandler that writes without flushing each record.
+
+    Used behind the background listener, which flushes once a burst of
+    records has been written, so a flood costs a few large writes
+    instead of one syscall per line.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+
+class _BufferedRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that writes without flushing each record.
+
+    The stock handler stats the path, seeks to the end and formats every
+    record twice (once just to measure it) before writing and flushing.
+    This one counts the bytes it writes instead and, like
+    :class:`_BufferedStreamHandler`, leaves flushing to the listener.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # Only regular files are rotated (bpo-45401)
+        self._rotates = self.maxBytes > 0 and (
+            not os.path.exists(self.baseFilename)
+            or os.path.isfile(self.baseFilename)
+        )
+        self._size = self.stream.tell() if self.stream else 0
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        self._size = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            msg = self.format(record) + self.terminator
+            # maxBytes is in bytes; non-ASCII characters take several
+            size = len(msg) if msg.isascii() else len(
+                msg.encode(self.encoding or "utf-8", self.errors or "strict")
+            )
+            if self._rotates and self._size + size >= self.maxBytes:
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+                self._size = self.stream.tell()
+            self.stream.write(msg)
+            self._size += size
+        except Exception:
+            self.handleError(record)
+
+
+class _BatchingQueueListener(QueueListener):
+    """QueueListener that flushes its handlers when the queue runs dry."""
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            # End of a burst: push out what the handlers buffered
+            for handler in self.handlers:
+                handler.flush()
+            return self.queue.get(block)
+
+
+def stop_logger() -> None:
+    """
+    Stop the background log listener, flushing any queued records.
+
+    Safe to call when no listener is running.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.flush()
+            handler.close()
+        _listener = None
+
+
+atexit.register(stop_logger)
+
+
+def _orjson_dumps(event_dict: Any, **kwargs: Any) -> str:
+    """Serialize a log event with orjson for ``JSONRenderer``."""
+    return orjson.dumps(
+        event_dict,
+        default=kwargs.get("default"),
+        option=orjson.OPT_NON_STR_KEYS,
+    ).decode()
+
+
 def configure_logger(
     log_level: str = "INFO",
     log_format: str = "json",
     log_output_path: str = "data/logs/tenebrinet.log",
     log_rotation_mb: int = 100,
+    background: bool = True,
 ) -> None:
     """
     Configure the structlog-based logger for TenebriNET.
@@ -30,40 +157,54 @@ def configure_logger(
             "console" for dev.
         log_output_path: File path for log output.
         log_rotation_mb: Maximum size in MB before log rotation.
+        background: Write through a QueueListener thread so logging calls
+            only enqueue; when False, handlers write synchronously.
     """
     # Clear existing handlers to prevent duplicates during re-configuration
+    stop_logger()
     root_logger = logging.getLogger()
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
 
-    # Configure structlog processors for event dict enrichment
-    structlog.configure(
-        processors=[
-            structlog.stdlib.add_logger_name,
-            structlog.stdlib.add_log_level,
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.processors.StackInfoRenderer(),
+    # Configure structlog processors for event dict enrichment; events
+    # below the level are dropped before any of the others run
+    processors: list = [
+        structlog.stdlib.filter_by_level,
+        structlog.stdlib.add_logger_name,
+        structlog.stdlib.add_log_level,
+        structlog.processors.TimeStamper(fmt="iso"),
+        structlog.processors.StackInfoRenderer(),
+    ]
+    # Call-site lookup walks the stack on every event, so only pay for it
+    # when debugging
+    if log_level.upper() == "DEBUG":
+        processors.append(
             structlog.processors.CallsiteParameterAdder(
                 {
                     structlog.processors.CallsiteParameter.FILENAME,
                     structlog.processors.CallsiteParameter.LINENO,
                     structlog.processors.CallsiteParameter.FUNC_NAME,
-                    structlog.processors.CallsiteParameter.PROCESS,
-                    structlog.processors.CallsiteParameter.THREAD,
-                    structlog.processors.CallsiteParameter.THREAD_NAME,
                 }
-            ),
-            ProcessorFormatter.wrap_for_formatter,
-        ],
+            )
+        )
+    processors.append(ProcessorFormatter.wrap_for_formatter)
+
+    structlog.configure(
+        processors=processors,
         logger_factory=structlog.stdlib.LoggerFactory(),
         wrapper_class=structlog.stdlib.BoundLogger,
         cache_logger_on_first_use=True,
     )
 
-    # Select final rendering processor based on format
-    final_rendering_processors: list = []
+    # Select final rendering processor based on format; the formatter's
+    # bookkeeping keys (the whole LogRecord repr) are dropped first
+    final_rendering_processors: list = [
+        ProcessorFormatter.remove_processors_meta,
+    ]
     if log_format == "json":
-        final_rendering_processors.append(structlog.processors.JSONRenderer())
+        final_rendering_processors.append(
+            structlog.processors.JSONRenderer(serializer=_orjson_dumps)
+        )
     else:
         final_rendering_processors.append(structlog.dev.ConsoleRenderer())
 
@@ -78,8 +219,12 @@ def configure_logger(
     if log_dir and not os.path.exists(log_dir):
         os.makedirs(log_dir, exist_ok=True)
 
-    # File handler with rotation
-    file_handler = RotatingFileHandler(
+    # File handler with rotation; in background mode the handlers buffer
+    # and the listener flushes them between bursts
+    file_handler_class = (
+        _BufferedRotatingFileHandler if background else RotatingFileHandler
+    )
+    file_handler = file_handler_class(
         log_output_path,
         maxBytes=log_rotation_mb * 1024 * 1024,
         backupCount=5,
@@ -88,12 +233,30 @@ def configure_logger(
     file_handler.setFormatter(formatter)
 
     # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler_class = (
+        _BufferedStreamHandler if background else logging.StreamHandler
+    )
+    console_handler = console_handler_class(sys.stdout)
     console_handler.setFormatter(formatter)
 
-    # Configure root logger
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    # Configure root logger; in background mode callers only enqueue and
+    # a listener thread owns the file and console I/O
+    if background:
+        global _listener
+        # SimpleQueue.put never blocks and takes no Python-level lock,
+        # unlike Queue's mutex and condition variables
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        root_logger.addHandler(_PassthroughQueueHandler(log_queue))
+        _listener = _BatchingQueueListener(
+            log_queue,
+            file_handler,
+            console_handler,
+            respect_handler_level=True,
+        )
+        _listener.start()
+    else:
+        root_logger.addHandler(file_handler)
+        root_logger.addHandler(console_handler)
     root_logger.setLevel(log_level.upper())
 
     # Suppress noise from third-party libraries
@@ -15,9 +15,11 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     JSON,
     String,
+    func,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -45,13 +47,41 @@ class Attack(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     ip = Column(String(45), nullable=False, index=True)
-    timestamp = Column(DateTime(timezone=True), default=_utc_now, index=True)
+    # Python default as well, for tables created before server_default
+    timestamp = Column(
+        DateTime(timezone=True),
+        default=_utc_now,
+        server_default=func.now(),
+        index=True,
+    )
     service = Column(String(50), nullable=False)
     payload = Column(JSON)
     threat_type = Column(String(50))
     confidence = Column(Float)
     country = Column(String(2))
     asn = Column(Integer)
+    # Identical requests the batch writer merged into this row
+    count = Column(Integer, nullable=False, default=1, server_default="1")
+
+    # Indexes backing the attack list filters and stats aggregates;
+    # the timestamp and ip indexes come from their column definitions.
+    # Composites lead with the equality filter and end in timestamp so a
+    # filtered "ORDER BY timestamp DESC LIMIT n" walks the index in order.
+    __table_args__ = (
+        Index("ix_attacks_service_ts", service, timestamp),
+        Index("ix_attacks_ip_ts", ip, timestamp),
+        Index(
+            "ix_attacks_threat_type",
+            threat_type,
+            postgresql_where=threat_type.isnot(None),
+        ),
+        Index(
+            "ix_attacks_country_ts",
+            country,
+            timestamp,
+            postgresql_where=country.isnot(None),
+        ),
+    )
 
     # Relationships
     sessions = relationship("Session", back_populates="attack")
@@ -74,8 +104,12 @@ class Session(Base):
     __tablename__ = "sessions"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    attack_id = Column(UUID(as_uuid=True), ForeignKey("attacks.id"))
-    start_time = Column(DateTime(timezone=True), default=_utc_now)
+    attack_id = Column(
+        UUID(as_uuid=True), ForeignKey("attacks.id"), index=True
+    )
+    start_time = Column(
+        DateTime(timezone=True), default=_utc_now, server_default=func.now()
+    )
     end_time = Column(DateTime(timezone=True))
     commands = Column(JSON)
 
@@ -99,7 +133,9 @@ class Credential(Base):
     __tablename__ = "credentials"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    attack_id = Column(UUID(as_uuid=True), ForeignKey("attacks.id"))
+    attack_id = Column(
+        UUID(as_uuid=True), ForeignKey("attacks.id"), index=True
+    )
     username = Column(String(255), nullable=False)
     password = Column(String(255), nullable=False)
     success = Column(Boolean, default=False)
@@ -0,0 +1,422 @@
+# tenebrinet/core/recorder.py
+"""
+Batched persistence of attack records.
+
+Provides Core bulk-insert helpers and a background writer that buffers
+rows from the honeypot services and flushes them in batches, so bursts of
+attacks cost one transaction per batch instead of one per row.
+"""
+import asyncio
+from functools import lru_cache
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import String, Table, bindparam
+from sqlalchemy.engine import Dialect
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from tenebrinet.core.database import AsyncSessionLocal, Base
+from tenebrinet.core.models import Attack
+
+
+logger = structlog.get_logger()
+
+
+# Row count from which asyncpg batches use COPY instead of executemany
+COPY_THRESHOLD = 100
+
+
+def copy_records(
+    table: Table, rows: List[Dict[str, Any]], dialect: Dialect
+) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+    """
+    Convert row mappings into the column list and tuples COPY expects.
+
+    COPY skips the Python-side column defaults an INSERT would apply,
+    so those are filled in here; columns with only a server default are
+    left out and get it from the database. Values go through each
+    column type's bind processor, e.g. JSON columns are serialized.
+
+    Args:
+        table: Target table.
+        rows: Column-name to value mappings with identical keys.
+        dialect: Dialect of the connection the records are copied to.
+
+    Returns:
+        Column names and one value tuple per row.
+    """
+    columns = [table.c[name] for name in rows[0]]
+    defaults = [
+        column
+        for column in table.columns
+        if column.name not in rows[0]
+        and column.default is not None
+        and (column.default.is_scalar or column.default.is_callable)
+    ]
+    columns.extend(defaults)
+    processors = [column.type.bind_processor(dialect) for column in columns]
+
+    records = []
+    for row in rows:
+        values = [row[column.name] for column in columns[:len(row)]]
+        for column in defaults:
+            default = column.default
+            values.append(
+                default.arg(None) if default.is_callable else default.arg
+            )
+        records.append(tuple(
+            value if process is None or value is None else process(value)
+            for process, value in zip(processors, values)
+        ))
+    return [column.name for column in columns], records
+
+
+@lru_cache(maxsize=None)
+def _string_limits(table: Table) -> Tuple[Tuple[str, int], ...]:
+    """Return the (name, length) of each length-limited string column."""
+    return tuple(
+        (column.name, column.type.length)
+        for column in table.columns
+        if isinstance(column.type, String) and column.type.length
+    )
+
+
+def clamp_strings(table: Table, row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Truncate string values in place to their column's declared length.
+
+    Honeypot rows carry attacker-controlled text; an oversized value
+    would otherwise fail the insert on backends that enforce lengths.
+
+    Args:
+        table: Target table.
+        row: Column-name to value mapping.
+
+    Returns:
+        The same row.
+    """
+    for name, length in _string_limits(table):
+        value = row.get(name)
+        if isinstance(value, str) and len(value) > length:
+            row[name] = value[:length]
+    return row
+
+
+async def bulk_insert(
+    session: AsyncSession, table: Table, rows: List[Dict[str, Any]]
+) -> None:
+    """
+    Insert many rows into a table with one executemany per key set.
+
+    Rows must carry any primary keys other rows reference, since Core
+    inserts do not populate them back. On asyncpg, groups of at least
+    ``COPY_THRESHOLD`` rows are sent with COPY, which is several times
+    faster than executemany.
+
+    Args:
+        session: Active database session.
+        table: Target table.
+        rows: Column-name to value mappings, one per row.
+    """
+    # executemany binds every row with the first row's keys
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(row), []).append(row)
+    for group in groups.values():
+        await _insert_rows(session, table, group)
+
+
+async def _insert_rows(
+    session: AsyncSession, table: Table, rows: List[Dict[str, Any]]
+) -> None:
+    """Insert rows that all use the same keys."""
+    connection = await session.connection()
+    if (
+        len(rows) < COPY_THRESHOLD
+        or connection.dialect.driver != "asyncpg"
+    ):
+        await session.execute(table.insert(), rows)
+        return
+
+    columns, records = copy_records(table, rows, connection.dialect)
+    # The asyncpg adapter begins its transaction lazily on the first
+    # statement; issue one so COPY joins the batch's transaction
+    await connection.exec_driver_sql("SELECT 1")
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        table.name, records=records, columns=columns
+    )
+
+
+async def bulk_update(
+    session: AsyncSession, table: Table, rows: List[Dict[str, Any]]
+) -> None:
+    """
+    Update many rows by primary key with one executemany per key set.
+
+    Args:
+        session: Active database session.
+        table: Target table.
+        rows: Column-name to value mappings, one per row. Each carries
+            the row's primary key columns and the columns to set.
+    """
+    pk_names = [column.name for column in table.primary_key]
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(row), []).append(row)
+    for group in groups.values():
+        # Keys matching a column become SET clauses; the primary key is
+        # bound under another name so it is only matched on
+        statement = table.update().where(*(
+            table.c[name] == bindparam(f"b_{name}") for name in pk_names
+        ))
+        await session.execute(statement, [
+            {
+                f"b_{name}" if name in pk_names else name: value
+                for name, value in row.items()
+            }
+            for row in group
+        ])
+
+
+def _primary_key(table: Table, row: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Return the primary key values of a row mapping."""
+    return tuple(row.get(column.name) for column in table.primary_key)
+
+
+async def bulk_record_attacks(
+    session: AsyncSession, rows: List[Dict[str, Any]]
+) -> None:
+    """
+    Insert many attack rows at once.
+
+    Args:
+        session: Active database session.
+        rows: Attack column mappings, one per attack.
+    """
+    await bulk_insert(session, Attack.__table__, rows)
+
+
+class BatchWriter:
+    """
+    Background writer that batches inserts across tables.
+
+    Rows are queued with :meth:`add` and written by a consumer task once
+    ``max_batch`` rows are pending or ``flush_interval`` seconds have
+    passed since the first pending row. Each batch is one transaction
+    with one executemany per table, in foreign-key dependency order; a
+    batch the database rejects is retried per table and then per row.
+    String values are clamped to their column length when queued.
+    Rows queued with the same ``key`` in one batch are merged into a
+    single row whose ``count`` column holds how many were queued.
+    Updates queued with :meth:`update` are applied after the batch's
+    inserts, in queue order; an update of a row inserted in the same
+    batch is folded into its insert.
+
+    Attributes:
+        max_batch: Maximum number of rows written per transaction.
+        flush_interval: Maximum seconds a row waits before being written.
+        dropped: Rows discarded because ``max_pending`` rows were queued.
+    """
+
+    def __init__(
+        self,
+        max_batch: int = 100,
+        flush_interval: float = 0.5,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        max_pending: int = 0,
+    ) -> None:
+        """
+        Initialize the BatchWriter.
+
+        Args:
+            max_batch: Maximum number of rows written per transaction.
+            flush_interval: Maximum seconds a row waits before being
+                written.
+            session_factory: Factory for the sessions batches use.
+            max_pending: Maximum number of queued rows; further rows are
+                dropped. Zero means unbounded.
+        """
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._session_factory = session_factory
+        self._queue: asyncio.Queue = asyncio.Queue(max_pending)
+        self._task: Optional[asyncio.Task] = None
+
+    def add(
+        self,
+        table: Table,
+        row: Dict[str, Any],
+        key: Optional[Hashable] = None,
+    ) -> None:
+        """
+        Queue a row for insertion, dropping it if the queue is full.
+
+        Args:
+            table: Target table.
+            row: Column-name to value mapping.
+            key: Identity of the row's content; rows with an equal key
+                are merged. The table needs a ``count`` column to use it.
+        """
+        self._put((table, clamp_strings(table, row), key, False))
+
+    def update(self, table: Table, row: Dict[str, Any]) -> None:
+        """
+        Queue an update of a previously queued row.
+
+        Args:
+            table: Target table.
+            row: The row's primary key columns and the columns to set.
+        """
+        self._put((table, clamp_strings(table, row), None, True))
+
+    def _put(
+        self,
+        item: Tuple[Table, Dict[str, Any], Optional[Hashable], bool],
+    ) -> None:
+        """Queue an operation, dropping it if the queue is full."""
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning("batch_rows_dropped", dropped=self.dropped)
+
+    def start(self) -> None:
+        """Start the consumer task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the consumer task once every queued row is written."""
+        if self._task is None:
+            return
+        # Sentinel: the consumer writes what it holds and exits
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        """Collect queued rows into batches and write them."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._write(batch)
+
+    async def _write(
+        self,
+        batch: List[Tuple[Table, Dict[str, Any], Optional[Hashable], bool]],
+    ) -> None:
+        """
+        Write one batch in a single transaction.
+
+        Args:
+            batch: Queued (table, row, key, update) operations.
+        """
+        rows_by_table: Dict[Table, List[Dict[str, Any]]] = {}
+        merged: Dict[Tuple[Table, Hashable], Dict[str, Any]] = {}
+        # (table, primary key) -> pending insert or combined update
+        inserts: Dict[Tuple[Table, Tuple[Any, ...]], Dict[str, Any]] = {}
+        updates: Dict[Tuple[Table, Tuple[Any, ...]], Dict[str, Any]] = {}
+        for table, row, key, update in batch:
+            if update:
+                pk = (table, _primary_key(table, row))
+                target = inserts.get(pk)
+                if target is None:
+                    target = updates.setdefault(pk, {})
+                target.update(row)
+                continue
+            if key is not None:
+                first = merged.get((table, key))
+                if first is not None:
+                    first["count"] = first.get("count", 1) + 1
+                    continue
+                merged[(table, key)] = row
+            rows_by_table.setdefault(table, []).append(row)
+            inserts[(table, _primary_key(table, row))] = row
+        updates_by_table: Dict[Table, List[Dict[str, Any]]] = {}
+        for (table, _), row in updates.items():
+            updates_by_table.setdefault(table, []).append(row)
+
+        try:
+            await self._apply(rows_by_table, updates_by_table)
+            logger.debug("batch_written", rows=len(batch))
+            return
+        except Exception as e:
+            # Exception text carries bound values, i.e. captured passwords
+            logger.warning(
+                "batch_write_failed", rows=len(batch), error=type(e).__name__
+            )
+
+        # Retry table by table, then row by row, so a row the database
+        # rejects is the only one lost
+        for update, by_table in ((False, rows_by_table),
+                                 (True, updates_by_table)):
+            for table in Base.metadata.sorted_tables:
+                rows = by_table.get(table)
+                if rows:
+                    await self._retry(table, rows, update)
+
+    async def _retry(
+        self, table: Table, rows: List[Dict[str, Any]], update: bool
+    ) -> None:
+        """Write one table's rows together, else one at a time."""
+        try:
+            await self._apply_one(table, rows, update)
+            return
+        except Exception:
+            pass
+        for row in rows:
+            try:
+                await self._apply_one(table, [row], update)
+            except Exception as e:
+                logger.error(
+                    "batch_row_dropped",
+                    table=table.name,
+                    error=type(e).__name__,
+                )
+
+    async def _apply_one(
+        self, table: Table, rows: List[Dict[str, Any]], update: bool
+    ) -> None:
+        """Insert or update rows of one table in one transaction."""
+        if update:
+            await self._apply({}, {table: rows})
+        else:
+            await self._apply({table: rows}, {})
+
+    async def _apply(
+        self,
+        rows_by_table: Dict[Table, List[Dict[str, Any]]],
+        updates_by_table: Dict[Table, List[Dict[str, Any]]],
+    ) -> None:
+        """Insert, then update, rows of several tables in one transaction."""
+        async with self._session_factory() as session:
+            async with session.begin():
+                # Parents before children so foreign keys resolve
+                for table in Base.metadata.sorted_tables:
+                    await bulk_insert(
+                        session, table, rows_by_table.get(table, [])
+                    )
+                for table in Base.metadata.sorted_tables:
+                    await bulk_update(
+                        session, table, updates_by_table.get(table, [])
+                    )
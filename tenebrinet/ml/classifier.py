@@ -2,29 +2,109 @@
 """
 Threat Classifier model wrapper.
 
-Wraps scikit-learn models for training and inference.
+Wraps scikit-learn models for training and inference. When Treelite and
+TL2cgen are installed, the fitted forest is also compiled to a native
+shared library that serves predictions instead of scikit-learn.
 """
 import joblib
 import os
+import threading
 from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
+import structlog
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.base import BaseEstimator
+from sklearn.utils.class_weight import compute_class_weight
 
 from tenebrinet.ml.features import FeatureExtractor
 
+try:
+    import tl2cgen
+    import treelite
+except ImportError:  # Optional: fall back to scikit-learn inference
+    tl2cgen = None
+    treelite = None
+
+
+logger = structlog.get_logger()
+
+# zlib level for saved models; forests compress roughly 4x
+MODEL_COMPRESSION = 3
+
+# TL2cgen code generation parameters for the compiled forest
+COMPILE_PARAMS: Dict[str, Any] = {"parallel_comp": 8, "quantize": 1}
+
+
+# Predictor threads. Serving scores small batches from the event loop
+# thread, where an OpenMP pool per predictor only contends for cores.
+PREDICTOR_THREADS = 1
+
+# Process-wide compiled predictors: lib path -> (mtime_ns, predictor)
+_predictors: Dict[str, Tuple[int, Any]] = {}
+_predictors_lock = threading.Lock()
+
+
+def compiled_lib_path(model_path: str) -> str:
+    """Return the path of the compiled library stored next to a model."""
+    return os.path.splitext(model_path)[0] + ".so"
+
+
+def _shared_predictor(lib_path: str) -> Any:
+    """
+    Return the process's predictor for a compiled library.
+
+    Each library is loaded once per process and shared by every
+    classifier (and coroutine) using it; a rebuilt library, detected by
+    its modification time, replaces the cached predictor.
+
+    Args:
+        lib_path: Path of the compiled shared library.
+
+    Returns:
+        The loaded ``tl2cgen.Predictor``.
+    """
+    mtime_ns = os.stat(lib_path).st_mtime_ns
+    with _predictors_lock:
+        cached = _predictors.get(lib_path)
+        if cached is None or cached[0] != mtime_ns:
+            predictor = tl2cgen.Predictor(
+                lib_path, nthread=PREDICTOR_THREADS
+            )
+            cached = (mtime_ns, predictor)
+            _predictors[lib_path] = cached
+        return cached[1]
+
 
 class ThreatClassifier:
     """
     ML model for classifying attack types.
+
+    Args:
+        model_path: Where the model is saved and loaded.
+        n_estimators: Number of trees in the forest.
+        max_depth: Maximum depth of each tree.
+        n_jobs: Worker count used while training (-1 for all cores).
+            Predictions always run single-threaded, since serving sees
+            small batches where thread fan-out costs more than it saves.
     """
 
-    def __init__(self, model_path: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        n_estimators: int = 100,
+        max_depth: int = 10,
+        n_jobs: int = -1,
+    ) -> None:
         self.model_path = model_path
+        self.n_estimators = n_estimators
+        self.max_depth = max_depth
+        self.n_jobs = n_jobs
         self.feature_extractor = FeatureExtractor()
         self.model: Optional[BaseEstimator] = None
         self.classes_: Optional[np.ndarray] = None
+        # Native predictor compiled from self.model, if available
+        self._compiled: Optional[Any] = None
 
     def train(
         self,
@@ -46,23 +126,83 @@ class ThreatClassifier:
 
         # Initialize and train model
         self.model = RandomForestClassifier(
-            n_estimators=100,
-            max_depth=10,
+            n_estimators=self.n_estimators,
+            max_depth=self.max_depth,
             random_state=42,
-            class_weight="balanced"
+            class_weight="balanced",
+            n_jobs=self.n_jobs,
         )
         self.model.fit(X, y)
         self.classes_ = self.model.classes_
+        # Any previously compiled library belongs to the old model
+        self._compiled = None
 
         # Calculate basic accuracy on training set
         score = self.model.score(X, y)
+        self.model.set_params(n_jobs=1)
 
         return {"accuracy": score}
 
+    def train_incremental(
+        self,
+        X_raw: List[Dict[str, Any]],
+        y: List[str],
+        n_new_trees: int = 10,
+    ) -> Dict[str, float]:
+        """
+        Grow the forest with trees fitted on new data only.
+
+        Existing trees are kept (``warm_start``), so a retrain costs
+        O(new data) instead of refitting the whole forest. The feature
+        extractor is not refitted: new data is scaled and encoded with
+        the statistics of the original training set.
+
+        Args:
+            X_raw: New attack dictionaries.
+            y: Their target labels; must cover exactly the known classes,
+                since every tree has to emit the same class columns.
+            n_new_trees: Number of trees to add.
+
+        Returns:
+            Dictionary of training metrics on the new data.
+
+        Raises:
+            RuntimeError: If no model is trained or loaded.
+            ValueError: If the labels do not match the known classes.
+        """
+        if self.model is None or self.classes_ is None:
+            raise RuntimeError("Model not trained or loaded")
+        if set(y) != set(self.classes_.tolist()):
+            raise ValueError(
+                "Incremental data must contain exactly the known classes: "
+                f"{sorted(self.classes_.tolist())}"
+            )
+
+        X = self.feature_extractor.transform(X_raw)
+        # Balance the new trees on the new data, as "balanced" would
+        weights = compute_class_weight(
+            "balanced", classes=self.classes_, y=np.asarray(y)
+        )
+        class_weight = self.model.class_weight
+        self.model.set_params(
+            warm_start=True,
+            n_estimators=len(self.model.estimators_) + n_new_trees,
+            n_jobs=self.n_jobs,
+            class_weight=dict(zip(self.classes_.tolist(), weights)),
+        )
+        self.model.fit(X, y)
+        self.model.set_params(
+            warm_start=False, n_jobs=1, class_weight=class_weight
+        )
+        # The compiled library no longer matches the forest
+        self._compiled = None
+
+        return {"accuracy": self.model.score(X, y)}
+
     def predict(
         self,
         X_raw: List[Dict[str, Any]]
-    ) -> Tuple[List[str], List[float]]:
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
         Predict threat types for new data.
 
@@ -70,7 +210,8 @@ class ThreatClassifier:
             X_raw: List of attack dictionaries.
 
         Returns:
-            Tuple of (predicted_labels, confidences).
+            Tuple of (predicted_labels, confidences) arrays, one entry per
+            attack. Callers convert to Python objects only where needed.
         """
         if self.model is None:
             raise RuntimeError("Model not trained or loaded")
@@ -78,18 +219,20 @@ class ThreatClassifier:
         X = self.feature_extractor.transform(X_raw)
 
         # Get probabilities
-        probas = self.model.predict_proba(X)
-
-        # Get max probability and corresponding class
-        max_probas_indices = np.argmax(probas, axis=1)
-        confidences = np.max(probas, axis=1)
+        if self._compiled is not None:
+            probas = self._predict_compiled(X)
+        else:
+            probas = self.model.predict_proba(X)
 
         if self.classes_ is None:
             raise RuntimeError("Model classes not initialized")
 
-        predictions = self.classes_[max_probas_indices]
+        # One pass for the best class; its probability is gathered
+        best = probas.argmax(axis=1)
+        confidences = probas[np.arange(len(best)), best]
+        predictions = self.classes_[best]
 
-        return predictions.tolist(), confidences.tolist()
+        return predictions, confidences
 
     def save(self, path: Optional[str] = None) -> None:
         """Save the model and feature extractor to disk."""
@@ -104,7 +247,9 @@ class ThreatClassifier:
             "model": self.model,
             "feature_extractor": self.feature_extractor,
             "classes": self.classes_
-        }, save_path)
+        }, save_path, compress=MODEL_COMPRESSION)
+
+        self.compile(compiled_lib_path(save_path))
 
     def load(self, path: Optional[str] = None) -> None:
         """Load the model and feature extractor from disk."""
@@ -116,3 +261,69 @@ class ThreatClassifier:
         self.model = data["model"]
         self.feature_extractor = data["feature_extractor"]
         self.classes_ = data["classes"]
+        self._compiled = None
+
+        # Only trust a library at least as new as the model it came from
+        lib_path = compiled_lib_path(load_path)
+        if (
+            tl2cgen is not None
+            and os.path.exists(lib_path)
+            and os.path.getmtime(lib_path) >= os.path.getmtime(load_path)
+        ):
+            try:
+                self._compiled = _shared_predictor(lib_path)
+                logger.info("ml_compiled_model_loaded", path=lib_path)
+            except Exception as e:
+                logger.warning("ml_compiled_model_load_failed", error=str(e))
+
+    def compile(self, lib_path: str) -> bool:
+        """
+        Compile the fitted forest to a native shared library.
+
+        Does nothing when Treelite/TL2cgen are not installed; predictions
+        then keep using scikit-learn.
+
+        Args:
+            lib_path: Destination of the shared library.
+
+        Returns:
+            True if the library was built and loaded.
+        """
+        if self.model is None:
+            raise RuntimeError("Model not trained or loaded")
+        if treelite is None or tl2cgen is None:
+            return False
+
+        try:
+            tl_model = treelite.sklearn.import_model(self.model)
+            tl2cgen.export_lib(
+                tl_model,
+                toolchain="gcc",
+                libpath=lib_path,
+                params=COMPILE_PARAMS,
+            )
+            self._compiled = _shared_predictor(lib_path)
+        except Exception as e:
+            logger.warning("ml_model_compile_failed", error=str(e))
+            return False
+
+        logger.info("ml_model_compiled", path=lib_path)
+        return True
+
+    def _predict_compiled(self, X: Any) -> np.ndarray:
+        """
+        Compute class probabilities with the compiled forest.
+
+        Args:
+            X: Feature matrix from the feature extractor.
+
+        Returns:
+            Array of shape (n_samples, n_classes), in ``classes_`` order.
+        """
+        if hasattr(X, "toarray"):  # Sparse one-hot output
+            X = X.toarray()
+        dmat = tl2cgen.DMatrix(
+            np.asarray(X, dtype=np.float32), dtype="float32"
+        )
+        # Output is (n_samples, n_targets=1, n_classes)
+        return self._compiled.predict(dmat).reshape(X.shape[0], -1)
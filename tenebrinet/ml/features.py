@@ -4,27 +4,279 @@ Feature extraction for TenebriNET ML pipeline.
 
 Converts raw attack data into numerical features for model training.
 """
+import hashlib
 import json
 import re
+import sys
+from bisect import bisect_left
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
-import pandas as pd
+import orjson
+from joblib import Memory
 from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
-from sklearn.impute import SimpleImputer
+
+try:
+    import hyperscan
+except ImportError:  # Optional: fall back to a regex engine
+    hyperscan = None
+
+try:
+    import re2 as keyword_re
+except ImportError:  # Optional: fall back to the stdlib engine
+    keyword_re = re
+
+
+# Keyword groups counted in payloads, in feature order
+SQLI_KEYWORDS = (
+    "union", "select", "insert", "drop", "update", "where", "from",
+)
+XSS_KEYWORDS = (
+    "script", "alert", "onload", "onerror", "img", "svg", "iframe",
+)
+PATH_TRAVERSAL_KEYWORDS = ("../", "..\\", "/etc/passwd", "c:\\windows")
+KEYWORD_GROUPS = (SQLI_KEYWORDS, XSS_KEYWORDS, PATH_TRAVERSAL_KEYWORDS)
+
+
+def _build_keyword_database() -> Optional[Any]:
+    """
+    Compile every keyword into one Hyperscan database.
+
+    Each pattern's id is the index of its group, so a single scan of a
+    payload yields the counts of all groups.
+    """
+    if hyperscan is None:
+        return None
+    expressions = []
+    ids = []
+    for group, keywords in enumerate(KEYWORD_GROUPS):
+        for keyword in keywords:
+            expressions.append(re.escape(keyword).encode())
+            ids.append(group)
+    database = hyperscan.Database()
+    database.compile(
+        expressions=expressions,
+        ids=ids,
+        elements=len(expressions),
+        flags=[hyperscan.HS_FLAG_CASELESS] * len(expressions),
+    )
+    return database
+
+
+_KEYWORD_DATABASE = _build_keyword_database()
+_KEYWORD_PATTERNS = tuple(
+    keyword_re.compile(b"|".join(re.escape(k).encode() for k in keywords))
+    for keywords in KEYWORD_GROUPS
+)
+
+
+def _on_keyword_match(
+    group: int, start: int, end: int, flags: int, counts: List[int]
+) -> None:
+    """Hyperscan match callback: count one hit for the pattern's group."""
+    counts[group] += 1
+
+
+def count_keywords(text: bytes) -> Tuple[int, ...]:
+    """
+    Count keyword occurrences for each group in ``KEYWORD_GROUPS``.
+
+    Uses a single Hyperscan DFA pass when available, otherwise one
+    precompiled alternation per group (RE2 if installed, else ``re``).
+
+    Args:
+        text: Lower-cased payload bytes.
+
+    Returns:
+        Occurrence counts, one per keyword group.
+    """
+    if _KEYWORD_DATABASE is not None:
+        counts = [0] * len(KEYWORD_GROUPS)
+        _KEYWORD_DATABASE.scan(
+            text, match_event_handler=_on_keyword_match, context=counts
+        )
+        return tuple(counts)
+    return tuple(len(p.findall(text)) for p in _KEYWORD_PATTERNS)
+
+
+def count_keywords_batch(texts: List[bytes]) -> np.ndarray:
+    """
+    Count keyword occurrences for many texts at once.
+
+    With Hyperscan, the texts are joined with NUL separators (which no
+    keyword contains, so no match can span two texts) and scanned in a
+    single call; each match is attributed to its text by end offset.
+
+    Args:
+        texts: Lower-cased payload bytes.
+
+    Returns:
+        Array of shape (len(texts), len(KEYWORD_GROUPS)).
+    """
+    counts = np.zeros((len(texts), len(KEYWORD_GROUPS)), dtype=np.int64)
+    if not texts:
+        return counts
+    if _KEYWORD_DATABASE is None:
+        for row, text in enumerate(texts):
+            counts[row] = count_keywords(text)
+        return counts
+
+    # ends[i] is the offset just past text i in the joined buffer
+    ends = np.cumsum([len(b) + 1 for b in texts]) - 1
+    ends_list = ends.tolist()
+    matches: List[Tuple[int, int]] = []
+
+    def on_match(group: int, start: int, end: int, flags: int,
+                 context: Any) -> None:
+        matches.append((bisect_left(ends_list, end), group))
+
+    _KEYWORD_DATABASE.scan(b"\0".join(texts), match_event_handler=on_match)
+    if matches:
+        rows, groups = zip(*matches)
+        np.add.at(counts, (list(rows), list(groups)), 1)
+    return counts
+
+
+def _string_values(value: Any) -> Iterator[str]:
+    """Yield every string nested in dicts and lists, depth first."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _string_values(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _string_values(item)
+
+
+def payload_bytes(payload: Any) -> bytes:
+    """
+    Return the lower-cased bytes scanned for a payload.
+
+    Structured payloads contribute only their string values, joined by
+    a unit separator, so field names and repr punctuation are neither
+    copied nor scanned. Other payloads fall back to their ``str()``.
+
+    Args:
+        payload: Decoded attack payload.
+
+    Returns:
+        ASCII-lower-cased UTF-8 bytes.
+    """
+    if isinstance(payload, (dict, list)):
+        return b"\x1f".join(
+            v.encode("utf-8", "replace") for v in _string_values(payload)
+        ).lower()
+    return str(payload).encode("utf-8", "replace").lower()
+
+
+def _load_payload(payload: Any) -> Any:
+    """Decode a JSON-string payload; missing payloads become ``{}``."""
+    payload = payload or {}
+    if isinstance(payload, str):
+        try:
+            payload = json.loads(payload)
+        except json.JSONDecodeError:
+            payload = {}
+    return payload
+
+
+# Python 3.11+ fromisoformat() parses a trailing "Z" itself
+_FAST_ISO = sys.version_info >= (3, 11)
+
+
+def _hour_of(timestamp: Any) -> int:
+    """Return the hour of an ISO string or datetime, or 0 if unknown."""
+    if isinstance(timestamp, str):
+        # "YYYY-MM-DDTHH..." layout: read the hour digits directly
+        if (
+            len(timestamp) >= 13
+            and timestamp[10] in "T "
+            and timestamp[11:13].isdigit()
+        ):
+            hour = int(timestamp[11:13])
+            if hour < 24:
+                return hour
+        if not _FAST_ISO:
+            timestamp = timestamp.replace("Z", "+00:00")
+        try:
+            return datetime.fromisoformat(timestamp).hour
+        except ValueError:
+            return 0
+    if isinstance(timestamp, datetime):
+        return timestamp.hour
+    return 0
+
+
+def _fit_encoder(categorical: np.ndarray) -> OneHotEncoder:
+    """Fit the one-hot encoder for the categorical block."""
+    return OneHotEncoder(
+        handle_unknown="ignore", sparse_output=False, dtype=np.float32
+    ).fit(categorical)
+
+
+def feature_fingerprint(item: Dict[str, Any]) -> Optional[bytes]:
+    """
+    Return a digest of the inputs the features of one attack depend on.
+
+    Two attacks with the same fingerprint produce the same feature row:
+    only the service, the hour of the timestamp and the payload are
+    hashed, so replays of the same event at different times collide.
+
+    Args:
+        item: Attack dictionary.
+
+    Returns:
+        16-byte digest, or None if the payload cannot be serialized.
+    """
+    try:
+        encoded = orjson.dumps(
+            [
+                item.get("service"),
+                _hour_of(item.get("timestamp")),
+                item.get("payload"),
+            ],
+            option=orjson.OPT_SORT_KEYS,
+            default=str,
+        )
+    except TypeError:
+        return None
+    return hashlib.blake2b(encoded, digest_size=16).digest()
+
+
+# Column order of the numeric block returned by _preprocess
+NUMERIC_FEATURES = (
+    "payload_len", "hour", "is_scanner",
+    "sqli_keywords", "xss_keywords", "path_traversal_keywords",
+)
+# Column order of the categorical block returned by _preprocess
+CATEGORICAL_FEATURES = ("service", "method")
+
+SCANNER_SIGNATURES = ("nmap", "nikto", "sqlmap", "curl", "python")
 
 
 class FeatureExtractor(BaseEstimator, TransformerMixin):
     """
     Extracts features from raw attack dictionaries.
+
+    Records are flattened into a float32 numeric block and an object
+    block of categoricals, which are fed straight to a fitted
+    ``StandardScaler`` and ``OneHotEncoder`` without going through a
+    DataFrame.
+
+    Args:
+        memory_dir: Optional directory where ``joblib.Memory`` caches the
+            fitted one-hot encoder, so repeated fits on identical data
+            (e.g. retraining or hyperparameter search) reuse it. The
+            scaler is cheap to fit and is never cached.
     """
 
-    def __init__(self) -> None:
-        self.pipeline: Optional[Pipeline] = None
+    def __init__(self, memory_dir: Optional[str] = None) -> None:
+        self.memory_dir = memory_dir
+        self.scaler: Optional[StandardScaler] = None
+        self.encoder: Optional[OneHotEncoder] = None
         self._is_fitted = False
 
     def fit(
@@ -39,118 +291,87 @@ class FeatureExtractor(BaseEstimator, TransformerMixin):
             X: List of attack dictionaries.
             y: Ignored.
         """
-        df = self._preprocess(X)
-
-        # Define transformers
-        numeric_features = [
-            "payload_len", "hour", "is_scanner",
-            "sqli_keywords", "xss_keywords", "path_traversal_keywords"
-        ]
-        categorical_features = ["service", "method"]
+        numeric, categorical = self._preprocess(X)
 
-        numeric_transformer = Pipeline(steps=[
-            ('imputer', SimpleImputer(strategy='constant', fill_value=0)),
-            ('scaler', StandardScaler())
-        ])
-
-        categorical_transformer = Pipeline(steps=[
-            (
-                'imputer',
-                SimpleImputer(strategy='constant', fill_value='unknown')
-            ),
-            ('onehot', OneHotEncoder(handle_unknown='ignore'))
-        ])
-
-        self.pipeline = ColumnTransformer(
-            transformers=[
-                ('num', numeric_transformer, numeric_features),
-                ('cat', categorical_transformer, categorical_features)
-            ]
-        )
+        fit_encoder = _fit_encoder
+        if self.memory_dir is not None:
+            fit_encoder = Memory(self.memory_dir, verbose=0).cache(
+                _fit_encoder
+            )
 
-        self.pipeline.fit(df)
+        self.scaler = StandardScaler().fit(numeric)
+        self.encoder = fit_encoder(categorical)
         self._is_fitted = True
         return self
 
     def transform(self, X: List[Dict[str, Any]]) -> np.ndarray:
         """
-        Transform raw data into feature matrix.
+        Transform raw data into a float32 feature matrix.
         """
-        if not self._is_fitted or self.pipeline is None:
+        if not self._is_fitted or self.scaler is None:
             raise RuntimeError(
                 "FeatureExtractor must be fitted before transform"
             )
 
-        df = self._preprocess(X)
-        return self.pipeline.transform(df)
+        numeric, categorical = self._preprocess(X)
+        # float32 is what the forest compares against internally, so
+        # prediction reads half the bytes and never converts
+        return np.hstack(
+            [
+                self.scaler.transform(numeric),
+                self.encoder.transform(categorical),
+            ],
+            dtype=np.float32,
+        )
 
-    def _preprocess(self, data: List[Dict[str, Any]]) -> pd.DataFrame:
+    def _preprocess(
+        self, data: List[Dict[str, Any]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Convert list of dicts to DataFrame and extract basic features.
+        Extract basic features into column blocks.
+
+        Each feature is computed for the whole batch at once and written
+        as a column, rather than building a row per record.
+
+        Returns:
+            Tuple of a float32 array ordered as ``NUMERIC_FEATURES`` and an
+            object array ordered as ``CATEGORICAL_FEATURES``, one row per
+            record.
         """
-        processed_data = []
-
-        for item in data:
-            payload = item.get("payload", {}) or {}
-            if isinstance(payload, str):
-                try:
-                    payload = json.loads(payload)
-                except json.JSONDecodeError:
-                    payload = {}
-
-            # Extract basic fields
-            timestamp = item.get("timestamp")
-            if isinstance(timestamp, str):
-                try:
-                    dt = datetime.fromisoformat(
-                        timestamp.replace("Z", "+00:00")
-                    )
-                    hour = dt.hour
-                except ValueError:
-                    hour = 0
-            elif isinstance(timestamp, datetime):
-                hour = timestamp.hour
-            else:
-                hour = 0
-
-            # Payload analysis
-            payload_str = str(payload).lower()
-
-            # Keyword counting
-            sqli_keywords = len(re.findall(
-                r"(union|select|insert|drop|update|where|from)",
-                payload_str
-            ))
-            xss_keywords = len(re.findall(
-                r"(script|alert|onload|onerror|img|svg|iframe)",
-                payload_str
-            ))
-            path_traversal_keywords = len(re.findall(
-                r"(\.\./|\.\.\\|/etc/passwd|c:\\windows)",
-                payload_str
-            ))
-
-            # User Agent analysis
-            user_agent = ""
-            if isinstance(payload, dict):
-                user_agent = payload.get("user_agent", "").lower()
-
-            scanners = ["nmap", "nikto", "sqlmap", "curl", "python"]
-            is_scanner = 1 if any(s in user_agent for s in scanners) else 0
-
-            method = "unknown"
-            if isinstance(payload, dict):
-                method = payload.get("method", "unknown")
-
-            processed_data.append({
-                "service": item.get("service", "unknown"),
-                "method": method,
-                "payload_len": len(payload_str),
-                "hour": hour,
-                "is_scanner": is_scanner,
-                "sqli_keywords": sqli_keywords,
-                "xss_keywords": xss_keywords,
-                "path_traversal_keywords": path_traversal_keywords,
-            })
-
-        return pd.DataFrame(processed_data)
+        n = len(data)
+        payloads = [_load_payload(item.get("payload")) for item in data]
+        fields = [p if isinstance(p, dict) else {} for p in payloads]
+        # Payload analysis
+        payload_bufs = [payload_bytes(p) for p in payloads]
+        user_agents = [(f.get("user_agent") or "").lower() for f in fields]
+
+        numeric = np.empty((n, len(NUMERIC_FEATURES)), dtype=np.float32)
+        numeric[:, 0] = np.fromiter(map(len, payload_bufs), np.float32, n)
+        numeric[:, 1] = np.fromiter(
+            (_hour_of(item.get("timestamp")) for item in data),
+            np.float32,
+            n,
+        )
+        numeric[:, 2] = np.fromiter(
+            (
+                any(s in ua for s in SCANNER_SIGNATURES)
+                for ua in user_agents
+            ),
+            np.float32,
+            n,
+        )
+        numeric[:, 3:] = count_keywords_batch(payload_bufs)
+
+        # Missing categoricals share the "unknown" category
+        categorical = np.empty((n, len(CATEGORICAL_FEATURES)), dtype=object)
+        categorical[:, 0] = [
+            "unknown" if (service := item.get("service")) is None
+            else service
+            for item in data
+        ]
+        categorical[:, 1] = [
+            "unknown" if (method := f.get("method")) is None else method
+            for f in fields
+        ]
+
+        return numeric, categorical
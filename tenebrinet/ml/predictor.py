@@ -3,18 +3,44 @@
 Threat Predictor service.
 
 High-level interface for making threat predictions using the trained model.
+Concurrent single-attack predictions are micro-batched so that one
+classifier call serves every attack queued within a short window.
 """
+import asyncio
 import os
-from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
 import structlog
 
 from tenebrinet.core.config import MLConfig
 from tenebrinet.ml.classifier import ThreatClassifier
+from tenebrinet.ml.features import feature_fingerprint
 
 
 logger = structlog.get_logger()
 
+# Largest number of attacks scored by one classifier call
+MAX_BATCH = 32
+# Seconds the first queued attack waits for others to join its batch
+MAX_WAIT = 0.01
+# Confident predictions remembered per feature fingerprint
+PREDICTION_CACHE_SIZE = 4096
+
+Prediction = Tuple[Optional[str], float]
+
+# Synthetic attack scored once after loading, touching every feature path
+WARMUP_ATTACK: Dict[str, Any] = {
+    "service": "http",
+    "timestamp": "2024-01-01T00:00:00Z",
+    "payload": {
+        "method": "GET",
+        "path": "/../etc/passwd",
+        "query": "id=1 union select 1",
+        "user_agent": "curl/8.0",
+    },
+}
+
 
 class ThreatPredictor:
     """
@@ -25,15 +51,21 @@ class ThreatPredictor:
         self.config = config
         self.classifier = ThreatClassifier(model_path=config.model_path)
         self._is_ready = False
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        # fingerprint -> prediction, least recently used first
+        self._cache: "OrderedDict[bytes, Prediction]" = OrderedDict()
         self._load_model()
 
     def _load_model(self) -> None:
         """Attempt to load the pre-trained model."""
+        self._cache.clear()
+        self._is_ready = False
         try:
             if os.path.exists(self.config.model_path):
                 self.classifier.load()
-                self._is_ready = True
                 logger.info("ml_model_loaded", path=self.config.model_path)
+                self._is_ready = self._warm_up()
             else:
                 logger.warning(
                     "ml_model_not_found",
@@ -43,13 +75,74 @@ class ThreatPredictor:
         except Exception as e:
             logger.error("ml_model_load_failed", error=str(e))
 
-    def predict_one(
+    def _warm_up(self) -> bool:
+        """
+        Run one throwaway prediction.
+
+        Pays lazy imports, first-call allocations and page faults of the
+        model (or compiled library) now rather than on the first attack.
+        A model that cannot score the synthetic attack (e.g. one pickled
+        with an older feature extractor) will not score real ones either.
+
+        Returns:
+            True if the loaded model produced a prediction.
+        """
+        try:
+            self.classifier.predict([WARMUP_ATTACK])
+        except Exception as e:
+            logger.error(
+                "ml_model_incompatible",
+                path=self.config.model_path,
+                error=str(e),
+                msg="Retrain the model to enable predictions"
+            )
+            return False
+        return True
+
+    def predict_batch(
         self,
-        attack_data: Dict[str, Any]
-    ) -> Tuple[Optional[str], float]:
+        batch: List[Dict[str, Any]]
+    ) -> List[Prediction]:
+        """
+        Predict threat types for several attacks with one classifier call.
+
+        Args:
+            batch: Dictionaries containing attack details.
+
+        Returns:
+            One (predicted_threat_type, confidence) tuple per attack.
+            Every entry is (None, 0.0) if the model is not ready or the
+            prediction fails.
+        """
+        if not self._is_ready:
+            return [(None, 0.0)] * len(batch)
+
+        try:
+            predictions, confidences = self.classifier.predict(batch)
+        except Exception as e:
+            logger.error(
+                "ml_prediction_failed", error=str(e), batch_size=len(batch)
+            )
+            return [(None, 0.0)] * len(batch)
+
+        # Filter by confidence threshold; convert to Python objects once
+        threshold = self.config.confidence_threshold
+        return [
+            (prediction if confidence >= threshold else "unknown", confidence)
+            for prediction, confidence in zip(
+                predictions.tolist(), confidences.tolist()
+            )
+        ]
+
+    async def predict_one(self, attack_data: Dict[str, Any]) -> Prediction:
         """
         Predict threat type for a single attack.
 
+        Repeats of a confidently classified attack (same service, hour
+        and payload, as scanners replay) are answered from an LRU cache.
+        Other attacks are queued and scored together with any attacks
+        submitted within ``MAX_WAIT`` seconds.
+
         Args:
             attack_data: Dictionary containing attack details.
 
@@ -60,19 +153,78 @@ class ThreatPredictor:
         if not self._is_ready:
             return None, 0.0
 
+        key = feature_fingerprint(attack_data)
+        if key is not None:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        if self._batcher is None:
+            self._queue = asyncio.Queue()
+            self._batcher = asyncio.create_task(self._run_batcher())
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((attack_data, future))
+        result = await future
+
+        # Only confident labels are pinned, never misses or "unknown"
+        label, confidence = result
+        if (
+            key is not None
+            and label is not None
+            and confidence >= self.config.confidence_threshold
+        ):
+            self._cache[key] = result
+            if len(self._cache) > PREDICTION_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return result
+
+    async def close(self) -> None:
+        """Stop the batching task, resolving any queued predictions."""
+        if self._batcher is None:
+            return
+        self._batcher.cancel()
         try:
-            predictions, confidences = self.classifier.predict([attack_data])
-            confidence = confidences[0]
-
-            # Filter by confidence threshold
-            if confidence < self.config.confidence_threshold:
-                return "unknown", confidence
-
-            return predictions[0], confidence
-
-        except Exception as e:
-            logger.error("ml_prediction_failed", error=str(e))
-            return None, 0.0
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        self._batcher = None
+
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_result((None, 0.0))
+
+    async def _run_batcher(self) -> None:
+        """Collect queued attacks into batches and score them."""
+        loop = asyncio.get_running_loop()
+        batch: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = loop.time() + MAX_WAIT
+                while len(batch) < MAX_BATCH:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(
+                            await asyncio.wait_for(self._queue.get(), timeout)
+                        )
+                    except asyncio.TimeoutError:
+                        break
+
+                results = self.predict_batch([item for item, _ in batch])
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+                batch = []
+        finally:
+            # Cancelled mid-collection: do not leave callers waiting
+            for _, future in batch:
+                if not future.done():
+                    future.set_result((None, 0.0))
 
     @property
     def is_ready(self) -> bool:
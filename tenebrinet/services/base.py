@@ -6,7 +6,7 @@ Provides the common interface and lifecycle management for all
 honeypot service implementations.
 """
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Set
 
 import asyncio
 
@@ -28,6 +28,8 @@ class BaseHoneypotService(ABC):
         port: The port number the service listens on.
         host: The host address the service binds to.
         server: The asyncio server instance when running.
+        max_connections: Maximum number of connections handled at once;
+            further connections wait for a free slot.
     """
 
     def __init__(
@@ -35,6 +37,7 @@ class BaseHoneypotService(ABC):
         name: str,
         port: int,
         host: str = "0.0.0.0",
+        max_connections: int = 1000,
     ) -> None:
         """
         Initialize the BaseHoneypotService.
@@ -43,12 +46,20 @@ class BaseHoneypotService(ABC):
             name: The name of the honeypot service (e.g., "ssh", "http").
             port: The port number the service will listen on.
             host: The host address the service will bind to.
+            max_connections: Maximum number of connections handled at
+                once.
         """
         self.name = name
         self.port = port
         self.host = host
+        self.max_connections = max_connections
         self.server: asyncio.Server | None = None
         self._running = False
+        self._semaphore = asyncio.Semaphore(max_connections)
+        # Connections currently inside handle_connection
+        self._active = 0
+        # Tasks of accepted connections, cancelled together on stop()
+        self._connections: Set[asyncio.Task] = set()
         logger.info(
             f"{self.name}_service_initialized",
             name=self.name,
@@ -82,7 +93,7 @@ class BaseHoneypotService(ABC):
 
         try:
             self.server = await asyncio.start_server(
-                self.handle_connection,
+                self._dispatch,
                 self.host,
                 self.port,
             )
@@ -128,6 +139,13 @@ class BaseHoneypotService(ABC):
 
         if self.server:
             self.server.close()
+
+        # Cancel in-flight handlers so shutdown does not wait on attackers
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+
+        if self.server:
             await self.server.wait_closed()
 
         self._running = False
@@ -137,6 +155,35 @@ class BaseHoneypotService(ABC):
             port=self.port,
         )
 
+    async def _dispatch(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        """
+        Run ``handle_connection`` for an accepted client, bounded by
+        ``max_connections``.
+
+        Args:
+            reader: StreamReader for reading data from the client.
+            writer: StreamWriter for writing data to the client.
+        """
+        task = asyncio.current_task()
+        if task is not None:
+            self._connections.add(task)
+        try:
+            async with self._semaphore:
+                self._active += 1
+                try:
+                    await self.handle_connection(reader, writer)
+                finally:
+                    self._active -= 1
+        finally:
+            if task is not None:
+                self._connections.discard(task)
+            if not writer.is_closing():
+                writer.close()
+
     @abstractmethod
     async def handle_connection(
         self,
@@ -167,7 +214,10 @@ class BaseHoneypotService(ABC):
             "running": self._running,
             "port": self.port,
             "host": self.host,
-            "connections": len(self.server.sockets) if self.server else 0,
+            "connections": self._active,
+            "listening_sockets": (
+                len(self.server.sockets) if self.server else 0
+            ),
         }
         logger.debug(f"{self.name}_health_check", status=status)
         return status
@@ -6,19 +6,43 @@ Provides a fake FTP server that captures credentials and
 logs file transfer attempts and commands.
 """
 import asyncio
+import functools
+import posixpath
+import time
 from datetime import datetime, timezone
-from typing import Optional, List
+from typing import Any, Dict, List, Optional, Set, Tuple
 import uuid
 
 import structlog
 
 from tenebrinet.core.config import FTPServiceConfig
-from tenebrinet.core.database import AsyncSessionLocal
 from tenebrinet.core.models import Attack, Credential, Session
+from tenebrinet.core.recorder import BatchWriter
 
 
 logger = structlog.get_logger()
 
+# Pending-connection queue for the listening socket; scanners connect in
+# bursts well beyond asyncio's default of 100
+LISTEN_BACKLOG = 2048
+
+# Control connection reads; a line longer than the cap drops the client
+READ_CHUNK_SIZE = 4096
+MAX_LINE_LENGTH = 8192
+
+# Uploads are read in chunks and discarded; anything past the cap is
+# left unread and the data connection is closed
+STOR_CHUNK_SIZE = 64 * 1024
+MAX_STOR_BYTES = 10 * 1024 * 1024
+
+# Commands kept per session; later ones are counted, not stored
+MAX_RECORDED_COMMANDS = 1000
+
+# Command name of the entry that counts the commands past the cap
+TRUNCATED_COMMAND = "<truncated>"
+
+# Seconds a transfer command waits for the passive data connection
+DATA_CONNECTION_TIMEOUT = 5.0
 
 # Fake directory structure
 FAKE_FILES = {
@@ -54,6 +78,138 @@ FAKE_FILES = {
 }
 
 
+def _format_listing(files: List[Dict[str, Any]]) -> List[str]:
+    """Format directory entries as Unix-style ``ls -l`` lines."""
+    lines = []
+    for f in files:
+        ftype = "d" if f["type"] == "d" else "-"
+        perms = "rwxr-xr-x" if f["type"] == "d" else "rw-r--r--"
+        size = f["size"]
+        name = f["name"]
+        date = "Dec  5 12:00"
+
+        line = f"{ftype}{perms}   1 ftp      ftp  {size:>10} {date} {name}"
+        lines.append(line)
+    return lines
+
+
+def _encode_lines(lines: List[str]) -> bytes:
+    """Encode lines as one CRLF-terminated payload."""
+    return "".join(line + "\r\n" for line in lines).encode("utf-8")
+
+
+# The fake tree is static, so LIST and NLST payloads are built once
+FAKE_LISTING_BYTES: Dict[str, bytes] = {
+    path: _encode_lines(_format_listing(files))
+    for path, files in FAKE_FILES.items()
+}
+FAKE_NLST_BYTES: Dict[str, bytes] = {
+    path: _encode_lines(
+        [str(f["name"]) for f in files if f["name"] not in (".", "..")]
+    )
+    for path, files in FAKE_FILES.items()
+}
+
+# Full path -> size of every fake regular file, for SIZE
+FAKE_FILE_SIZES: Dict[str, int] = {
+    posixpath.join(path, str(f["name"])): int(f["size"])
+    for path, files in FAKE_FILES.items()
+    for f in files
+    if f["type"] == "-"
+}
+
+# Bait served for RETR, by the kind of file requested
+FAKE_FILE_CONTENTS: Dict[str, str] = {
+    "credentials": (
+        "# Credentials backup\n"
+        "admin:admin123\n"
+        "root:toor\n"
+        "ftpuser:ftp@2024!\n"
+        "backup:b4ckup_p4ss\n"
+    ),
+    "config": (
+        "<?php\n"
+        "define('DB_NAME', 'wordpress');\n"
+        "define('DB_USER', 'wp_admin');\n"
+        "define('DB_PASSWORD', 'S3cr3t_DB_P4ss!');\n"
+        "define('DB_HOST', 'localhost');\n"
+        "?>\n"
+    ),
+    "sql": (
+        "-- MySQL dump\n"
+        "-- Database: wordpress\n"
+        "CREATE TABLE users (id INT, username VARCHAR(255));\n"
+        "INSERT INTO users VALUES (1, 'admin');\n"
+    ),
+    "htaccess": (
+        "RewriteEngine On\n"
+        "RewriteRule ^admin /login.php [L]\n"
+    ),
+}
+FAKE_FILE_BYTES: Dict[str, bytes] = {
+    kind: content.encode("utf-8")
+    for kind, content in FAKE_FILE_CONTENTS.items()
+}
+
+
+def _fake_file_kind(filename: str) -> Optional[str]:
+    """Return the FAKE_FILE_CONTENTS key for a filename, if any."""
+    lower = filename.lower()
+    if "passwd" in lower or "credentials" in lower:
+        return "credentials"
+    if "config" in lower:
+        return "config"
+    if ".sql" in lower:
+        return "sql"
+    if ".htaccess" in lower:
+        return "htaccess"
+    return None
+
+
+# Commands refused with 530 before login, without reaching their handler
+_AUTH_REQUIRED = frozenset({
+    "PWD", "CWD", "CDUP", "MKD", "RMD", "SIZE", "RETR", "STOR",
+    "DELE", "RNFR", "RNTO", "PASV", "PORT", "LIST", "NLST",
+})
+
+# Fixed replies, encoded once; keyed by (code, message)
+_STATIC_RESPONSES: Dict[Tuple[int, str], bytes] = {
+    (code, message): f"{code} {message}\r\n".encode("utf-8")
+    for code, message in (
+        (150, "Here comes the directory listing."),
+        (150, "Ok to send data."),
+        (150, "Opening BINARY mode data connection."),
+        (200, "NOOP ok."),
+        (200, "PORT command successful. Use PASV instead."),
+        (200, "UTF8 set to on"),
+        (215, "UNIX Type: L8"),
+        (220, "Welcome to FTP server (vsFTPd 3.0.3)"),
+        (221, "Goodbye."),
+        (226, "Directory send OK."),
+        (226, "Transfer complete."),
+        (230, "Anonymous login ok, proceed."),
+        (230, "Login successful."),
+        (250, "Directory successfully changed."),
+        (331, "Please specify the password."),
+        (350, "Ready for destination name"),
+        (421, "Timeout."),
+        (421, "Too many connections."),
+        (425, "Cannot enter passive mode."),
+        (425, "Use PASV or PORT first."),
+        (501, "Option not understood"),
+        (502, "Command not implemented."),
+        (503, "Login with USER first."),
+        (504, "Type not implemented."),
+        (530, "Please login first."),
+        (550, "Could not get file size."),
+        (550, "Delete operation failed."),
+        (550, "Failed to change directory."),
+        (550, "Remove directory failed."),
+        (550, "Rename failed."),
+    )
+}
+
+
 class FTPClientHandler:
     """
     Handles a single FTP client connection.
@@ -61,6 +217,33 @@ class FTPClientHandler:
     Implements the FTP protocol commands and captures all activity.
     """
 
+    # Command name -> handler method name, built once per class
+    _HANDLERS: Dict[str, str] = {
+        "USER": "_cmd_user",
+        "PASS": "_cmd_pass",
+        "SYST": "_cmd_syst",
+        "FEAT": "_cmd_feat",
+        "PWD": "_cmd_pwd",
+        "CWD": "_cmd_cwd",
+        "CDUP": "_cmd_cdup",
+        "TYPE": "_cmd_type",
+        "PASV": "_cmd_pasv",
+        "LIST": "_cmd_list",
+        "NLST": "_cmd_nlst",
+        "RETR": "_cmd_retr",
+        "STOR": "_cmd_stor",
+        "DELE": "_cmd_dele",
+        "MKD": "_cmd_mkd",
+        "RMD": "_cmd_rmd",
+        "RNFR": "_cmd_rnfr",
+        "RNTO": "_cmd_rnto",
+        "SIZE": "_cmd_size",
+        "QUIT": "_cmd_quit",
+        "NOOP": "_cmd_noop",
+        "OPTS": "_cmd_opts",
+        "PORT": "_cmd_port",
+    }
+
     def __init__(
         self,
         reader: asyncio.StreamReader,
@@ -76,9 +259,14 @@ class FTPClientHandler:
         self.authenticated: bool = False
         self.current_dir: str = "/"
         self.attack_id: Optional[uuid.UUID] = None
-        self.session_id: Optional[uuid.UUID] = None
         self.commands: list = []
+        self._dropped_commands = 0
+        # Login attempts are written in one transaction at close
+        self._attack_time: Optional[datetime] = None
+        self._pending_credentials: List[Dict[str, Any]] = []
+        self.data_reader: Optional[asyncio.StreamReader] = None
         self.data_writer: Optional[asyncio.StreamWriter] = None
+        self._data_ready = asyncio.Event()
         self.passive_server: Optional[asyncio.Server] = None
         self.rename_from: Optional[str] = None
 
@@ -94,29 +282,37 @@ class FTPClientHandler:
             )
 
             # Send welcome banner
-            await self._send_response(
+            await self._send_static(
                 220, "Welcome to FTP server (vsFTPd 3.0.3)"
             )
 
-            # Process commands
+            # Process commands; one read may carry several pipelined lines
+            buffer = b""
             while True:
                 try:
                     data = await asyncio.wait_for(
-                        self.reader.readline(),
+                        self.reader.read(READ_CHUNK_SIZE),
                         timeout=self.honeypot.config.timeout or 30,
                     )
                 except asyncio.TimeoutError:
-                    await self._send_response(421, "Timeout.")
+                    await self._send_static(421, "Timeout.")
                     break
 
                 if not data:
                     break
 
-                line = data.decode("utf-8", errors="ignore").strip()
-                if not line:
-                    continue
+                *lines, buffer = (buffer + data).split(b"\n")
+                for raw in lines:
+                    line = raw.decode("utf-8", errors="ignore").strip()
+                    if line:
+                        await self._process_command(line)
 
-                await self._process_command(line)
+                if len(buffer) > MAX_LINE_LENGTH:
+                    logger.warning(
+                        "ftp_line_too_long",
+                        client_ip=self.client_ip,
+                    )
+                    break
 
         except ConnectionResetError:
             logger.debug(
@@ -143,14 +339,19 @@ class FTPClientHandler:
         self.writer.write(response.encode("utf-8"))
         await self.writer.drain()
 
+    async def _send_static(self, code: int, message: str) -> None:
+        """Send a fixed FTP response from the pre-encoded table."""
+        self.writer.write(_STATIC_RESPONSES[(code, message)])
+        await self.writer.drain()
+
     async def _send_multiline(self, code: int, lines: list) -> None:
         """Send a multiline FTP response."""
-        for i, line in enumerate(lines):
-            if i == len(lines) - 1:
-                response = f"{code} {line}\r\n"
-            else:
-                response = f"{code}-{line}\r\n"
-            self.writer.write(response.encode("utf-8"))
+        last = len(lines) - 1
+        response = "".join(
+            f"{code}{'-' if i < last else ' '}{line}\r\n"
+            for i, line in enumerate(lines)
+        )
+        self.writer.write(response.encode("utf-8"))
         await self.writer.drain()
 
     async def _process_command(self, line: str) -> None:
@@ -166,41 +367,22 @@ class FTPClientHandler:
             argument=arg if cmd != "PASS" else "***",
         )
 
-        # Record command
-        self.commands.append({
-            "cmd": cmd,
-            "arg": arg if cmd != "PASS" else "***",
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        })
+        # Record command; floods past the cap are only counted
+        if len(self.commands) < MAX_RECORDED_COMMANDS:
+            self.commands.append({
+                "cmd": cmd,
+                "arg": arg if cmd != "PASS" else "***",
+                # Epoch seconds; formatted once when the session is written
+                "timestamp": time.time(),
+            })
+        else:
+            self._dropped_commands += 1
 
-        # Command handlers
-        handlers = {
-            "USER": self._cmd_user,
-            "PASS": self._cmd_pass,
-            "SYST": self._cmd_syst,
-            "FEAT": self._cmd_feat,
-            "PWD": self._cmd_pwd,
-            "CWD": self._cmd_cwd,
-            "CDUP": self._cmd_cdup,
-            "TYPE": self._cmd_type,
-            "PASV": self._cmd_pasv,
-            "LIST": self._cmd_list,
-            "NLST": self._cmd_nlst,
-            "RETR": self._cmd_retr,
-            "STOR": self._cmd_stor,
-            "DELE": self._cmd_dele,
-            "MKD": self._cmd_mkd,
-            "RMD": self._cmd_rmd,
-            "RNFR": self._cmd_rnfr,
-            "RNTO": self._cmd_rnto,
-            "SIZE": self._cmd_size,
-            "QUIT": self._cmd_quit,
-            "NOOP": self._cmd_noop,
-            "OPTS": self._cmd_opts,
-            "PORT": self._cmd_port,
-        }
+        if not self.authenticated and cmd in _AUTH_REQUIRED:
+            await self._send_static(530, "Please login first.")
+            return
 
-        handler = handlers.get(cmd, self._cmd_unknown)
+        handler = getattr(self, self._HANDLERS.get(cmd, "_cmd_unknown"))
         await handler(arg)
 
     # --- Authentication Commands ---
@@ -212,12 +394,12 @@ class FTPClientHandler:
 
         if username.lower() == "anonymous" and self.honeypot.anonymous:
             self.authenticated = True
-            await self._record_attack()
-            await self._send_response(
+            self._record_attack()
+            await self._send_static(
                 230, "Anonymous login ok, proceed."
             )
         else:
-            await self._send_response(
+            await self._send_static(
                 331, "Please specify the password."
             )
 
@@ -226,16 +408,16 @@ class FTPClientHandler:
         self.password = password
 
         if not self.username:
-            await self._send_response(503, "Login with USER first.")
+            await self._send_static(503, "Login with USER first.")
             return
 
         # Log the credential attempt
-        await self._record_attack()
-        await self._record_credential()
+        self._record_attack()
+        self._record_credential()
 
         # Always allow login to capture more behavior
         self.authenticated = True
-        await self._send_response(230, "Login successful.")
+        await self._send_static(230, "Login successful.")
 
         logger.warning(
             "ftp_credential_captured",
@@ -247,7 +429,7 @@ class FTPClientHandler:
 
     async def _cmd_syst(self, arg: str) -> None:
         """Handle SYST command."""
-        await self._send_response(215, "UNIX Type: L8")
+        await self._send_static(215, "UNIX Type: L8")
 
     async def _cmd_feat(self, arg: str) -> None:
         """Handle FEAT command."""
@@ -264,39 +446,32 @@ class FTPClientHandler:
     async def _cmd_opts(self, arg: str) -> None:
         """Handle OPTS command."""
         if arg.upper().startswith("UTF8"):
-            await self._send_response(200, "UTF8 set to on")
+            await self._send_static(200, "UTF8 set to on")
         else:
-            await self._send_response(501, "Option not understood")
+            await self._send_static(501, "Option not understood")
 
     async def _cmd_noop(self, arg: str) -> None:
         """Handle NOOP command."""
-        await self._send_response(200, "NOOP ok.")
+        await self._send_static(200, "NOOP ok.")
 
     # --- Directory Commands ---
 
     async def _cmd_pwd(self, arg: str) -> None:
         """Handle PWD command."""
-        if not self.authenticated:
-            await self._send_response(530, "Please login first.")
-            return
         await self._send_response(
             257, f'"{self.current_dir}" is the current directory'
         )
 
     async def _cmd_cwd(self, path: str) -> None:
         """Handle CWD command."""
-        if not self.authenticated:
-            await self._send_response(530, "Please login first.")
-            return
-
         new_path = self._resolve_path(path)
         if new_path in FAKE_FILES:
             self.current_dir = new_path
-            await self._send_response(
+            await self._send_static(
                 250, "Directory successfully changed."
             )
         else:
-            await self._send_response(
+            await self._send_static(
                 550, "Failed to change directory."
             )
 
@@ -306,10 +481,6 @@ class FTPClientHandler:
 
     async def _cmd_mkd(self, path: str) -> None:
         """Handle MKD command."""
-        if not self.authenticated:
-            await self._send_response(530, "Please login first.")
-            return
-
         logger.warning(
             "ftp_mkdir_attempt",
             client_ip=self.client_ip,
@@ -321,16 +492,12 @@ class FTPClientHandler:
 
     async def _cmd_rmd(self, path: str) -> None:
         """Handle RMD command."""
-        if not self.authenticated:
-            await self._send_response(530, "Please login first.")
-            return
-
         logger.warning(
             "ftp_rmdir_attempt",
             client_ip=self.client_ip,
             path=path,
         )
-        await self._send_response(550, "Remove directory failed.")
+        await self._send_static(550, "Remove directory failed.")
 
     # --- File Commands ---
 
@@ -341,117 +508,110 @@ class FTPClientHandler:
                 200, f"Switching to {type_code.upper()} mode."
             )
         else:
-            await self._send_response(504, "Type not implemented.")
+            await self._send_static(504, "Type not implemented.")
 
     async def _cmd_size(self, path: str) -> None:
         """Handle SIZE command."""
-        if not self.authenticated:
-            await self._send_response(530, "Please login first.")
+        size = FAKE_FILE_SIZES.get(self._resolve_path(path))
+        if size is not None:
+            await self._send_response(213, str(size))
             return
 
-        full_path = self._resolve_path(path)
-        dir_path = "/".join(full_path.rsplit("/", 1)[:-1]) or "/"
-        filename = full_path.rsplit("/", 1)[-1]
-
-        files = FAKE_FILES.get(dir_path, [])
-        for f in files:
-            if f["name"] == filename:
-                await self._send_response(213, str(f["size"]))
-                return
-
-        await self._send_response(550, "Could not get file size.")
+        await self._send_static(550, "Could not get file size.")
 
     async def _cmd_retr(self, path: str) -> None:
         """Handle RETR (download) command."""
-        if not self.authenticated:
-            await self._send_response(530, "Please login first.")
-            return
-
         logger.warning(
             "ftp_download_attempt",
             client_ip=self.client_ip,
             path=path,
         )
 
-        if not self.data_writer:
-            await self._send_response(
+        if not await self._wait_for_data_connection():
+            await self._send_static(
                 425, "Use PASV or PORT first."
             )
             return
 
-        await self._send_response(
+        await self._send_static(
             150, "Opening BINARY mode data connection."
         )
 
         # Send fake file content
-        fake_content = self._get_fake_file_content(path)
+        kind = _fake_file_kind(path)
+        if kind is None:
+            content = self._get_fake_file_content(path).encode("utf-8")
+        else:
+            content = FAKE_FILE_BYTES[kind]
         try:
-            self.data_writer.write(fake_content.encode("utf-8"))
+            self.data_writer.write(content)
             await self.data_writer.drain()
         finally:
             self.data_writer.close()
             self.data_writer = None
 
-        await self._send_response(226, "Transfer complete.")
+        await self._send_static(226, "Transfer complete.")
 
     async def _cmd_stor(self, path: str) -> None:
         """Handle STOR (upload) command."""
-        if not self.authenticated:
-            await self._send_response(530, "Please login first.")
-            return
-
         logger.warning(
             "ftp_upload_attempt",
             client_ip=self.client_ip,
             path=path,
         )
 
-        if not self.data_writer:
-            await self._send_response(425, "Use PASV or PORT first.")
+        if not await self._wait_for_data_connection():
+            await self._send_static(425, "Use PASV or PORT first.")
             return
 
-        await self._send_response(
+        await self._send_static(
             150, "Ok to send data."
         )
 
-        # Read and discard the uploaded data
+        # Read and discard the uploaded data, up to MAX_STOR_BYTES
+        received = 0
         try:
-            # Read from passive connection reader
+            if self.data_reader:
+                while received < MAX_STOR_BYTES:
+                    chunk = await asyncio.wait_for(
+                        self.data_reader.read(STOR_CHUNK_SIZE),
+                        timeout=self.honeypot.config.timeout or 30,
+                    )
+                    if not chunk:
+                        break
+                    received += len(chunk)
+        except asyncio.TimeoutError:
             pass
         finally:
+            self.data_reader = None
             if self.data_writer:
                 self.data_writer.close()
                 self.data_writer = None
 
-        await self._send_response(226, "Transfer complete.")
+        logger.info(
+            "ftp_upload_received",
+            client_ip=self.client_ip,
+            path=path,
+            size=received,
+        )
+        await self._send_static(226, "Transfer complete.")
 
     async def _cmd_dele(self, path: str) -> None:
         """Handle DELE command."""
-        if not self.authenticated:
-            await self._send_response(530, "Please login first.")
-            return
-
         logger.warning(
             "ftp_delete_attempt",
             client_ip=self.client_ip,
             path=path,
         )
-        await self._send_response(550, "Delete operation failed.")
+        await self._send_static(550, "Delete operation failed.")
 
     async def _cmd_rnfr(self, path: str) -> None:
         """Handle RNFR (rename from) command."""
-        if not self.authenticated:
-            await self._send_response(530, "Please login first.")
-            return
         self.rename_from = path
-        await self._send_response(350, "Ready for destination name")
+        await self._send_static(350, "Ready for destination name")
 
     async def _cmd_rnto(self, path: str) -> None:
         """Handle RNTO (rename to) command."""
-        if not self.authenticated:
-            await self._send_response(530, "Please login first.")
-            return
-
         logger.warning(
             "ftp_rename_attempt",
             client_ip=self.client_ip,
@@ -459,23 +619,21 @@ class FTPClientHandler:
             to_path=path,
         )
         self.rename_from = None
-        await self._send_response(550, "Rename failed.")
+        await self._send_static(550, "Rename failed.")
 
     # --- Data Transfer Commands ---
 
     async def _cmd_pasv(self, arg: str) -> None:
         """Handle PASV command."""
-        if not self.authenticated:
-            await self._send_response(530, "Please login first.")
-            return
-
-        # Create a passive data connection server
+        # One passive listener serves every transfer of the session; it
+        # is closed with the control connection
         try:
-            self.passive_server = await asyncio.start_server(
-                self._handle_passive_connection,
-                "0.0.0.0",
-                0,  # Let OS pick a port
-            )
+            if self.passive_server is None:
+                self.passive_server = await asyncio.start_server(
+                    self._handle_passive_connection,
+                    "0.0.0.0",
+                    0,  # Let OS pick a port
+                )
             addr = self.passive_server.sockets[0].getsockname()
             ip = self.honeypot.host
             if ip == "0.0.0.0":
@@ -491,18 +649,14 @@ class FTPClientHandler:
             )
         except Exception as e:
             logger.error("ftp_pasv_failed", error=str(e))
-            await self._send_response(
+            await self._send_static(
                 425, "Cannot enter passive mode."
             )
 
     async def _cmd_port(self, arg: str) -> None:
         """Handle PORT command (active mode)."""
-        if not self.authenticated:
-            await self._send_response(530, "Please login first.")
-            return
-
         # We don't support active mode in the honeypot
-        await self._send_response(
+        await self._send_static(
             200, "PORT command successful. Use PASV instead."
         )
 
@@ -512,232 +666,128 @@ class FTPClientHandler:
         writer: asyncio.StreamWriter,
     ) -> None:
         """Handle incoming passive data connection."""
+        self.data_reader = reader
         self.data_writer = writer
+        self._data_ready.set()
+
+    async def _wait_for_data_connection(self) -> bool:
+        """
+        Wait for the client to open the passive data connection.
+
+        Clients often send LIST or RETR right after PASV, before their
+        data connection has been accepted.
+
+        Returns:
+            True if a data connection is available.
+        """
+        if self.data_writer is None and self.passive_server is not None:
+            try:
+                await asyncio.wait_for(
+                    self._data_ready.wait(), DATA_CONNECTION_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                pass
+        self._data_ready.clear()
+        return self.data_writer is not None
 
     async def _cmd_list(self, path: str) -> None:
         """Handle LIST command."""
-        if not self.authenticated:
-            await self._send_response(530, "Please login first.")
+        if not await self._wait_for_data_connection():
+            await self._send_static(
+                425, "Use PASV or PORT first."
+            )
             return
 
-        if not self.data_writer:
-            # Wait a moment for passive connection
-            await asyncio.sleep(0.5)
-            if not self.data_writer:
-                await self._send_response(
-                    425, "Use PASV or PORT first."
-                )
-                return
-
-        await self._send_response(
+        await self._send_static(
             150, "Here comes the directory listing."
         )
 
-        # Generate directory listing
         target_dir = self._resolve_path(path) if path else self.current_dir
-        listing = self._generate_listing(target_dir)
 
         try:
-            for line in listing:
-                self.data_writer.write((line + "\r\n").encode("utf-8"))
+            self.data_writer.write(FAKE_LISTING_BYTES.get(target_dir, b""))
             await self.data_writer.drain()
         finally:
             self.data_writer.close()
             self.data_writer = None
-            if self.passive_server:
-                self.passive_server.close()
-                self.passive_server = None
 
-        await self._send_response(226, "Directory send OK.")
+        await self._send_static(226, "Directory send OK.")
 
     async def _cmd_nlst(self, path: str) -> None:
         """Handle NLST command (name list)."""
-        if not self.authenticated:
-            await self._send_response(530, "Please login first.")
-            return
-
-        if not self.data_writer:
-            await self._send_response(425, "Use PASV or PORT first.")
+        if not await self._wait_for_data_connection():
+            await self._send_static(425, "Use PASV or PORT first.")
             return
 
-        await self._send_response(
+        await self._send_static(
             150, "Here comes the directory listing."
         )
 
         target_dir = self._resolve_path(path) if path else self.current_dir
-        files = FAKE_FILES.get(target_dir, [])
 
         try:
-            for f in files:
-                if f["name"] not in (".", ".."):
-                    line = str(f["name"]) + "\r\n"
-                    self.data_writer.write(line.encode("utf-8"))
+            self.data_writer.write(FAKE_NLST_BYTES.get(target_dir, b""))
             await self.data_writer.drain()
         finally:
             self.data_writer.close()
             self.data_writer = None
 
-        await self._send_response(226, "Directory send OK.")
+        await self._send_static(226, "Directory send OK.")
 
     async def _cmd_quit(self, arg: str) -> None:
         """Handle QUIT command."""
-        await self._send_response(221, "Goodbye.")
+        await self._send_static(221, "Goodbye.")
 
     async def _cmd_unknown(self, arg: str) -> None:
         """Handle unknown commands."""
-        await self._send_response(502, "Command not implemented.")
+        await self._send_static(502, "Command not implemented.")
 
     # --- Helper Methods ---
 
     def _resolve_path(self, path: str) -> str:
         """Resolve a path relative to current directory."""
-        if not path:
-            return self.current_dir
+        return self._resolve(self.current_dir, path)
 
-        if path.startswith("/"):
-            result = path
-        else:
-            if self.current_dir == "/":
-                result = "/" + path
-            else:
-                result = self.current_dir + "/" + path
-
-        # Handle . and ..
-        parts = result.split("/")
-        resolved: List[str] = []
-        for part in parts:
-            if part == "..":
-                if resolved:
-                    resolved.pop()
-            elif part and part != ".":
-                resolved.append(part)
-
-        return "/" + "/".join(resolved) if resolved else "/"
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _resolve(current: str, path: str) -> str:
+        """Resolve ``path`` against ``current``, handling . and .."""
+        if not path:
+            return current
+        resolved = posixpath.normpath(posixpath.join(current, path))
+        # normpath keeps a leading "//"; the fake tree has a single root
+        return "/" + resolved.lstrip("/")
 
     def _generate_listing(self, path: str) -> list:
         """Generate a Unix-style directory listing."""
-        files = FAKE_FILES.get(path, [])
-        lines = []
-
-        for f in files:
-            ftype = "d" if f["type"] == "d" else "-"
-            perms = "rwxr-xr-x" if f["type"] == "d" else "rw-r--r--"
-            size = f["size"]
-            name = f["name"]
-            date = "Dec  5 12:00"
-
-            line = f"{ftype}{perms}   1 ftp      ftp  {size:>10} {date} {name}"
-            lines.append(line)
-
-        return lines
+        return _format_listing(FAKE_FILES.get(path, []))
 
     def _get_fake_file_content(self, filename: str) -> str:
         """Return fake content for requested files."""
-        lower = filename.lower()
-
-        if "passwd" in lower or "credentials" in lower:
-            return (
-                "# Credentials backup\n"
-                "admin:admin123\n"
-                "root:toor\n"
-                "ftpuser:ftp@2024!\n"
-                "backup:b4ckup_p4ss\n"
-            )
-        elif "config" in lower or "wp-config" in lower:
-            return (
-                "<?php\n"
-                "define('DB_NAME', 'wordpress');\n"
-                "define('DB_USER', 'wp_admin');\n"
-                "define('DB_PASSWORD', 'S3cr3t_DB_P4ss!');\n"
-                "define('DB_HOST', 'localhost');\n"
-                "?>\n"
-            )
-        elif ".sql" in lower:
-            return (
-                "-- MySQL dump\n"
-                "-- Database: wordpress\n"
-                "CREATE TABLE users (id INT, username VARCHAR(255));\n"
-                "INSERT INTO users VALUES (1, 'admin');\n"
-            )
-        elif ".htaccess" in lower:
-            return (
-                "RewriteEngine On\n"
-                "RewriteRule ^admin /login.php [L]\n"
-            )
-        else:
+        kind = _fake_file_kind(filename)
+        if kind is None:
             return f"Content of {filename}\n"
+        return FAKE_FILE_CONTENTS[kind]
 
     # --- Database Recording ---
 
-    async def _record_attack(self) -> None:
-        """Record the attack in the database."""
-        try:
-            async with AsyncSessionLocal() as session:
-                attack = Attack(
-                    ip=self.client_ip,
-                    service="ftp",
-                    threat_type="credential_attack",
-                    payload={
-                        "username": self.username,
-                        "anonymous": self.username == "anonymous",
-                    },
-                )
-                session.add(attack)
-                await session.flush()
-                self.attack_id = attack.id  # type: ignore
-
-                # Create session record
-                sess = Session(
-                    attack_id=attack.id,  # type: ignore
-                    commands=self.commands,
-                )
-                session.add(sess)
-                await session.flush()
-                self.session_id = sess.id  # type: ignore
-
-                await session.commit()
-                logger.info(
-                    "ftp_attack_recorded",
-                    attack_id=str(attack.id),
-                    client_ip=self.client_ip,
-                )
-        except Exception as e:
-            logger.error("ftp_attack_record_failed", error=str(e))
-
-    async def _record_credential(self) -> None:
-        """Record captured credentials."""
-        if not self.attack_id:
-            return
-
-        try:
-            async with AsyncSessionLocal() as session:
-                credential = Credential(
-                    attack_id=self.attack_id,
-                    username=self.username or "",
-                    password=self.password or "",
-                    success=True,
-                )
-                session.add(credential)
-                await session.commit()
-        except Exception as e:
-            logger.error("ftp_credential_record_failed", error=str(e))
+    def _record_attack(self) -> None:
+        """Note that this connection is an attack; written at close."""
+        if self._attack_time is None:
+            self._attack_time = datetime.now(timezone.utc)
+
+    def _record_credential(self) -> None:
+        """Queue the captured credentials; written at close."""
+        self._pending_credentials.append({
+            "username": self.username or "",
+            "password": self.password or "",
+            "success": True,
+        })
 
     async def _close_session(self) -> None:
-        """Close and update the session."""
-        if not self.session_id:
-            return
-
-        try:
-            async with AsyncSessionLocal() as session:
-                result = await session.get(Session, self.session_id)
-                if result:
-                    # Explicitly cast or ignore type check for SQLAlchemy
-                    # model assignment if mypy complains about Column vs Type
-                    result.end_time = datetime.now(timezone.utc)  # type: ignore  # noqa: E501
-                    result.commands = self.commands  # type: ignore
-                    await session.commit()
-        except Exception as e:
-            logger.error("ftp_session_close_failed", error=str(e))
+        """Queue the attack, its credentials and the session for writing."""
+        if self._attack_time is not None:
+            self._queue_records()
 
         if self.passive_server:
             self.passive_server.close()
@@ -745,7 +795,56 @@ class FTPClientHandler:
         logger.info(
             "ftp_connection_closed",
             client_ip=self.client_ip,
-            commands_count=len(self.commands),
+            commands_count=len(self.commands) + self._dropped_commands,
+        )
+
+    def _queue_records(self) -> None:
+        """Hand the pending rows to the honeypot's background writer."""
+        # Core inserts do not return keys, so link rows by a known id
+        attack_id = uuid.uuid4()
+        recorder = self.honeypot.recorder
+        recorder.add(Attack.__table__, {
+            "id": attack_id,
+            "ip": self.client_ip,
+            "service": "ftp",
+            "threat_type": "credential_attack",
+            "payload": {
+                "username": self.username,
+                "anonymous": self.username == "anonymous",
+            },
+            "timestamp": self._attack_time,
+        })
+        for credential in self._pending_credentials:
+            recorder.add(
+                Credential.__table__, dict(credential, attack_id=attack_id)
+            )
+        commands = [
+            dict(
+                entry,
+                timestamp=datetime.fromtimestamp(
+                    entry["timestamp"], timezone.utc
+                ).isoformat(),
+            )
+            for entry in self.commands
+        ]
+        if self._dropped_commands:
+            commands.append({
+                "cmd": TRUNCATED_COMMAND,
+                "arg": str(self._dropped_commands),
+            })
+        recorder.add(Session.__table__, {
+            "attack_id": attack_id,
+            "start_time": self._attack_time,
+            "end_time": datetime.now(timezone.utc),
+            "commands": commands,
+        })
+        self.attack_id = attack_id
+        self._attack_time = None
+        self._pending_credentials.clear()
+        logger.info(
+            "ftp_attack_recorded",
+            attack_id=str(attack_id),
+            client_ip=self.client_ip,
         )
 
 
@@ -762,7 +861,11 @@ class FTPHoneypot:
         self.port = config.port
         self.anonymous = config.anonymous_allowed
         self.server: Optional[asyncio.Server] = None
+        self.recorder = BatchWriter()
+        self._semaphore = asyncio.Semaphore(config.max_connections)
         self._running = False
+        # Connected clients; their rows are queued when they close
+        self._handlers: Set[FTPClientHandler] = set()
 
     async def start(self) -> None:
         """Start the FTP honeypot server."""
@@ -782,8 +885,10 @@ class FTPHoneypot:
                 self._handle_client,
                 self.host,
                 self.port,
+                backlog=LISTEN_BACKLOG,
             )
 
+            self.recorder.start()
             self._running = True
             logger.info(
                 "ftp_honeypot_started",
@@ -804,8 +909,20 @@ class FTPHoneypot:
         writer: asyncio.StreamWriter,
     ) -> None:
         """Handle a new FTP client connection."""
-        handler = FTPClientHandler(reader, writer, self)
-        await handler.handle()
+        if self._semaphore.locked():
+            # Turn the client away instead of queueing it behind the cap
+            writer.write(_STATIC_RESPONSES[(421, "Too many connections.")])
+            writer.close()
+            logger.warning("ftp_connection_rejected", reason="max_connections")
+            return
+
+        async with self._semaphore:
+            handler = FTPClientHandler(reader, writer, self)
+            self._handlers.add(handler)
+            try:
+                await handler.handle()
+            finally:
+                self._handlers.discard(handler)
 
     async def stop(self) -> None:
         """Stop the FTP honeypot server."""
@@ -819,6 +936,14 @@ class FTPHoneypot:
             self.server.close()
             await self.server.wait_closed()
 
+        # Queue the rows of clients still connected, then write whatever
+        # is pending; server.close() leaves their connections open
+        for handler in list(self._handlers):
+            if handler._attack_time is not None:
+                handler._queue_records()
+            handler.writer.close()
+        await self.recorder.stop()
+
         self._running = False
         logger.info("ftp_honeypot_stopped")
 
@@ -6,21 +6,91 @@ Provides a fake SSH server that captures credentials and simulates
 a minimal shell environment for attacker interaction logging.
 """
 import asyncio
+import os
+import time
 import uuid
 from datetime import datetime, timezone
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Dict, Set
 
 import asyncssh
 import structlog
 
 from tenebrinet.core.config import SSHServiceConfig
-from tenebrinet.core.database import AsyncSessionLocal
 from tenebrinet.core.models import Attack, Credential, Session
+from tenebrinet.core.recorder import BatchWriter
 
 
 logger = structlog.get_logger()
 
 
+# Canned output of common reconnaissance commands, by exact command line
+# or by command name
+_FAKE_RESPONSES: Dict[str, str] = {
+    "whoami": "root",
+    "id": "uid=0(root) gid=0(root) groups=0(root)",
+    "pwd": "/root",
+    "uname": "Linux",
+    "uname -a": (
+        "Linux honeypot 5.4.0-89-generic #100-Ubuntu SMP "
+        "Fri Sep 24 14:50:10 UTC 2021 x86_64 GNU/Linux"
+    ),
+    "hostname": "honeypot",
+    "uptime": (
+        " 14:32:45 up 127 days, 3:42, 1 user, load average: "
+        "0.00, 0.01, 0.05"
+    ),
+    "cat /etc/passwd": (
+        "root:x:0:0:root:/root:/bin/bash\n"
+        "daemon:x:1:1:daemon:/usr/sbin:/usr/sbin/nologin\n"
+        "bin:x:2:2:bin:/bin:/usr/sbin/nologin\n"
+        "sys:x:3:3:sys:/dev:/usr/sbin/nologin\n"
+        "www-data:x:33:33:www-data:/var/www:/usr/sbin/nologin"
+    ),
+    "ls": "Desktop  Documents  Downloads  Music  Pictures",
+    "ls -la": (
+        "total 32\n"
+        "drwx------  5 root root 4096 Dec  2 14:23 .\n"
+        "drwxr-xr-x 20 root root 4096 Nov 15 10:00 ..\n"
+        "-rw-------  1 root root  220 Nov 15 10:00 .bash_logout\n"
+        "-rw-------  1 root root 3771 Nov 15 10:00 .bashrc\n"
+        "drwx------  2 root root 4096 Nov 15 10:00 .ssh"
+    ),
+    "w": (
+        " 14:32:45 up 127 days, 1 user, load average: 0.00\n"
+        "USER     TTY      FROM             LOGIN@   IDLE\n"
+        "root     pts/0    192.168.1.100    14:32    0.00s"
+    ),
+    "exit": "",
+    "logout": "",
+    # Builtins that print nothing when they succeed
+    "cd": "",
+    "export": "",
+    "source": "",
+    ".": "",
+}
+
+LOGIN_BANNER = (
+    "\r\n"
+    "Welcome to Ubuntu 20.04.3 LTS "
+    "(GNU/Linux 5.4.0-89-generic x86_64)\r\n"
+    "\r\n"
+    " * Documentation:  https://help.ubuntu.com\r\n"
+    " * Management:     https://landscape.canonical.com\r\n"
+    " * Support:        https://ubuntu.com/advantage\r\n"
+    "\r\n"
+    "Last login: Mon Dec  2 14:23:45 2024 from 192.168.1.1\r\n"
+)
+
+SHELL_PROMPT = "root@honeypot:~# "
+
+_BANNER_AND_PROMPT = LOGIN_BANNER + SHELL_PROMPT
+
+# An open session's new commands are written once this many are pending
+SESSION_FLUSH_COMMANDS = 10
+# ...or this many seconds after the first of them was entered
+SESSION_FLUSH_INTERVAL = 5.0
+
+
 class SSHHoneypotServer(asyncssh.SSHServer):
     """
     SSH Server handler for the honeypot.
@@ -64,6 +134,10 @@ class SSHHoneypotServer(asyncssh.SSHServer):
         )
         return True
 
+    def session_requested(self) -> "SSHHoneypotSession":
+        """Open the fake shell for each session the client requests."""
+        return SSHHoneypotSession(self)
+
     def password_auth_supported(self) -> bool:
         """Enable password authentication."""
         return True
@@ -81,53 +155,41 @@ class SSHHoneypotServer(asyncssh.SSHServer):
             password=password,
         )
 
-        # Store the attack in the database
-        await self._record_attack(username, password)
+        # Queue the attack for the database
+        self._record_attack(username, password)
 
         # Always return True to allow the attacker to "login"
         # This lets us capture more information about their behavior
         return True
 
-    async def _record_attack(self, username: str, password: str) -> None:
-        """Record the attack attempt in the database."""
-        try:
-            async with AsyncSessionLocal() as session:
-                # Create the attack record
-                attack = Attack(
-                    ip=self.client_ip or "unknown",
-                    service="ssh",
-                    threat_type="credential_attack",
-                    payload={
-                        "username": username,
-                        "password_length": len(password),
-                    },
-                )
-                session.add(attack)
-                await session.flush()
-
-                self.attack_id = attack.id  # type: ignore
-
-                # Create the credential record
-                credential = Credential(
-                    attack_id=attack.id,  # type: ignore
-                    username=username,
-                    password=password,
-                    success=True,  # We let them "succeed"
-                )
-                session.add(credential)
-
-                await session.commit()
-                logger.info(
-                    "ssh_attack_recorded",
-                    attack_id=str(attack.id),
-                    client_ip=self.client_ip,
-                )
-        except Exception as e:
-            logger.error(
-                "ssh_attack_record_failed",
-                error=str(e),
-                client_ip=self.client_ip,
-            )
+    def _record_attack(self, username: str, password: str) -> None:
+        """Queue the attack attempt for the background writer."""
+        # Core inserts do not return keys, so link rows by a known id
+        attack_id = uuid.uuid4()
+        recorder = self.honeypot.recorder
+        recorder.add(Attack.__table__, {
+            "id": attack_id,
+            "ip": self.client_ip or "unknown",
+            "service": "ssh",
+            "threat_type": "credential_attack",
+            "payload": {
+                "username": username,
+                "password_length": len(password),
+            },
+            "timestamp": datetime.now(timezone.utc),
+        })
+        recorder.add(Credential.__table__, {
+            "attack_id": attack_id,
+            "username": username,
+            "password": password,
+            "success": True,  # We let them "succeed"
+        })
+        self.attack_id = attack_id
+        logger.info(
+            "ssh_attack_recorded",
+            attack_id=str(attack_id),
+            client_ip=self.client_ip,
+        )
 
 
 class SSHHoneypotSession(asyncssh.SSHServerSession):
@@ -140,6 +202,12 @@ class SSHHoneypotSession(asyncssh.SSHServerSession):
         self.commands: list = []
         self.session_id: Optional[uuid.UUID] = None
         self._chan: Optional[asyncssh.SSHServerChannel] = None
+        self._start_time: Optional[datetime] = None
+        # Every command of the session, with epoch-second timestamps
+        self._recorded_commands: List[Dict[str, Any]] = []
+        # Commands already queued, with ISO 8601 timestamps
+        self._queued_commands: List[Dict[str, Any]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
 
     def connection_made(self, chan: asyncssh.SSHServerChannel) -> None:
         """Called when the session channel is opened."""
@@ -162,61 +230,48 @@ class SSHHoneypotSession(asyncssh.SSHServerSession):
         if not self._chan:
             return
 
-        # Create session record in database
-        await self._create_session_record()
-
-        # Send fake banner
-        banner = (
-            "\r\n"
-            "Welcome to Ubuntu 20.04.3 LTS "
-            "(GNU/Linux 5.4.0-89-generic x86_64)\r\n"
-            "\r\n"
-            " * Documentation:  https://help.ubuntu.com\r\n"
-            " * Management:     https://landscape.canonical.com\r\n"
-            " * Support:        https://ubuntu.com/advantage\r\n"
-            "\r\n"
-            "Last login: Mon Dec  2 14:23:45 2024 from 192.168.1.1\r\n"
-        )
-        self._chan.write(banner)
-
-        # Show prompt
-        self._send_prompt()
+        # Start the session record
+        self._create_session_record()
 
-    def _send_prompt(self) -> None:
-        """Send the fake shell prompt."""
-        if self._chan:
-            self._chan.write("root@honeypot:~# ")
+        # Send fake banner and the first prompt
+        self._chan.write(_BANNER_AND_PROMPT)
 
     def data_received(self, data: str, datatype: asyncssh.DataType) -> None:
         """Handle data received from the client."""
-        # Echo the character back
-        if self._chan:
-            self._chan.write(data)
-
-        # Handle command input
-        if data == "\r" or data == "\n":
-            if self.commands:
-                cmd = "".join(self.commands).strip()
-                if cmd:
-                    asyncio.create_task(self._handle_command(cmd))
+        # One chunk can hold many keystrokes (e.g. a paste); echo them and
+        # any prompts back in a single write
+        output: List[str] = []
+        for char in data:
+            # Echo the character back
+            output.append(char)
+
+            # Handle command input
+            if char == "\r" or char == "\n":
+                if self.commands:
+                    cmd = "".join(self.commands).strip()
+                    if cmd:
+                        asyncio.create_task(self._handle_command(cmd))
+                    self.commands = []
+                output.append("\r\n" + SHELL_PROMPT)
+            elif char == "\x7f":  # Backspace
+                if self.commands:
+                    self.commands.pop()
+                    output.append("\b \b")
+            elif char == "\x03":  # Ctrl+C
+                output.append("^C\r\n" + SHELL_PROMPT)
                 self.commands = []
-            if self._chan:
-                self._chan.write("\r\n")
-                self._send_prompt()
-        elif data == "\x7f":  # Backspace
-            if self.commands:
-                self.commands.pop()
-                if self._chan:
-                    self._chan.write("\b \b")
-        elif data == "\x03":  # Ctrl+C
-            if self._chan:
-                self._chan.write("^C\r\n")
-                self._send_prompt()
-            self.commands = []
-        elif data == "\x04":  # Ctrl+D (EOF)
-            self.eof_received()
-        else:
-            self.commands.append(data)
+            elif char == "\x04":  # Ctrl+D (EOF)
+                self._write_output(output)
+                self.eof_received()
+                return
+            else:
+                self.commands.append(char)
+        self._write_output(output)
+
+    def _write_output(self, output: List[str]) -> None:
+        """Write buffered terminal output in one channel write."""
+        if output and self._chan:
+            self._chan.write("".join(output))
 
     async def _handle_command(self, command: str) -> None:
         """Handle a command entered by the attacker."""
@@ -226,115 +281,92 @@ class SSHHoneypotSession(asyncssh.SSHServerSession):
             command=command,
         )
 
+        # Record first: "exit" ends the session while responding
+        self._record_command(command)
+
         # Generate fake responses for common commands
         response = self._generate_fake_response(command)
         if response and self._chan:
             self._chan.write(response + "\r\n")
 
-        # Update session with command
-        await self._record_command(command)
-
     def _generate_fake_response(self, command: str) -> str:
         """Generate fake responses to common commands."""
-        cmd_lower = command.lower().strip()
-        cmd_base = cmd_lower.split()[0] if cmd_lower else ""
-
-        fake_responses = {
-            "whoami": "root",
-            "id": "uid=0(root) gid=0(root) groups=0(root)",
-            "pwd": "/root",
-            "uname": "Linux",
-            "uname -a": (
-                "Linux honeypot 5.4.0-89-generic #100-Ubuntu SMP "
-                "Fri Sep 24 14:50:10 UTC 2021 x86_64 GNU/Linux"
-            ),
-            "hostname": "honeypot",
-            "uptime": (
-                " 14:32:45 up 127 days, 3:42, 1 user, load average: "
-                "0.00, 0.01, 0.05"
-            ),
-            "cat /etc/passwd": (
-                "root:x:0:0:root:/root:/bin/bash\n"
-                "daemon:x:1:1:daemon:/usr/sbin:/usr/sbin/nologin\n"
-                "bin:x:2:2:bin:/bin:/usr/sbin/nologin\n"
-                "sys:x:3:3:sys:/dev:/usr/sbin/nologin\n"
-                "www-data:x:33:33:www-data:/var/www:/usr/sbin/nologin"
-            ),
-            "ls": "Desktop  Documents  Downloads  Music  Pictures",
-            "ls -la": (
-                "total 32\n"
-                "drwx------  5 root root 4096 Dec  2 14:23 .\n"
-                "drwxr-xr-x 20 root root 4096 Nov 15 10:00 ..\n"
-                "-rw-------  1 root root  220 Nov 15 10:00 .bash_logout\n"
-                "-rw-------  1 root root 3771 Nov 15 10:00 .bashrc\n"
-                "drwx------  2 root root 4096 Nov 15 10:00 .ssh"
-            ),
-            "w": (
-                " 14:32:45 up 127 days, 1 user, load average: 0.00\n"
-                "USER     TTY      FROM             LOGIN@   IDLE\n"
-                "root     pts/0    192.168.1.100    14:32    0.00s"
-            ),
-            "exit": "",
-            "logout": "",
-        }
-
-        # Check for exact match first
-        if cmd_lower in fake_responses:
-            if cmd_lower in ("exit", "logout"):
-                self.eof_received()
-                return ""
-            return fake_responses[cmd_lower]
-
-        # Check base command
-        if cmd_base in fake_responses:
-            return fake_responses[cmd_base]
-
-        # Default: command not found
-        if cmd_base and cmd_base not in ("cd", "export", "source", "."):
-            return f"-bash: {cmd_base}: command not found"
-
-        return ""
-
-    async def _create_session_record(self) -> None:
-        """Create a session record in the database."""
+        cmd_lower = command.strip().lower()
+        if cmd_lower in ("exit", "logout"):
+            self.eof_received()
+            return ""
+
+        # Exact command line first, then the command name
+        response = _FAKE_RESPONSES.get(cmd_lower)
+        if response is None and cmd_lower:
+            # Split once at most; only the command name is needed
+            cmd_base = cmd_lower.split(maxsplit=1)[0]
+            response = _FAKE_RESPONSES.get(cmd_base)
+            if response is None:
+                return f"-bash: {cmd_base}: command not found"
+        return response or ""
+
+    def _create_session_record(self) -> None:
+        """Queue the session row; commands are added to it as updates."""
         if not self.server.attack_id:
             return
 
-        try:
-            async with AsyncSessionLocal() as db_session:
-                session = Session(
-                    attack_id=self.server.attack_id,  # type: ignore
-                    commands=[],
-                )
-                db_session.add(session)
-                await db_session.commit()
-                self.session_id = session.id  # type: ignore
-                logger.info(
-                    "ssh_session_created",
-                    session_id=str(session.id),
-                    attack_id=str(self.server.attack_id),
-                )
-        except Exception as e:
-            logger.error("ssh_session_create_failed", error=str(e))
+        self.session_id = uuid.uuid4()
+        self._start_time = datetime.now(timezone.utc)
+        self.server.honeypot._open_sessions.add(self)
+        self.server.honeypot.recorder.add(Session.__table__, {
+            "id": self.session_id,
+            "attack_id": self.server.attack_id,
+            "start_time": self._start_time,
+            "commands": [],
+        })
+        logger.info(
+            "ssh_session_created",
+            session_id=str(self.session_id),
+            attack_id=str(self.server.attack_id),
+        )
 
-    async def _record_command(self, command: str) -> None:
+    def _record_command(self, command: str) -> None:
         """Record a command in the session."""
         if not self.session_id:
             return
 
-        try:
-            async with AsyncSessionLocal() as db_session:
-                result = await db_session.get(Session, self.session_id)
-                if result:
-                    commands: List[Any] = result.commands or []  # type: ignore
-                    commands.append({
-                        "cmd": command,
-                        "timestamp": datetime.now(timezone.utc).isoformat(),
-                    })
-                    result.commands = commands  # type: ignore
-                    await db_session.commit()
-        except Exception as e:
-            logger.error("ssh_command_record_failed", error=str(e))
+        # Epoch seconds; formatted once when the command is queued
+        self._recorded_commands.append({
+            "cmd": command,
+            "timestamp": time.time(),
+        })
+
+        # Write commands while the session is open, so a crash loses at
+        # most the last few and the API shows long sessions as they go
+        pending = len(self._recorded_commands) - len(self._queued_commands)
+        if pending >= SESSION_FLUSH_COMMANDS:
+            self._queue_commands()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                SESSION_FLUSH_INTERVAL, self._queue_commands
+            )
+
+    def _queue_commands(self, **values: Any) -> None:
+        """Queue an update of the session row with every command so far."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        self._queued_commands.extend(
+            dict(
+                entry,
+                timestamp=datetime.fromtimestamp(
+                    entry["timestamp"], timezone.utc
+                ).isoformat(),
+            )
+            for entry in self._recorded_commands[len(self._queued_commands):]
+        )
+        self.server.honeypot.recorder.update(Session.__table__, {
+            "id": self.session_id,
+            "commands": list(self._queued_commands),
+            **values,
+        })
 
     def eof_received(self) -> bool:
         """Handle EOF (session end)."""
@@ -344,27 +376,28 @@ class SSHHoneypotSession(asyncssh.SSHServerSession):
             session_id=str(self.session_id) if self.session_id else None,
         )
 
-        # Update session end time
-        asyncio.create_task(self._close_session())
+        # Queue the finished session
+        self._close_session()
 
         if self._chan:
             self._chan.write("\r\nlogout\r\n")
             self._chan.close()
         return True
 
-    async def _close_session(self) -> None:
-        """Close the session and record end time."""
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        """Queue the session when the channel closes without EOF."""
+        self._close_session()
+
+    def _close_session(self) -> None:
+        """Queue the final update of the session row with its end time."""
+        # EOF, channel close and shutdown can all end the session; the
+        # row is closed only once
         if not self.session_id:
             return
+        self.server.honeypot._open_sessions.discard(self)
 
-        try:
-            async with AsyncSessionLocal() as db_session:
-                result = await db_session.get(Session, self.session_id)
-                if result:
-                    result.end_time = datetime.now(timezone.utc)  # type: ignore  # noqa: E501
-                    await db_session.commit()
-        except Exception as e:
-            logger.error("ssh_session_close_failed", error=str(e))
+        self._queue_commands(end_time=datetime.now(timezone.utc))
+        self.session_id = None
 
 
 class SSHHoneypot:
@@ -380,7 +413,10 @@ class SSHHoneypot:
         self.port = config.port
         self.banner = config.banner
         self.server: Optional[asyncssh.SSHAcceptor] = None
+        self.recorder = BatchWriter()
         self._running = False
+        # Shells whose session row has not been closed yet
+        self._open_sessions: Set[SSHHoneypotSession] = set()
 
     async def start(self) -> None:
         """Start the SSH honeypot server."""
@@ -395,18 +431,17 @@ class SSHHoneypot:
         )
 
         try:
-            # Generate or load host key
-            host_key = asyncssh.generate_private_key("ssh-rsa", key_size=2048)
+            host_key = await self._load_host_key()
 
             self.server = await asyncssh.create_server(
                 lambda: SSHHoneypotServer(self),
                 self.host,
                 self.port,
                 server_host_keys=[host_key],
-                process_factory=self._create_session,
                 server_version=f"SSH-2.0-{self.banner}",
             )
 
+            self.recorder.start()
             self._running = True
             logger.info(
                 "ssh_honeypot_started",
@@ -421,9 +456,29 @@ class SSHHoneypot:
             )
             raise
 
-    def _create_session(self, stdin, stdout, stderr):
-        """Create a session handler - not used with session_factory."""
-        pass
+    async def _load_host_key(self) -> asyncssh.SSHKey:
+        """
+        Load the persisted host key, generating and saving it if missing.
+
+        Keeping the key across restarts also keeps the fingerprint
+        returning attackers have seen.
+        """
+        path = self.config.host_key_path
+        if os.path.exists(path):
+            return asyncssh.read_private_key(path)
+
+        # RSA key generation takes a few hundred ms; keep it off the loop
+        host_key = await asyncio.to_thread(
+            asyncssh.generate_private_key, "ssh-rsa", key_size=2048
+        )
+        key_dir = os.path.dirname(path)
+        if key_dir:
+            os.makedirs(key_dir, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(host_key.export_private_key())
+        logger.info("ssh_host_key_generated", path=path)
+        return host_key
 
     async def stop(self) -> None:
         """Stop the SSH honeypot server."""
@@ -437,6 +492,11 @@ class SSHHoneypot:
             self.server.close()
             await self.server.wait_closed()
 
+        # Queue sessions still open, then write whatever is pending
+        for session in list(self._open_sessions):
+            session._close_session()
+        await self.recorder.stop()
+
         self._running = False
         logger.info("ssh_honeypot_stopped")
 
@@ -2,15 +2,18 @@
 """
 Pytest configuration and shared fixtures for TenebriNET tests.
 """
-import sys
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Mapping
 
 import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
-# Ensure the project root is in the path so imports work correctly
+from tenebrinet.core import models  # noqa: F401 (registers the tables)
+from tenebrinet.core.database import Base
+
+# The project root is put on sys.path by the pytest "pythonpath" setting
 project_root = Path(__file__).parent.parent
-if str(project_root) not in sys.path:
-    sys.path.insert(0, str(project_root))
 
 
 @pytest.fixture(scope="session")
@@ -20,9 +23,23 @@ def project_root_path() -> Path:
 
 
 @pytest.fixture
-def sample_attack_data() -> dict:
-    """Provide sample attack data for testing."""
-    return {
+async def session_factory(tmp_path):
+    """Provide a session factory for a fresh SQLite database."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def sample_attack_data() -> Mapping[str, Any]:
+    """
+    Provide sample attack data for testing.
+
+    Shared by the whole session and read-only; deep-copy it to modify.
+    """
+    return MappingProxyType({
         "ip": "192.168.1.100",
         "service": "ssh",
         "payload": {"username": "root", "password": "admin123"},
@@ -30,13 +47,17 @@ def sample_attack_data() -> dict:
         "confidence": 0.95,
         "country": "US",
         "asn": 12345,
-    }
+    })
 
 
-@pytest.fixture
-def sample_config_dict() -> dict:
-    """Provide sample configuration dictionary for testing."""
-    return {
+@pytest.fixture(scope="session")
+def sample_config_dict() -> Mapping[str, Any]:
+    """
+    Provide sample configuration dictionary for testing.
+
+    Shared by the whole session and read-only; deep-copy it to modify.
+    """
+    return MappingProxyType({
         "services": {
             "ssh": {
                 "enabled": True,
@@ -92,4 +113,4 @@ def sample_config_dict() -> dict:
             "output": "data/logs/test.log",
             "rotation": "100 MB",
         },
-    }
+    })
@@ -0,0 +1,206 @@
+# tests/unit/api/test_attacks.py
+"""
+Unit tests for the attack API endpoints.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import func, select
+
+from tenebrinet.api.routes import attacks
+from tenebrinet.core.database import get_db_session
+from tenebrinet.core.cache import cache
+from tenebrinet.core.models import Attack, Credential, Session
+
+
+BASE_TIME = datetime(2024, 12, 7, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def client(session_factory):
+    """Provide a client for the attack routes backed by SQLite."""
+    app = FastAPI()
+    app.include_router(attacks.router)
+
+    async def override_db_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db_session] = override_db_session
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as client:
+        yield client
+
+
+async def _seed(session_factory, rows) -> None:
+    async with session_factory() as session:
+        async with session.begin():
+            session.add_all(Attack(**row) for row in rows)
+
+
+@pytest.fixture
+async def seeded_ids(session_factory):
+    """Seed five attacks, two sharing a timestamp; return the page order."""
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "ip": f"10.0.0.{i}",
+            "service": "ssh",
+            "timestamp": BASE_TIME + timedelta(minutes=min(i, 3)),
+        }
+        for i in range(5)
+    ]
+    await _seed(session_factory, rows)
+    # Newest first, ties broken by descending id
+    rows.sort(key=lambda row: (row["timestamp"], row["id"]), reverse=True)
+    return [str(row["id"]) for row in rows]
+
+
+class TestListAttacks:
+    """Tests for GET /attacks."""
+
+    async def test_offset_page_reports_totals(self, client, seeded_ids):
+        """Test that offset pages carry the total and page count."""
+        body = (await client.get("/attacks?per_page=2&page=2")).json()
+
+        assert body["total"] == 5
+        assert body["pages"] == 3
+        assert [item["id"] for item in body["items"]] == seeded_ids[2:4]
+
+    async def test_cursor_continues_offset_page(self, client, seeded_ids):
+        """Test that following next_cursor walks every row once."""
+        body = (await client.get("/attacks?per_page=2")).json()
+        seen = [item["id"] for item in body["items"]]
+        while body["next_cursor"]:
+            cursor = body["next_cursor"]
+            # Opaque and URL-safe, so it can be appended unescaped
+            assert not set(cursor) & set("+/=, ")
+            body = (
+                await client.get(f"/attacks?per_page=2&cursor={cursor}")
+            ).json()
+            assert body["total"] is None
+            assert body["pages"] is None
+            seen.extend(item["id"] for item in body["items"])
+
+        assert seen == seeded_ids
+
+    async def test_cursor_with_utc_offset(self, client, seeded_ids):
+        """Test that a cursor for an aware timestamp survives a raw URL."""
+        cursor = attacks._encode_cursor(
+            BASE_TIME + timedelta(minutes=3), uuid.UUID(int=0)
+        )
+        response = await client.get(f"/attacks?per_page=5&cursor={cursor}")
+
+        assert response.status_code == 200
+        assert [item["id"] for item in response.json()["items"]] == (
+            seeded_ids[2:]
+        )
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "bm9wZQ", "%2B%2B"])
+    async def test_malformed_cursor(self, client, cursor):
+        """Test that undecodable cursors are rejected with 400."""
+        response = await client.get(f"/attacks?cursor={cursor}")
+        assert response.status_code == 400
+
+
+@pytest.fixture
+def no_stats_cache(monkeypatch):
+    """Start without cached stats and keep Redis out of the way."""
+    monkeypatch.setattr(attacks, "_stats_cache", {})
+
+    async def cache_get(key):
+        return None
+
+    async def cache_set(key, value, ttl=None):
+        return True
+
+    monkeypatch.setattr(cache, "get", cache_get)
+    monkeypatch.setattr(cache, "set", cache_set)
+
+
+class TestAttackStats:
+    """Tests for GET /attacks/stats."""
+
+    async def test_aggregates(self, client, session_factory, no_stats_cache):
+        """Test totals, breakdowns and top countries, merged rows included."""
+        old = datetime.now(timezone.utc) - timedelta(days=2)
+        rows = [
+            {
+                "ip": f"10.0.{i}.{j}",
+                "service": "ssh",
+                "country": chr(ord("A") + i) * 2,
+                "timestamp": old,
+            }
+            for i in range(12)
+            for j in range(i + 1)
+        ]
+        # One row standing for 20 identical requests
+        rows.append({
+            "ip": "10.9.9.9",
+            "service": "http",
+            "threat_type": "sql_injection",
+            "country": "ZZ",
+            "count": 20,
+            "timestamp": datetime.now(timezone.utc),
+        })
+        await _seed(session_factory, rows)
+
+        response = await client.get("/attacks/stats")
+        stats = response.json()
+
+        assert response.headers["cache-control"] == (
+            f"public, max-age={attacks.STATS_CACHE_TTL}"
+        )
+        assert stats["total_attacks"] == 98
+        assert stats["attacks_today"] == 20
+        assert stats["unique_ips"] == 79
+        assert stats["attacks_by_service"] == {"ssh": 78, "http": 20}
+        assert stats["attacks_by_threat_type"] == {"sql_injection": 20}
+        assert stats["top_countries"] == [{"country": "ZZ", "count": 20}] + [
+            {"country": chr(ord("A") + i) * 2, "count": i + 1}
+            for i in range(11, 2, -1)
+        ]
+
+    async def test_served_from_cache(
+        self, client, session_factory, no_stats_cache
+    ):
+        """Test that stats within the TTL are not recomputed."""
+        await _seed(session_factory, [{"ip": "10.0.0.1", "service": "ssh"}])
+        first = (await client.get("/attacks/stats")).json()
+        await _seed(session_factory, [{"ip": "10.0.0.2", "service": "ssh"}])
+        second = (await client.get("/attacks/stats")).json()
+
+        assert first["total_attacks"] == second["total_attacks"] == 1
+
+
+class TestDeleteAttack:
+    """Tests for DELETE /attacks/{attack_id}."""
+
+    async def test_deletes_attack_and_children(self, client, session_factory):
+        """Test that children go with the attack and a repeat is a 404."""
+        attack_id = uuid.uuid4()
+        await _seed(session_factory, [{
+            "id": attack_id, "ip": "10.0.0.1", "service": "ssh"
+        }])
+        async with session_factory() as session:
+            async with session.begin():
+                session.add(Credential(
+                    attack_id=attack_id, username="root", password="toor"
+                ))
+                session.add(Session(attack_id=attack_id, commands=[]))
+
+        first = await client.delete(f"/attacks/{attack_id}")
+        second = await client.delete(f"/attacks/{attack_id}")
+
+        assert first.status_code == 204
+        assert second.status_code == 404
+        async with session_factory() as session:
+            for model in (Attack, Credential, Session):
+                assert await session.scalar(
+                    select(func.count()).select_from(model)
+                ) == 0
@@ -0,0 +1,65 @@
+# tests/unit/api/test_middleware.py
+"""
+Unit tests for API middleware.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from tenebrinet.api.middleware import WildcardCORSMiddleware
+
+
+@pytest.fixture
+def client() -> TestClient:
+    """Provide a client for a minimal app wrapped in the CORS middleware."""
+    app = FastAPI()
+    app.add_middleware(WildcardCORSMiddleware)
+
+    @app.get("/ping")
+    async def ping() -> dict:
+        return {"status": "ok"}
+
+    return TestClient(app)
+
+
+class TestWildcardCORSMiddleware:
+    """Tests for WildcardCORSMiddleware."""
+
+    def test_request_without_origin_untouched(self, client):
+        """Test that non-CORS requests get no CORS headers."""
+        response = client.get("/ping")
+        assert response.status_code == 200
+        assert "access-control-allow-origin" not in response.headers
+
+    def test_simple_request_echoes_origin(self, client):
+        """Test that simple requests echo the origin with credentials."""
+        response = client.get(
+            "/ping", headers={"Origin": "https://example.com"}
+        )
+        assert response.status_code == 200
+        assert response.json() == {"status": "ok"}
+        assert (
+            response.headers["access-control-allow-origin"]
+            == "https://example.com"
+        )
+        assert response.headers["access-control-allow-credentials"] == "true"
+        assert response.headers["vary"] == "Origin"
+
+    def test_preflight_request(self, client):
+        """Test that preflight requests are answered directly."""
+        response = client.options(
+            "/ping",
+            headers={
+                "Origin": "https://example.com",
+                "Access-Control-Request-Method": "DELETE",
+                "Access-Control-Request-Headers": "X-Custom",
+            },
+        )
+        assert response.status_code == 200
+        assert response.text == "OK"
+        assert (
+            response.headers["access-control-allow-origin"]
+            == "https://example.com"
+        )
+        assert "DELETE" in response.headers["access-control-allow-methods"]
+        assert response.headers["access-control-allow-headers"] == "X-Custom"
@@ -5,6 +5,9 @@ Unit tests for API schemas.
 from datetime import datetime
 from uuid import uuid4
 
+import pytest
+from pydantic import ValidationError
+
 from tenebrinet.api.schemas import (
     AttackBase,
     AttackCreate,
@@ -12,6 +15,8 @@ from tenebrinet.api.schemas import (
     CredentialResponse,
     SessionResponse,
     AttackStats,
+    CommandEntry,
+    CountryCount,
     ServiceStatus,
     HealthResponse,
 )
@@ -56,6 +61,17 @@ class TestAttackSchemas:
         assert attack.id == attack_id
         assert attack.timestamp == now
 
+    def test_attack_response_is_frozen(self):
+        """Test AttackResponse rejects mutation."""
+        attack = AttackResponse(
+            id=uuid4(),
+            ip="10.0.0.1",
+            service="ftp",
+            timestamp=datetime.utcnow(),
+        )
+        with pytest.raises(ValidationError):
+            attack.ip = "10.0.0.2"
+
 
 class TestCredentialSchema:
     """Tests for Credential schemas."""
@@ -87,6 +103,9 @@ class TestSessionSchema:
             end_time=None,
         )
         assert len(session.commands) == 1
+        assert isinstance(session.commands[0], CommandEntry)
+        assert session.commands[0].cmd == "ls"
+        assert session.commands[0].timestamp == datetime(2024, 12, 7, 12)
 
 
 class TestHealthSchemas:
@@ -102,6 +121,29 @@ class TestHealthSchemas:
         )
         assert status.service == "ssh_honeypot"
         assert status.running is True
+        assert status.connections == 0
+
+    def test_service_status_is_slotted(self):
+        """Test ServiceStatus has no instance dict and rejects mutation."""
+        status = ServiceStatus(
+            service="ssh_honeypot",
+            running=True,
+            host="0.0.0.0",
+            port=2222,
+        )
+        assert not hasattr(status, "__dict__")
+        with pytest.raises(AttributeError):
+            status.running = False
+
+    def test_service_status_validates(self):
+        """Test ServiceStatus still validates its fields."""
+        with pytest.raises(ValidationError):
+            ServiceStatus(
+                service="ssh_honeypot",
+                running=True,
+                host="0.0.0.0",
+                port="not-a-port",
+            )
 
     def test_health_response(self):
         """Test HealthResponse schema."""
@@ -133,3 +175,5 @@ class TestAttackStats:
         assert stats.total_attacks == 100
         assert stats.unique_ips == 50
         assert stats.attacks_by_service["ssh"] == 40
+        assert isinstance(stats.top_countries[0], CountryCount)
+        assert stats.top_countries[0].count == 25
@@ -0,0 +1,67 @@
+# tests/unit/api/test_staticfiles.py
+"""
+Unit tests for cached static file serving.
+"""
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from tenebrinet.api.staticfiles import CachedStaticFiles
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    """Provide a directory with one small asset."""
+    (tmp_path / "app.js").write_text("console.log('v1');")
+    return tmp_path
+
+
+@pytest.fixture
+def static_files(static_dir) -> CachedStaticFiles:
+    """Provide a CachedStaticFiles instance for the asset directory."""
+    return CachedStaticFiles(directory=str(static_dir))
+
+
+@pytest.fixture
+def client(static_files) -> TestClient:
+    """Provide a client for an app mounting the cached static files."""
+    app = FastAPI()
+    app.mount("/static", static_files, name="static")
+    return TestClient(app)
+
+
+class TestCachedStaticFiles:
+    """Tests for CachedStaticFiles."""
+
+    def test_serves_and_caches_file(self, client, static_files):
+        """Test that a small file is served and kept in memory."""
+        response = client.get("/static/app.js")
+        assert response.status_code == 200
+        assert response.text == "console.log('v1');"
+        assert "etag" in response.headers
+        assert len(static_files._bodies) == 1
+
+    def test_conditional_request(self, client):
+        """Test that a matching If-None-Match returns 304."""
+        etag = client.get("/static/app.js").headers["etag"]
+        response = client.get(
+            "/static/app.js", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+
+    def test_invalidated_on_change(self, client, static_dir):
+        """Test that a modified file is re-read."""
+        client.get("/static/app.js")
+        path = static_dir / "app.js"
+        path.write_text("console.log('v2 changed');")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        response = client.get("/static/app.js")
+        assert response.text == "console.log('v2 changed');"
+
+    def test_missing_file(self, client):
+        """Test that missing files still return 404."""
+        assert client.get("/static/missing.js").status_code == 404
@@ -73,6 +73,42 @@ def test_load_valid_config(valid_config_yaml):
     assert config.logging.level == "DEBUG"
 
 
+def test_load_config_cached(valid_config_yaml):
+    # Unchanged file returns the cached instance
+    assert load_config(valid_config_yaml) is load_config(valid_config_yaml)
+
+
+def test_load_config_cache_invalidated(valid_config_yaml):
+    first = load_config(valid_config_yaml)
+
+    # Rewrite the file with a later mtime
+    with open(valid_config_yaml, "r", encoding="utf-8") as f:
+        content = f.read()
+    with open(valid_config_yaml, "w", encoding="utf-8") as f:
+        f.write(content.replace("port: 2222", "port: 2224"))
+    stat = os.stat(valid_config_yaml)
+    os.utime(
+        valid_config_yaml, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9)
+    )
+
+    second = load_config(valid_config_yaml)
+    assert second is not first
+    assert second.services.ssh.port == 2224
+
+
+def test_load_config_cache_tracks_env(valid_config_yaml, monkeypatch):
+    with open(valid_config_yaml, "r", encoding="utf-8") as f:
+        content = f.read()
+    with open(valid_config_yaml, "w", encoding="utf-8") as f:
+        f.write(content.replace("port: 2222", "port: ${CACHE_SSH_PORT:2222}"))
+
+    monkeypatch.setenv("CACHE_SSH_PORT", "2230")
+    assert load_config(valid_config_yaml).services.ssh.port == 2230
+
+    monkeypatch.setenv("CACHE_SSH_PORT", "2231")
+    assert load_config(valid_config_yaml).services.ssh.port == 2231
+
+
 def test_env_var_substitution(tmp_path):
     config_content = """
 services:
@@ -140,6 +176,12 @@ def test_env_var_default_value(tmp_path):
     assert result == "port: 8080"
 
 
+def test_env_var_no_placeholders():
+    # Content without placeholders is returned unchanged
+    content = "port: 8080\nhost: $HOST\n"
+    assert substitute_env_vars(content) is content
+
+
 def test_invalid_config_structure(tmp_path):
     config_file = tmp_path / "invalid.yml"
     # This is invalid YAML syntax that causes a parser error
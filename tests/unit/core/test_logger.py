@@ -5,11 +5,15 @@ import logging
 import os
 import json
 from unittest.mock import patch, MagicMock
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, RotatingFileHandler
 import sys
 
 # Import the configure_logger function
-from tenebrinet.core.logger import configure_logger
+from tenebrinet.core.logger import (
+    _BufferedRotatingFileHandler,
+    configure_logger,
+    stop_logger,
+)
 
 
 # Fixture to temporarily set up and tear down the logger configuration
@@ -20,7 +24,8 @@ def configured_logger(tmp_path):
         log_level="DEBUG",
         log_format="json",
         log_output_path=str(log_file),
-        log_rotation_mb=1
+        log_rotation_mb=1,
+        background=False,
     )
     yield structlog.get_logger("test_logger")
     # Teardown: remove handlers to avoid interference with other tests
@@ -56,6 +61,131 @@ def test_json_formatting(configured_logger, tmp_path):
         assert log_entry["logger"] == "test_logger"
 
 
+def test_callsite_parameters_only_in_debug(tmp_path):
+    """Test that call-site fields are added only at DEBUG level."""
+    root_logger = logging.getLogger()
+    for level in ("DEBUG", "INFO"):
+        log_file = tmp_path / f"{level.lower()}.log"
+        configure_logger(
+            log_level=level,
+            log_format="json",
+            log_output_path=str(log_file),
+            background=False,
+        )
+        structlog.get_logger("callsite_logger").info("Callsite message")
+        for handler in root_logger.handlers:
+            handler.flush()
+
+        with open(log_file, 'r') as f:
+            log_entry = json.loads(f.readline())
+        assert ("lineno" in log_entry) is (level == "DEBUG")
+        assert ("func_name" in log_entry) is (level == "DEBUG")
+        assert "thread" not in log_entry
+
+        for handler in root_logger.handlers[:]:
+            root_logger.removeHandler(handler)
+
+
+def test_events_below_level_dropped(tmp_path):
+    """Test that filtered events never reach the output."""
+    log_file = tmp_path / "filtered.log"
+    configure_logger(
+        log_level="INFO",
+        log_format="json",
+        log_output_path=str(log_file),
+        background=False,
+    )
+    logger = structlog.get_logger("filtered_logger")
+    logger.debug("Hidden message")
+    logger.info("Shown message", ids={1: "a"})
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+
+    with open(log_file, 'r') as f:
+        entries = [json.loads(line) for line in f]
+    assert [entry["event"] for entry in entries] == ["Shown message"]
+    assert entries[0]["ids"] == {"1": "a"}
+
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+
+
+def test_background_logging(tmp_path):
+    """Test that background mode queues records for a listener thread."""
+    log_file = tmp_path / "background.log"
+    configure_logger(
+        log_level="INFO",
+        log_format="json",
+        log_output_path=str(log_file),
+    )
+    root_logger = logging.getLogger()
+    assert len(root_logger.handlers) == 1
+    assert isinstance(root_logger.handlers[0], QueueHandler)
+
+    structlog.get_logger("queued_logger").info("Queued", key="value")
+    # Stopping the listener drains the queue
+    stop_logger()
+
+    with open(log_file, 'r') as f:
+        log_entry = json.loads(f.readline())
+    assert log_entry["event"] == "Queued"
+    assert log_entry["key"] == "value"
+
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+
+
+def test_background_log_rotation(tmp_path):
+    """Test that buffered background writes still rotate intact."""
+    log_file = tmp_path / "buffered.log"
+    configure_logger(
+        log_level="INFO",
+        log_format="json",
+        log_output_path=str(log_file),
+        log_rotation_mb=1,
+    )
+    logger = structlog.get_logger("buffered_logger")
+    for i in range(8000):
+        logger.info("Buffered line", index=i, padding="a" * 150)
+    stop_logger()
+
+    paths = sorted(
+        (path for path in os.listdir(tmp_path) if path.startswith("buff")),
+        reverse=True,
+    )
+    assert len(paths) > 1
+    lines = []
+    for path in paths:
+        assert os.path.getsize(tmp_path / path) <= 1024 * 1024
+        with open(tmp_path / path, 'r') as f:
+            for line in f:
+                entry = json.loads(line)
+                assert "_record" not in entry
+                lines.append(entry["index"])
+    assert lines == list(range(8000))
+
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+
+
+def test_buffered_rotation_counts_bytes(tmp_path):
+    """Test that non-ASCII records still keep files under maxBytes."""
+    log_file = tmp_path / "utf8.log"
+    handler = _BufferedRotatingFileHandler(
+        log_file, maxBytes=1000, backupCount=20, encoding="utf-8"
+    )
+    record = logging.makeLogRecord({"msg": "\u00e9" * 100})
+    for _ in range(40):
+        handler.emit(record)
+    handler.close()
+
+    paths = list(tmp_path.iterdir())
+    assert len(paths) > 1
+    assert all(path.stat().st_size <= 1000 for path in paths)
+
+
 def test_log_rotation(configured_logger, tmp_path):
     """Test that log rotation works as expected."""
     log_file = tmp_path / "test.log"
@@ -118,7 +248,8 @@ def test_console_output(tmp_path):
             log_level="INFO",
             log_format="console",
             log_output_path=str(log_file),
-            log_rotation_mb=1
+            log_rotation_mb=1,
+            background=False,
         )
         logger_console = structlog.get_logger("console_logger")
         logger_console.info("Console message", data="xyz")
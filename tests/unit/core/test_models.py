@@ -5,7 +5,7 @@ from datetime import datetime, timezone
 
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import RelationshipProperty
-from sqlalchemy.sql.schema import CallableColumnDefault
+from sqlalchemy.sql.schema import CallableColumnDefault, DefaultClause
 from sqlalchemy.sql.sqltypes import (
     Boolean, DateTime, Float, Integer, JSON, String
 )
@@ -13,37 +13,85 @@ from sqlalchemy.sql.sqltypes import (
 from tenebrinet.core.models import Attack, Credential, Session
 
 
+# (name, type, nullable, indexed, primary key) of each model's columns
+ATTACK_COLUMNS = [
+    ("id", postgresql.UUID, False, False, True),
+    ("ip", String, False, True, False),
+    ("timestamp", DateTime, True, True, False),
+    ("service", String, False, False, False),
+    ("payload", JSON, True, False, False),
+    ("threat_type", String, True, False, False),
+    ("confidence", Float, True, False, False),
+    ("country", String, True, False, False),
+    ("asn", Integer, True, False, False),
+    ("count", Integer, False, False, False),
+]
+
+SESSION_COLUMNS = [
+    ("id", postgresql.UUID, False, False, True),
+    ("attack_id", postgresql.UUID, True, True, False),
+    ("start_time", DateTime, True, False, False),
+    ("end_time", DateTime, True, False, False),
+    ("commands", JSON, True, False, False),
+]
+
+CREDENTIAL_COLUMNS = [
+    ("id", postgresql.UUID, False, False, True),
+    ("attack_id", postgresql.UUID, True, True, False),
+    ("username", String, False, False, False),
+    ("password", String, False, False, False),
+    ("success", Boolean, True, False, False),
+]
+
+
+def _check_columns(model, expected) -> None:
+    """Assert each column's type, nullability, index and primary key."""
+    columns = model.__table__.columns
+    assert [name for name, *_ in expected] == list(columns.keys())
+    for name, column_type, nullable, indexed, primary_key in expected:
+        column = columns[name]
+        assert (
+            isinstance(column.type, column_type),
+            column.nullable,
+            bool(column.index),
+            column.primary_key,
+        ) == (True, nullable, indexed, primary_key), name
+
+
 class TestAttackModel:
     """Tests for the Attack model."""
 
     def test_column_definitions(self):
         """Test the Attack model's column definitions and types."""
-        assert isinstance(Attack.__table__.columns.id.type, postgresql.UUID)
-        assert Attack.__table__.columns.id.primary_key
+        _check_columns(Attack, ATTACK_COLUMNS)
 
+        columns = Attack.__table__.columns
         # Check that the default is a callable
-        assert isinstance(
-            Attack.__table__.columns.id.default, CallableColumnDefault
-        )
-
-        assert isinstance(Attack.__table__.columns.ip.type, String)
-        assert Attack.__table__.columns.ip.nullable is False
-        assert Attack.__table__.columns.ip.index
-
-        assert isinstance(Attack.__table__.columns.timestamp.type, DateTime)
-        assert isinstance(
-            Attack.__table__.columns.timestamp.default, CallableColumnDefault
-        )
-        assert Attack.__table__.columns.timestamp.index
-
-        assert isinstance(Attack.__table__.columns.service.type, String)
-        assert Attack.__table__.columns.service.nullable is False
-
-        assert isinstance(Attack.__table__.columns.payload.type, JSON)
-        assert isinstance(Attack.__table__.columns.threat_type.type, String)
-        assert isinstance(Attack.__table__.columns.confidence.type, Float)
-        assert isinstance(Attack.__table__.columns.country.type, String)
-        assert isinstance(Attack.__table__.columns.asn.type, Integer)
+        assert isinstance(columns.id.default, CallableColumnDefault)
+        assert isinstance(columns.timestamp.server_default, DefaultClause)
+        assert isinstance(columns.timestamp.default, CallableColumnDefault)
+        assert columns["count"].default.arg == 1
+
+    def test_indexes(self):
+        """Test the Attack model's filter/aggregate indexes."""
+        indexes = {idx.name: idx for idx in Attack.__table__.indexes}
+
+        assert [c.name for c in indexes["ix_attacks_service_ts"].columns] == [
+            "service",
+            "timestamp",
+        ]
+        assert [c.name for c in indexes["ix_attacks_ip_ts"].columns] == [
+            "ip",
+            "timestamp",
+        ]
+        threat_where = indexes["ix_attacks_threat_type"].dialect_options[
+            "postgresql"
+        ]["where"]
+        assert "IS NOT NULL" in str(threat_where)
+        country_where = indexes["ix_attacks_country_ts"].dialect_options[
+            "postgresql"
+        ]["where"]
+        assert "IS NOT NULL" in str(country_where)
 
     def test_relationships(self):
         """Test Attack model relationships."""
@@ -78,27 +126,15 @@ class TestSessionModel:
 
     def test_column_definitions(self):
         """Test the Session model's column definitions and types."""
-        assert isinstance(Session.__table__.columns.id.type, postgresql.UUID)
-        assert Session.__table__.columns.id.primary_key
-        assert isinstance(
-            Session.__table__.columns.id.default, CallableColumnDefault
-        )
+        _check_columns(Session, SESSION_COLUMNS)
 
-        assert isinstance(
-            Session.__table__.columns.attack_id.type, postgresql.UUID
-        )
+        columns = Session.__table__.columns
+        assert isinstance(columns.id.default, CallableColumnDefault)
         # Check foreign key
-        fk_col = next(
-            iter(Session.__table__.columns.attack_id.foreign_keys)
-        ).column
-        assert isinstance(fk_col.type, postgresql.UUID)
-
-        assert isinstance(Session.__table__.columns.start_time.type, DateTime)
-        assert isinstance(
-            Session.__table__.columns.start_time.default, CallableColumnDefault
-        )
-        assert isinstance(Session.__table__.columns.end_time.type, DateTime)
-        assert isinstance(Session.__table__.columns.commands.type, JSON)
+        fk_col = next(iter(columns.attack_id.foreign_keys)).column
+        assert fk_col is Attack.__table__.columns.id
+        assert isinstance(columns.start_time.server_default, DefaultClause)
+        assert isinstance(columns.start_time.default, CallableColumnDefault)
 
     def test_relationships(self):
         """Test Session model relationships."""
@@ -125,29 +161,14 @@ class TestCredentialModel:
 
     def test_column_definitions(self):
         """Test the Credential model's column definitions and types."""
-        assert isinstance(
-            Credential.__table__.columns.id.type, postgresql.UUID
-        )
-        assert Credential.__table__.columns.id.primary_key
-        assert isinstance(
-            Credential.__table__.columns.id.default, CallableColumnDefault
-        )
+        _check_columns(Credential, CREDENTIAL_COLUMNS)
 
-        assert isinstance(
-            Credential.__table__.columns.attack_id.type, postgresql.UUID
-        )
+        columns = Credential.__table__.columns
+        assert isinstance(columns.id.default, CallableColumnDefault)
         # Check foreign key
-        fk_col = next(
-            iter(Credential.__table__.columns.attack_id.foreign_keys)
-        ).column
-        assert isinstance(fk_col.type, postgresql.UUID)
-
-        assert isinstance(Credential.__table__.columns.username.type, String)
-        assert Credential.__table__.columns.username.nullable is False
-        assert isinstance(Credential.__table__.columns.password.type, String)
-        assert Credential.__table__.columns.password.nullable is False
-        assert isinstance(Credential.__table__.columns.success.type, Boolean)
-        assert Credential.__table__.columns.success.default.arg is False
+        fk_col = next(iter(columns.attack_id.foreign_keys)).column
+        assert fk_col is Attack.__table__.columns.id
+        assert columns.success.default.arg is False
 
     def test_relationships(self):
         """Test Credential model relationships."""
@@ -0,0 +1,209 @@
+# tests/unit/core/test_recorder.py
+"""
+Unit tests for batched attack recording.
+"""
+import asyncio
+import uuid
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from tenebrinet.core.models import Attack, Credential
+from tenebrinet.core.recorder import (
+    BatchWriter,
+    bulk_record_attacks,
+    copy_records,
+)
+
+
+async def _count(session_factory, model) -> int:
+    async with session_factory() as session:
+        return await session.scalar(select(func.count()).select_from(model))
+
+
+class TestBulkRecordAttacks:
+    """Tests for bulk_record_attacks."""
+
+    async def test_inserts_all_rows(self, session_factory):
+        """Test that every row is inserted in one call."""
+        rows = [
+            {"ip": f"10.0.0.{i}", "service": "ssh", "payload": {"n": i}}
+            for i in range(5)
+        ]
+        async with session_factory() as session:
+            async with session.begin():
+                await bulk_record_attacks(session, rows)
+
+        assert await _count(session_factory, Attack) == 5
+
+
+class TestCopyRecords:
+    """Tests for copy_records."""
+
+    def test_fills_python_defaults(self):
+        """Test that COPY records carry defaults an INSERT would add."""
+        attack_id = uuid.uuid4()
+        columns, records = copy_records(
+            Credential.__table__,
+            [{"attack_id": attack_id, "username": "root", "password": "x"}],
+            asyncpg.dialect(),
+        )
+        row = dict(zip(columns, records[0]))
+        assert row["attack_id"] == attack_id
+        assert isinstance(row["id"], uuid.UUID)
+        assert row["success"] is False
+
+    def test_serializes_json(self):
+        """Test that JSON values are encoded and timestamps filled in."""
+        columns, records = copy_records(
+            Attack.__table__,
+            [{"ip": "10.0.0.1", "service": "ssh", "payload": {"n": 1}}],
+            asyncpg.dialect(),
+        )
+        row = dict(zip(columns, records[0]))
+        assert row["payload"] == '{"n": 1}'
+        assert row["timestamp"].tzinfo is not None
+
+
+class TestBatchWriter:
+    """Tests for BatchWriter."""
+
+    async def test_stop_flushes_pending_rows(self, session_factory):
+        """Test that rows queued before stop are written."""
+        writer = BatchWriter(
+            flush_interval=60, session_factory=session_factory
+        )
+        writer.start()
+
+        attack_id = uuid.uuid4()
+        # Child queued first; the writer still inserts the parent first
+        writer.add(
+            Credential.__table__,
+            {"attack_id": attack_id, "username": "root", "password": "x"},
+        )
+        writer.add(
+            Attack.__table__,
+            {"id": attack_id, "ip": "10.0.0.1", "service": "ssh"},
+        )
+        await writer.stop()
+
+        assert await _count(session_factory, Attack) == 1
+        assert await _count(session_factory, Credential) == 1
+
+    async def test_flushes_full_batch(self, session_factory):
+        """Test that a full batch is written without waiting."""
+        writer = BatchWriter(
+            max_batch=3, flush_interval=60, session_factory=session_factory
+        )
+        writer.start()
+        for i in range(3):
+            writer.add(
+                Attack.__table__, {"ip": f"10.0.0.{i}", "service": "http"}
+            )
+
+        for _ in range(50):
+            if await _count(session_factory, Attack) == 3:
+                break
+            await asyncio.sleep(0.01)
+        await writer.stop()
+
+        assert await _count(session_factory, Attack) == 3
+
+    async def test_drops_rows_beyond_max_pending(self, session_factory):
+        """Test that a full queue drops rows instead of growing."""
+        writer = BatchWriter(
+            flush_interval=60, session_factory=session_factory,
+            max_pending=2,
+        )
+        for i in range(3):
+            writer.add(
+                Attack.__table__, {"ip": f"10.0.0.{i}", "service": "http"}
+            )
+        assert writer.dropped == 1
+
+        writer.start()
+        await writer.stop()
+        assert await _count(session_factory, Attack) == 2
+
+    async def test_merges_rows_with_same_key(self, session_factory):
+        """Test that keyed duplicates in a batch become one counted row."""
+        writer = BatchWriter(
+            flush_interval=60, session_factory=session_factory
+        )
+        writer.start()
+        for _ in range(3):
+            writer.add(
+                Attack.__table__,
+                {"ip": "10.0.0.1", "service": "http"},
+                key="same",
+            )
+        writer.add(Attack.__table__, {"ip": "10.0.0.2", "service": "http"})
+        await writer.stop()
+
+        async with session_factory() as session:
+            counts = await session.execute(
+                select(Attack.ip, Attack.count).order_by(Attack.ip)
+            )
+            assert counts.all() == [("10.0.0.1", 3), ("10.0.0.2", 1)]
+
+    async def test_bad_row_only_loses_itself(self, session_factory):
+        """Test that a rejected row does not discard the rest of its batch."""
+        writer = BatchWriter(
+            flush_interval=60, session_factory=session_factory
+        )
+        writer.start()
+        for i in range(50):
+            writer.add(
+                Attack.__table__, {"ip": f"10.0.0.{i}", "service": "ssh"}
+            )
+        # Violates NOT NULL on ip
+        writer.add(Attack.__table__, {"ip": None, "service": "ssh"})
+        await writer.stop()
+
+        assert await _count(session_factory, Attack) == 50
+
+    async def test_long_strings_clamped(self, session_factory):
+        """Test that values are cut to their column length when queued."""
+        writer = BatchWriter(
+            flush_interval=60, session_factory=session_factory
+        )
+        writer.start()
+        writer.add(Attack.__table__, {"ip": "1" * 100, "service": "ftp"})
+        await writer.stop()
+
+        async with session_factory() as session:
+            ip = await session.scalar(select(Attack.ip))
+        assert ip == "1" * 45
+
+    async def test_updates_follow_inserts(self, session_factory):
+        """Test that updates apply in queue order, in and across batches."""
+        writer = BatchWriter(
+            flush_interval=60, session_factory=session_factory
+        )
+        folded, updated = uuid.uuid4(), uuid.uuid4()
+        writer.start()
+        writer.add(
+            Attack.__table__,
+            {"id": folded, "ip": "10.0.0.1", "service": "ssh"},
+        )
+        writer.update(Attack.__table__, {"id": folded, "threat_type": "a"})
+        writer.update(Attack.__table__, {"id": folded, "threat_type": "b"})
+        await writer.stop()
+
+        writer.start()
+        writer.add(
+            Attack.__table__,
+            {"id": updated, "ip": "10.0.0.2", "service": "ssh"},
+        )
+        await writer.stop()
+        writer.start()
+        writer.update(Attack.__table__, {"id": updated, "threat_type": "c"})
+        writer.update(Attack.__table__, {"id": updated, "count": 7})
+        await writer.stop()
+
+        async with session_factory() as session:
+            rows = await session.execute(
+                select(Attack.ip, Attack.threat_type, Attack.count)
+                .order_by(Attack.ip)
+            )
+            assert rows.all() == [("10.0.0.1", "b", 1), ("10.0.0.2", "c", 7)]
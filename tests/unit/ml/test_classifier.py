@@ -3,16 +3,24 @@
 Unit tests for ML classifier and feature extraction.
 """
 import os
-import tempfile
-from typing import List, Dict, Any
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
 
+import numpy as np
 import pytest
 
 from tenebrinet.ml.classifier import ThreatClassifier
-from tenebrinet.ml.features import FeatureExtractor
+from tenebrinet.ml.features import (
+    CATEGORICAL_FEATURES,
+    NUMERIC_FEATURES,
+    FeatureExtractor,
+    count_keywords,
+    count_keywords_batch,
+    payload_bytes,
+)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_data() -> List[Dict[str, Any]]:
     """Create sample attack data for training/testing."""
     return [
@@ -46,12 +54,22 @@ def sample_data() -> List[Dict[str, Any]]:
     ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_labels() -> List[str]:
     """Create sample labels corresponding to data."""
     return ["sql_injection", "credential_attack", "path_traversal"]
 
 
+@pytest.fixture(scope="session")
+def trained_classifier(
+    sample_data, sample_labels
+) -> Tuple[ThreatClassifier, Dict[str, float]]:
+    """Train one classifier for the session; returns it and its metrics."""
+    classifier = ThreatClassifier()
+    metrics = classifier.train(sample_data, sample_labels)
+    return classifier, metrics
+
+
 class TestFeatureExtractor:
     """Tests for FeatureExtractor."""
 
@@ -66,6 +84,19 @@ class TestFeatureExtractor:
 
         # Check if fitted
         assert extractor._is_fitted is True
+        assert features.dtype == np.float32
+
+    def test_fit_with_memory(self, sample_data, tmp_path):
+        """Test that a cached encoder fit produces the same features."""
+        plain = FeatureExtractor().fit_transform(sample_data)
+
+        first = FeatureExtractor(memory_dir=str(tmp_path))
+        second = FeatureExtractor(memory_dir=str(tmp_path))
+        first.fit(sample_data)
+        second.fit(sample_data)
+
+        assert any(tmp_path.iterdir())
+        np.testing.assert_array_equal(second.transform(sample_data), plain)
 
     def test_feature_extraction_logic(self):
         """Test specific feature extraction logic."""
@@ -78,53 +109,153 @@ class TestFeatureExtractor:
             }
         }]
 
-        df = extractor._preprocess(data)
+        numeric, categorical = extractor._preprocess(data)
+
+        assert numeric.dtype == np.float32
+        assert numeric[0, NUMERIC_FEATURES.index("is_scanner")] == 1
+        assert categorical[0, CATEGORICAL_FEATURES.index("service")] == "http"
+        assert (
+            categorical[0, CATEGORICAL_FEATURES.index("method")] == "unknown"
+        )
+
+    def test_count_keywords(self):
+        """Test keyword counts per group in a single scan."""
+        text = b"union select * from x; <img onerror=alert(1)> ../..\\"
+        assert count_keywords(text) == (3, 3, 2)
+        assert count_keywords(b"") == (0, 0, 0)
+
+    def test_timestamp_hours(self):
+        """Test hour extraction for ISO strings, datetimes and junk."""
+        data = [
+            {"timestamp": "2024-12-07T12:00:00Z"},
+            {"timestamp": "2024-12-07 05:30:00+02:00"},
+            {"timestamp": "20241207T083000"},
+            {"timestamp": datetime(2024, 12, 7, 7)},
+            {"timestamp": "not a date"},
+            {},
+        ]
+        numeric, _ = FeatureExtractor()._preprocess(data)
+        hours = numeric[:, NUMERIC_FEATURES.index("hour")]
+        assert hours.tolist() == [12, 5, 8, 7, 0, 0]
 
-        assert df.iloc[0]["is_scanner"] == 1
-        assert df.iloc[0]["service"] == "http"
+    def test_payload_bytes(self):
+        """Test that only string values of a payload are scanned."""
+        payload = {
+            "method": "GET",
+            "headers": {"Referer": "UNION"},
+            "from": 3,
+            "parts": ["<Script>"],
+        }
+        assert payload_bytes(payload) == b"get\x1funion\x1f<script>"
+        assert payload_bytes(42) == b"42"
+
+    def test_count_keywords_batch(self):
+        """Test batch counts match per-text counts, row by row."""
+        texts = [b"union select", b"", b"<svg onload=alert(1)>", b"../etc"]
+        counts = count_keywords_batch(texts)
+        assert counts.shape == (4, 3)
+        assert [tuple(row) for row in counts] == [
+            count_keywords(text) for text in texts
+        ]
 
 
 class TestThreatClassifier:
     """Tests for ThreatClassifier."""
 
-    def test_train_predict(self, sample_data, sample_labels):
-        """Test training and prediction flow."""
-        classifier = ThreatClassifier()
-
-        # Train
-        metrics = classifier.train(sample_data, sample_labels)
+    def test_train_metrics(self, trained_classifier):
+        """Test that training reports its accuracy."""
+        _, metrics = trained_classifier
         assert "accuracy" in metrics
         assert metrics["accuracy"] > 0.0
 
-        # Predict
+    def test_train_predict(self, trained_classifier, sample_data):
+        """Test prediction with a trained model."""
+        classifier, _ = trained_classifier
         preds, confs = classifier.predict(sample_data)
         assert len(preds) == len(sample_data)
         assert len(confs) == len(sample_data)
-        assert all(isinstance(c, float) for c in confs)
+        assert isinstance(preds, np.ndarray)
+        assert confs.dtype.kind == "f"
+
+    def test_forest_parameters(self, sample_data, sample_labels):
+        """Test forest knobs reach the estimator and serving is serial."""
+        classifier = ThreatClassifier(n_estimators=10, max_depth=3)
+        classifier.train(sample_data, sample_labels)
+
+        assert len(classifier.model.estimators_) == 10
+        assert classifier.model.max_depth == 3
+        assert classifier.model.n_jobs == 1
+
+    def test_train_incremental(self, sample_data, sample_labels):
+        """Test that incremental training adds trees on new data."""
+        classifier = ThreatClassifier(n_estimators=10)
+        classifier.train(sample_data, sample_labels)
+
+        metrics = classifier.train_incremental(
+            sample_data, sample_labels, n_new_trees=5
+        )
 
-    def test_save_load(self, sample_data, sample_labels):
+        assert "accuracy" in metrics
+        assert len(classifier.model.estimators_) == 15
+        assert classifier.model.warm_start is False
+        preds, _ = classifier.predict(sample_data)
+        assert len(preds) == len(sample_data)
+
+    def test_train_incremental_rejects_new_classes(
+        self, sample_data, sample_labels
+    ):
+        """Test that labels outside the known classes are rejected."""
+        classifier = ThreatClassifier(n_estimators=10)
+        classifier.train(sample_data, sample_labels)
+
+        with pytest.raises(ValueError):
+            classifier.train_incremental(
+                sample_data, ["xss", "xss", "sql_injection"]
+            )
+
+    def test_save_load(self, trained_classifier, sample_data, tmp_path):
         """Test model persistence."""
-        with tempfile.NamedTemporaryFile(
-            suffix=".joblib", delete=False
-        ) as tmp:
-            model_path = tmp.name
-
-        try:
-            # Train and save
-            classifier = ThreatClassifier(model_path=model_path)
-            classifier.train(sample_data, sample_labels)
-            classifier.save()
-
-            assert os.path.exists(model_path)
-
-            # Load new instance
-            new_classifier = ThreatClassifier(model_path=model_path)
-            new_classifier.load()
-
-            # Verify it can predict
-            preds, _ = new_classifier.predict(sample_data)
-            assert len(preds) == len(sample_data)
-
-        finally:
-            if os.path.exists(model_path):
-                os.unlink(model_path)
+        model_path = str(tmp_path / "model.joblib")
+        classifier, _ = trained_classifier
+        classifier.save(model_path)
+
+        assert os.path.exists(model_path)
+
+        # Load new instance
+        new_classifier = ThreatClassifier(model_path=model_path)
+        new_classifier.load()
+
+        # Verify it can predict
+        preds, _ = new_classifier.predict(sample_data)
+        assert len(preds) == len(sample_data)
+
+    def test_predict_without_compiled_model(self, sample_data, sample_labels):
+        """Test that scikit-learn serves predictions when not compiled."""
+        classifier = ThreatClassifier()
+        classifier.train(sample_data, sample_labels)
+
+        assert classifier._compiled is None
+        preds, _ = classifier.predict(sample_data)
+        assert preds.tolist() == sample_labels
+
+    def test_compiled_predictions_match(
+        self, sample_data, sample_labels, tmp_path
+    ):
+        """Test that the compiled forest agrees with scikit-learn."""
+        pytest.importorskip("treelite")
+        pytest.importorskip("tl2cgen")
+
+        model_path = str(tmp_path / "model.joblib")
+        classifier = ThreatClassifier(model_path=model_path)
+        classifier.train(sample_data, sample_labels)
+        expected = classifier.predict(sample_data)
+        classifier.save()
+
+        loaded = ThreatClassifier(model_path=model_path)
+        loaded.load()
+        # One predictor per library and process
+        assert loaded._compiled is classifier._compiled
+
+        preds, confs = loaded.predict(sample_data)
+        np.testing.assert_array_equal(preds, expected[0])
+        np.testing.assert_allclose(confs, expected[1], atol=1e-5)
@@ -0,0 +1,128 @@
+# tests/unit/ml/test_predictor.py
+"""
+Unit tests for the ThreatPredictor service.
+"""
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from tenebrinet.core.config import MLConfig
+from tenebrinet.ml.classifier import ThreatClassifier
+from tenebrinet.ml.predictor import WARMUP_ATTACK, ThreatPredictor
+
+
+@pytest.fixture
+def attacks() -> List[Dict[str, Any]]:
+    """Create labelled-by-position attack data."""
+    return [
+        {
+            "service": "http",
+            "timestamp": "2024-12-07T12:00:00Z",
+            "payload": {
+                "method": "GET",
+                "query": "id=1 union select password from users",
+                "user_agent": "sqlmap/1.0",
+            },
+        },
+        {
+            "service": "ssh",
+            "timestamp": "2024-12-07T13:00:00Z",
+            "payload": {"username": "root", "password": "toor"},
+        },
+    ]
+
+
+@pytest.fixture
+def predictor(attacks, tmp_path) -> ThreatPredictor:
+    """Provide a predictor backed by a freshly trained model."""
+    model_path = str(tmp_path / "model.joblib")
+    classifier = ThreatClassifier(model_path=model_path)
+    classifier.train(attacks, ["sql_injection", "credential_attack"])
+    classifier.save()
+    return ThreatPredictor(
+        MLConfig(model_path=model_path, confidence_threshold=0.0)
+    )
+
+
+class TestThreatPredictor:
+    """Tests for ThreatPredictor."""
+
+    async def test_not_ready_without_model(self, tmp_path):
+        """Test that a missing model yields empty predictions."""
+        predictor = ThreatPredictor(
+            MLConfig(model_path=str(tmp_path / "missing.joblib"))
+        )
+        assert predictor.is_ready is False
+        assert await predictor.predict_one({"service": "ssh"}) == (None, 0.0)
+
+    def test_warm_up_on_load(self, predictor, monkeypatch):
+        """Test that loading a model runs one warm-up prediction."""
+        calls = []
+        monkeypatch.setattr(
+            ThreatClassifier,
+            "predict",
+            lambda self, batch: calls.append(batch) or ([], []),
+        )
+        ThreatPredictor(predictor.config)
+        assert calls == [[WARMUP_ATTACK]]
+
+    async def test_failed_warm_up_not_ready(self, predictor, monkeypatch):
+        """Test that a model which cannot predict is not reported ready."""
+        def broken_predict(self, batch):
+            raise AttributeError("'FeatureExtractor' has no 'scaler'")
+
+        monkeypatch.setattr(ThreatClassifier, "predict", broken_predict)
+        loaded = ThreatPredictor(predictor.config)
+        assert loaded.is_ready is False
+        assert await loaded.predict_one({"service": "ssh"}) == (None, 0.0)
+
+    async def test_concurrent_predictions_are_batched(
+        self, predictor, attacks
+    ):
+        """Test that concurrent requests share one classifier call."""
+        calls = []
+        predict = predictor.classifier.predict
+
+        def counting_predict(batch):
+            calls.append(len(batch))
+            return predict(batch)
+
+        predictor.classifier.predict = counting_predict
+        try:
+            results = await asyncio.gather(
+                *(predictor.predict_one(attack) for attack in attacks)
+            )
+        finally:
+            await predictor.close()
+
+        assert calls == [2]
+        assert [label for label, _ in results] == [
+            "sql_injection", "credential_attack"
+        ]
+
+    async def test_repeated_attack_is_cached(self, predictor, attacks):
+        """Test that replays at another time skip the classifier."""
+        calls = []
+        predict = predictor.classifier.predict
+
+        def counting_predict(batch):
+            calls.append(len(batch))
+            return predict(batch)
+
+        predictor.classifier.predict = counting_predict
+        replay = dict(attacks[0], timestamp="2024-12-08T12:30:00Z")
+        try:
+            first = await predictor.predict_one(attacks[0])
+            second = await predictor.predict_one(replay)
+        finally:
+            await predictor.close()
+
+        assert calls == [1]
+        assert second == first
+
+    def test_confidence_threshold(self, predictor, attacks):
+        """Test that low-confidence predictions become unknown."""
+        predictor.config.confidence_threshold = 1.01
+        results = predictor.predict_batch(attacks)
+        assert [label for label, _ in results] == ["unknown", "unknown"]
@@ -0,0 +1,23 @@
+# tests/unit/scripts/test_seed_database.py
+"""
+Unit tests for the sample data seeder.
+"""
+import random
+
+from scripts.seed_database import generate_sample_rows
+from tenebrinet.api.schemas import SessionResponse
+
+
+class TestGenerateSampleRows:
+    """Tests for generate_sample_rows."""
+
+    def test_sessions_match_schema(self):
+        """Test that seeded sessions validate as SessionResponse."""
+        random.seed(0)
+        _, _, session_rows = generate_sample_rows(500)
+
+        assert session_rows
+        for row in session_rows:
+            session = SessionResponse.model_validate(row)
+            assert session.commands
+            assert all(entry.timestamp for entry in session.commands)
@@ -1,12 +1,16 @@
 # tests/unit/services/test_base.py
 import pytest
 import asyncio
-from unittest.mock import AsyncMock
 
 from tenebrinet.services.base import BaseHoneypotService
 
 
 # Concrete implementation for testing the abstract BaseHoneypotService
+def bound_port(service: BaseHoneypotService) -> int:
+    """Return the port a service started with ``port=0`` listens on."""
+    return service.server.sockets[0].getsockname()[1]
+
+
 class MockHoneypotService(BaseHoneypotService):
     async def handle_connection(
         self,
@@ -32,46 +36,40 @@ async def test_base_honeypot_service_initialization():
 
 
 @pytest.mark.asyncio
-async def test_base_honeypot_service_start_stop():
-    """Test the start and stop lifecycle methods of BaseHoneypotService."""
-    service = MockHoneypotService(name="mock_start_stop", port=12346)
+async def test_base_honeypot_service_lifecycle():
+    """Test start, stop and health_check over one listener's lifetime."""
+    service = MockHoneypotService(name="mock_lifecycle", port=0)
+
+    # Before starting
+    status = await service.health_check()
+    assert status["service"] == "mock_lifecycle"
+    assert status["running"] is False
+    assert status["port"] == 0
+    assert status["host"] == "0.0.0.0"
+    assert status["connections"] == 0
 
     # Test start
     await service.start()
     assert service._running is True
     assert service.server is not None
+    status = await service.health_check()
+    assert status["running"] is True
+    assert status["connections"] == 0
+    assert status["listening_sockets"] >= 1
+    assert bound_port(service) > 0
 
     # Test stopping an already running service
     await service.stop()
     assert service._running is False
     # server object might still exist but should be closed
     assert service.server is not None
+    assert (await service.health_check())["running"] is False
 
     # Test stopping an already stopped service
     await service.stop()  # Should log a warning and do nothing
     assert service._running is False
 
 
-@pytest.mark.asyncio
-async def test_base_honeypot_service_health_check():
-    """Test the health_check method."""
-    service = MockHoneypotService(name="mock_health", port=12347)
-
-    # Before starting
-    status = await service.health_check()
-    assert status["service"] == "mock_health"
-    assert status["running"] is False
-    assert status["port"] == 12347
-    assert status["host"] == "0.0.0.0"
-    assert status["connections"] == 0
-
-    await service.start()
-    status = await service.health_check()
-    assert status["running"] is True
-    assert status["connections"] >= 0
-    await service.stop()
-
-
 @pytest.mark.asyncio
 async def test_base_honeypot_service_handle_connection_abstract():
     """Verify that BaseHoneypotService cannot be instantiated directly."""
@@ -82,22 +80,105 @@ async def test_base_honeypot_service_handle_connection_abstract():
         BaseHoneypotService(name="abstract_test", port=12348)
 
 
+class FakeWriter:
+    """Minimal stand-in for asyncio.StreamWriter that records calls."""
+
+    def __init__(self) -> None:
+        self.written = []
+        self.drained = 0
+        self.closed = False
+
+    def write(self, data: bytes) -> None:
+        self.written.append(data)
+
+    async def drain(self) -> None:
+        self.drained += 1
+
+    def close(self) -> None:
+        self.closed = True
+
+    async def wait_closed(self) -> None:
+        pass
+
+    def get_extra_info(self, name: str, default=None):
+        return ("127.0.0.1", 54321)
+
+
 @pytest.mark.asyncio
 async def test_mock_honeypot_service_handle_connection():
     """Test the handle_connection method of the MockHoneypotService."""
     # This test primarily ensures our MockHoneypotService is functional
     # and demonstrates how handle_connection would be called.
+    writer = FakeWriter()
 
-    reader = AsyncMock(spec=asyncio.StreamReader)
-    writer = AsyncMock(spec=asyncio.StreamWriter)
+    service = MockHoneypotService(name="mock_connection_test", port=12349)
+    await service.handle_connection(None, writer)
 
-    # Mock return value for writer.getsockname() for logging
-    writer.get_extra_info.return_value = ('127.0.0.1', 54321)
+    assert writer.written == [b"Mock data"]
+    assert writer.drained == 1
+    assert writer.closed
 
-    service = MockHoneypotService(name="mock_connection_test", port=12349)
-    await service.handle_connection(reader, writer)
 
-    writer.write.assert_called_once_with(b"Mock data")
-    writer.drain.assert_awaited_once()
-    writer.close.assert_called_once()
-    writer.wait_closed.assert_awaited_once()
+class BlockingHoneypotService(BaseHoneypotService):
+    """Service whose handlers block until released."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.inside = 0
+        self.release = asyncio.Event()
+
+    async def handle_connection(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        self.inside += 1
+        try:
+            await self.release.wait()
+        finally:
+            self.inside -= 1
+
+
+@pytest.mark.asyncio
+async def test_max_connections_bounds_handlers():
+    """Test that at most max_connections handlers run at once."""
+    service = BlockingHoneypotService(
+        name="mock_bounded", port=0, host="127.0.0.1", max_connections=1
+    )
+    await service.start()
+    try:
+        clients = [
+            await asyncio.open_connection("127.0.0.1", bound_port(service))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0.05)
+        assert service.inside == 1
+        assert len(service._connections) == 2
+        assert (await service.health_check())["connections"] == 1
+
+        service.release.set()
+        await asyncio.sleep(0.05)
+        assert service.inside == 0
+    finally:
+        await service.stop()
+    for _, writer in clients:
+        writer.close()
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_active_connections():
+    """Test that stop() cancels handlers still serving clients."""
+    service = BlockingHoneypotService(
+        name="mock_cancel", port=0, host="127.0.0.1"
+    )
+    await service.start()
+    _, writer = await asyncio.open_connection(
+        "127.0.0.1", bound_port(service)
+    )
+    await asyncio.sleep(0.05)
+    assert service.inside == 1
+
+    await asyncio.wait_for(service.stop(), timeout=2)
+    assert service.inside == 0
+    assert not service._connections
+    writer.close()
@@ -2,17 +2,30 @@
 """
 Unit tests for FTP Honeypot service.
 """
+import asyncio
+
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy import func, select
 
+from tenebrinet.core.models import Attack, Credential, Session
+from tenebrinet.core.recorder import BatchWriter
 from tenebrinet.services.ftp.server import (
     FTPHoneypot,
     FTPClientHandler,
     FAKE_FILES,
+    FAKE_LISTING_BYTES,
+    FAKE_NLST_BYTES,
+    TRUNCATED_COMMAND,
 )
+from tenebrinet.api.schemas import SessionResponse
 from tenebrinet.core.config import FTPServiceConfig
 
 
+REQUIRED_FILE_KEYS = frozenset({"name", "type", "size"})
+
+
 @pytest.fixture
 def ftp_config():
     """Create a test FTP configuration."""
@@ -31,6 +44,12 @@ def ftp_honeypot(ftp_config):
     return FTPHoneypot(ftp_config)
 
 
+@pytest.fixture
+def handler(ftp_honeypot):
+    """Create a client handler with mocked streams."""
+    return FTPClientHandler(MagicMock(), MagicMock(), ftp_honeypot)
+
+
 class TestFTPHoneypot:
     """Tests for FTPHoneypot class."""
 
@@ -41,12 +60,52 @@ class TestFTPHoneypot:
         assert ftp_honeypot.anonymous == ftp_config.anonymous_allowed
         assert ftp_honeypot._running is False
 
-    def test_health_check_not_running(self, ftp_honeypot):
-        """Test health check when not running."""
-        import asyncio
-        result = asyncio.get_event_loop().run_until_complete(
-            ftp_honeypot.health_check()
+    async def test_rejects_over_max_connections(self, ftp_config):
+        """Test that clients beyond max_connections get a 421."""
+        ftp_config.max_connections = 1
+        honeypot = FTPHoneypot(ftp_config)
+        writer = MagicMock()
+
+        async with honeypot._semaphore:
+            await honeypot._handle_client(MagicMock(), writer)
+
+        writer.write.assert_called_once_with(
+            b"421 Too many connections.\r\n"
+        )
+        writer.close.assert_called_once()
+
+    async def test_stop_records_connected_clients(
+        self, ftp_config, session_factory
+    ):
+        """Test that stop() writes the logins of clients still connected."""
+        ftp_config.port = 0
+        honeypot = FTPHoneypot(ftp_config)
+        honeypot.recorder = BatchWriter(
+            flush_interval=60, session_factory=session_factory
         )
+        await honeypot.start()
+        port = honeypot.server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        await reader.readline()
+        writer.write(b"USER root\r\nPASS toor\r\n")
+        await writer.drain()
+        await reader.readline()
+        await reader.readline()
+
+        await honeypot.stop()
+        writer.close()
+
+        async with session_factory() as session:
+            attack = (await session.scalars(select(Attack))).one()
+            credential = (await session.scalars(select(Credential))).one()
+            ftp_session = (await session.scalars(select(Session))).one()
+        assert attack.ip == "127.0.0.1"
+        assert (credential.username, credential.password) == ("root", "toor")
+        assert ftp_session.attack_id == attack.id
+
+    async def test_health_check_not_running(self, ftp_honeypot):
+        """Test health check when not running."""
+        result = await ftp_honeypot.health_check()
         assert result["service"] == "ftp_honeypot"
         assert result["running"] is False
         assert result["port"] == 2121
@@ -60,86 +119,275 @@ class TestFakeFilesystem:
         assert "/" in FAKE_FILES
         assert len(FAKE_FILES["/"]) > 0
 
-    def test_backup_directory_exists(self):
-        """Test backup directory is defined."""
-        assert "/backup" in FAKE_FILES
-        files = [f["name"] for f in FAKE_FILES["/backup"]]
-        assert "credentials.txt" in files
-        assert "db_backup_2024.sql.gz" in files
-
-    def test_public_html_directory_exists(self):
-        """Test public_html directory is defined."""
-        assert "/public_html" in FAKE_FILES
-        files = [f["name"] for f in FAKE_FILES["/public_html"]]
-        assert "wp-config.php" in files
+    @pytest.mark.parametrize(
+        "path,expected_file",
+        [
+            ("/backup", "credentials.txt"),
+            ("/backup", "db_backup_2024.sql.gz"),
+            ("/public_html", "wp-config.php"),
+        ],
+    )
+    def test_bait_file_exists(self, path, expected_file):
+        """Test bait directories hold their lure files."""
+        assert expected_file in [f["name"] for f in FAKE_FILES[path]]
 
     def test_fake_files_have_required_attributes(self):
         """Test all fake files have required attributes."""
-        for path, files in FAKE_FILES.items():
-            for f in files:
-                assert "name" in f
-                assert "type" in f
-                assert "size" in f
-                assert f["type"] in ("d", "-")
+        bad = [
+            (path, f)
+            for path, files in FAKE_FILES.items()
+            for f in files
+            if not REQUIRED_FILE_KEYS <= f.keys()
+            or f["type"] not in ("d", "-")
+        ]
+        assert not bad, bad[:5]
+
+    def test_precomputed_listings(self, handler):
+        """Test that cached LIST/NLST payloads match the fake tree."""
+        for path in FAKE_FILES:
+            listing = FAKE_LISTING_BYTES[path].decode().split("\r\n")
+            assert listing[:-1] == handler._generate_listing(path)
+
+        assert FAKE_NLST_BYTES["/logs"] == b"access.log\r\nerror.log\r\n"
 
 
 class TestFTPClientHandler:
     """Tests for FTPClientHandler."""
 
-    def test_resolve_path_absolute(self, ftp_honeypot):
+    def test_resolve_path_absolute(self, handler):
         """Test path resolution for absolute paths."""
-        handler = FTPClientHandler(
-            MagicMock(), MagicMock(), ftp_honeypot
-        )
         handler.current_dir = "/"
 
         assert handler._resolve_path("/backup") == "/backup"
         assert handler._resolve_path("/public_html") == "/public_html"
 
-    def test_resolve_path_relative(self, ftp_honeypot):
+    def test_resolve_path_relative(self, handler):
         """Test path resolution for relative paths."""
-        handler = FTPClientHandler(
-            MagicMock(), MagicMock(), ftp_honeypot
-        )
         handler.current_dir = "/"
 
         assert handler._resolve_path("backup") == "/backup"
 
-    def test_resolve_path_parent(self, ftp_honeypot):
+    def test_resolve_path_parent(self, handler):
         """Test path resolution with parent directory."""
-        handler = FTPClientHandler(
-            MagicMock(), MagicMock(), ftp_honeypot
-        )
         handler.current_dir = "/backup"
 
         assert handler._resolve_path("..") == "/"
 
-    def test_generate_listing(self, ftp_honeypot):
+    def test_generate_listing(self, handler):
         """Test directory listing generation."""
-        handler = FTPClientHandler(
-            MagicMock(), MagicMock(), ftp_honeypot
-        )
-
         listing = handler._generate_listing("/")
         assert len(listing) > 0
         assert any("backup" in line for line in listing)
 
-    def test_get_fake_file_content_credentials(self, ftp_honeypot):
+    def test_get_fake_file_content_credentials(self, handler):
         """Test fake content for credentials file."""
-        handler = FTPClientHandler(
-            MagicMock(), MagicMock(), ftp_honeypot
-        )
-
         content = handler._get_fake_file_content("credentials.txt")
         assert "admin" in content
         assert ":" in content
 
-    def test_get_fake_file_content_config(self, ftp_honeypot):
+    def test_get_fake_file_content_config(self, handler):
         """Test fake content for config file."""
-        handler = FTPClientHandler(
-            MagicMock(), MagicMock(), ftp_honeypot
-        )
-
         content = handler._get_fake_file_content("wp-config.php")
         assert "DB_PASSWORD" in content
         assert "<?php" in content
+
+    async def test_logins_recorded_at_close(
+        self, ftp_honeypot, session_factory
+    ):
+        """Test that login attempts are queued together on close."""
+        ftp_honeypot.recorder = BatchWriter(
+            flush_interval=60, session_factory=session_factory
+        )
+        ftp_honeypot.recorder.start()
+        writer = MagicMock()
+        writer.drain = AsyncMock()
+        handler = FTPClientHandler(MagicMock(), writer, ftp_honeypot)
+        handler.client_ip = "10.0.0.1"
+
+        for username, password in (("root", "toor"), ("admin", "admin")):
+            await handler._process_command(f"USER {username}")
+            await handler._process_command(f"PASS {password}")
+
+        async with session_factory() as session:
+            assert await session.scalar(
+                select(func.count()).select_from(Attack)
+            ) == 0
+
+        await handler._close_session()
+        await ftp_honeypot.recorder.stop()
+
+        async with session_factory() as session:
+            attack = (await session.scalars(select(Attack))).one()
+            credentials = (await session.scalars(select(Credential))).all()
+            ftp_session = (await session.scalars(select(Session))).one()
+
+        assert attack.id == handler.attack_id
+        assert attack.ip == "10.0.0.1"
+        assert [(c.username, c.password) for c in credentials] == [
+            ("root", "toor"), ("admin", "admin")
+        ]
+        assert ftp_session.attack_id == attack.id
+        assert len(ftp_session.commands) == 4
+        assert ftp_session.commands[0]["timestamp"].endswith("+00:00")
+
+    async def test_multiline_response_single_write(self, ftp_honeypot):
+        """Test that multiline replies are sent with one write."""
+        writer = MagicMock()
+        writer.drain = AsyncMock()
+        handler = FTPClientHandler(MagicMock(), writer, ftp_honeypot)
+
+        await handler._send_multiline(211, ["Features:", " UTF8", "End"])
+
+        writer.write.assert_called_once_with(
+            b"211-Features:\r\n211- UTF8\r\n211 End\r\n"
+        )
+
+    async def test_static_response(self, ftp_honeypot):
+        """Test that fixed replies are sent from the encoded table."""
+        writer = MagicMock()
+        writer.drain = AsyncMock()
+        handler = FTPClientHandler(MagicMock(), writer, ftp_honeypot)
+
+        await handler._process_command("PWD")
+
+        writer.write.assert_called_once_with(b"530 Please login first.\r\n")
+
+    async def test_stor_drains_upload(self, ftp_honeypot):
+        """Test that STOR reads the uploaded data to the end."""
+        writer = MagicMock()
+        writer.drain = AsyncMock()
+        handler = FTPClientHandler(MagicMock(), writer, ftp_honeypot)
+        handler.authenticated = True
+        data_reader = asyncio.StreamReader()
+        data_reader.feed_data(b"x" * 100000)
+        data_reader.feed_eof()
+        data_writer = MagicMock()
+        handler.data_reader = data_reader
+        handler.data_writer = data_writer
+
+        await handler._cmd_stor("upload.bin")
+
+        assert data_reader.at_eof()
+        data_writer.close.assert_called_once()
+        assert handler.data_writer is None
+        writer.write.assert_called_with(b"226 Transfer complete.\r\n")
+
+    async def test_size_lookup(self, ftp_honeypot):
+        """Test that SIZE answers from the precomputed path map."""
+        writer = MagicMock()
+        writer.drain = AsyncMock()
+        handler = FTPClientHandler(MagicMock(), writer, ftp_honeypot)
+        handler.authenticated = True
+        handler.current_dir = "/backup"
+
+        await handler._cmd_size("credentials.txt")
+        writer.write.assert_called_with(b"213 512\r\n")
+
+        await handler._cmd_size("/backup")
+        writer.write.assert_called_with(b"550 Could not get file size.\r\n")
+
+    async def test_list_waits_for_data_connection(self, ftp_honeypot):
+        """Test that LIST proceeds once the passive connection arrives."""
+        writer = MagicMock()
+        writer.drain = AsyncMock()
+        handler = FTPClientHandler(MagicMock(), writer, ftp_honeypot)
+        handler.authenticated = True
+        handler.passive_server = MagicMock()
+        data_writer = MagicMock()
+        data_writer.drain = AsyncMock()
+
+        asyncio.get_running_loop().call_later(
+            0.01,
+            lambda: asyncio.ensure_future(
+                handler._handle_passive_connection(MagicMock(), data_writer)
+            ),
+        )
+        await handler._cmd_list("")
+
+        data_writer.write.assert_called_once_with(FAKE_LISTING_BYTES["/"])
+        writer.write.assert_called_with(b"226 Directory send OK.\r\n")
+
+    async def test_pasv_reuses_listener(self, ftp_honeypot):
+        """Test that repeated PASV commands share one data listener."""
+        writer = MagicMock()
+        writer.drain = AsyncMock()
+        handler = FTPClientHandler(MagicMock(), writer, ftp_honeypot)
+        handler.authenticated = True
+
+        try:
+            await handler._cmd_pasv("")
+            server = handler.passive_server
+            first = writer.write.call_args
+            await handler._cmd_pasv("")
+        finally:
+            handler.passive_server.close()
+
+        assert handler.passive_server is server
+        assert writer.write.call_args == first
+
+    async def test_command_log_is_capped(self, ftp_honeypot, monkeypatch):
+        """Test that commands past the cap are counted, not stored."""
+        monkeypatch.setattr(
+            "tenebrinet.services.ftp.server.MAX_RECORDED_COMMANDS", 3
+        )
+        writer = MagicMock()
+        writer.drain = AsyncMock()
+        handler = FTPClientHandler(MagicMock(), writer, ftp_honeypot)
+
+        for _ in range(5):
+            await handler._process_command("NOOP")
+
+        assert len(handler.commands) == 3
+        assert handler._dropped_commands == 2
+
+    async def test_capped_session_matches_schema(
+        self, ftp_honeypot, session_factory, monkeypatch
+    ):
+        """Test that a truncated command log is a valid SessionResponse."""
+        monkeypatch.setattr(
+            "tenebrinet.services.ftp.server.MAX_RECORDED_COMMANDS", 3
+        )
+        ftp_honeypot.recorder = BatchWriter(
+            flush_interval=60, session_factory=session_factory
+        )
+        ftp_honeypot.recorder.start()
+        writer = MagicMock()
+        writer.drain = AsyncMock()
+        handler = FTPClientHandler(MagicMock(), writer, ftp_honeypot)
+        handler.client_ip = "10.0.0.1"
+
+        await handler._process_command("USER root")
+        await handler._process_command("PASS toor")
+        for _ in range(3):
+            await handler._process_command("NOOP")
+        await handler._close_session()
+        await ftp_honeypot.recorder.stop()
+
+        async with session_factory() as session:
+            ftp_session = (await session.scalars(select(Session))).one()
+
+        response = SessionResponse.model_validate(ftp_session)
+        assert len(response.commands) == 4
+        assert response.commands[-1].cmd == TRUNCATED_COMMAND
+        assert response.commands[-1].arg == "2"
+
+    async def test_pipelined_commands(self, ftp_honeypot):
+        """Test that several commands in one packet are all answered."""
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"USER anonymous\r\nSYST\r\nNOOP\r\nPW")
+        reader.feed_data(b"D\r\n")
+        reader.feed_eof()
+        writer = MagicMock()
+        writer.drain = AsyncMock()
+        writer.wait_closed = AsyncMock()
+        writer.get_extra_info.return_value = ("10.0.0.1", 40000)
+        handler = FTPClientHandler(reader, writer, ftp_honeypot)
+
+        await handler.handle()
+
+        assert [c["cmd"] for c in handler.commands] == [
+            "USER", "SYST", "NOOP", "PWD"
+        ]
+        assert writer.write.call_args_list[-1].args == (
+            b'257 "/" is the current directory\r\n',
+        )
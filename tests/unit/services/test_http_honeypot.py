@@ -2,12 +2,21 @@
 """
 Unit tests for HTTP Honeypot service.
 """
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
 import pytest
+from aiohttp.test_utils import make_mocked_request
+from sqlalchemy import select
+
+from tenebrinet.core.models import Attack, Credential
+from tenebrinet.core.recorder import BatchWriter
 
 from tenebrinet.services.http.server import (
     HTTPHoneypot,
     ATTACK_PATTERNS,
     SUSPICIOUS_PATHS,
+    WORDPRESS_HEADERS,
 )
 from tenebrinet.core.config import HTTPServiceConfig
 
@@ -29,6 +38,18 @@ def http_honeypot(http_config):
     return HTTPHoneypot(http_config)
 
 
+@pytest.fixture(scope="class")
+def rendered_pages():
+    """Render the fake pages once for the tests that inspect them."""
+    honeypot = HTTPHoneypot(HTTPServiceConfig(fake_cms="WordPress 6.4"))
+    return {
+        "home": honeypot._generate_wordpress_home(),
+        "login": honeypot._generate_wp_login_page(),
+        "login_error": honeypot._generate_wp_login_page(error=True),
+        "404": honeypot._generate_404_page("/nonexistent"),
+    }
+
+
 class TestHTTPHoneypot:
     """Tests for HTTPHoneypot class."""
 
@@ -39,44 +60,41 @@ class TestHTTPHoneypot:
         assert http_honeypot.fake_cms == http_config.fake_cms
         assert http_honeypot._running is False
 
-    def test_health_check_not_running(self, http_honeypot):
+    async def test_health_check_not_running(self, http_honeypot):
         """Test health check when not running."""
-        import asyncio
-        result = asyncio.get_event_loop().run_until_complete(
-            http_honeypot.health_check()
-        )
+        result = await http_honeypot.health_check()
         assert result["service"] == "http_honeypot"
         assert result["running"] is False
         assert result["port"] == 8080
 
-    def test_wordpress_headers(self, http_honeypot):
-        """Test WordPress headers are returned correctly."""
-        headers = http_honeypot._get_wordpress_headers()
+    def test_wordpress_headers(self):
+        """Test WordPress headers are defined correctly."""
+        headers = WORDPRESS_HEADERS
         assert "Server" in headers
         assert "X-Powered-By" in headers
         assert "PHP" in headers["X-Powered-By"]
 
-    def test_generate_wordpress_home(self, http_honeypot):
+    def test_generate_wordpress_home(self, rendered_pages):
         """Test WordPress home page generation."""
-        html = http_honeypot._generate_wordpress_home()
+        html = rendered_pages["home"]
         assert "WordPress" in html or "Company Blog" in html
         assert "<!DOCTYPE html>" in html
 
-    def test_generate_wp_login_page(self, http_honeypot):
+    def test_generate_wp_login_page(self, rendered_pages):
         """Test WordPress login page generation."""
-        html = http_honeypot._generate_wp_login_page()
+        html = rendered_pages["login"]
         assert "wp-login.php" in html
         assert "Username" in html
         assert "Password" in html
 
-    def test_generate_wp_login_with_error(self, http_honeypot):
+    def test_generate_wp_login_with_error(self, rendered_pages):
         """Test WordPress login page with error message."""
-        html = http_honeypot._generate_wp_login_page(error=True)
+        html = rendered_pages["login_error"]
         assert "Error:" in html or "login_error" in html
 
-    def test_generate_404_page(self, http_honeypot):
+    def test_generate_404_page(self, rendered_pages):
         """Test 404 page generation."""
-        html = http_honeypot._generate_404_page("/nonexistent")
+        html = rendered_pages["404"]
         assert "404" in html
         assert "<!DOCTYPE html>" in html
 
@@ -84,23 +102,128 @@ class TestHTTPHoneypot:
 class TestAttackPatterns:
     """Tests for attack pattern detection."""
 
-    def test_sql_injection_patterns_exist(self):
-        """Test SQL injection patterns are defined."""
-        assert "sql_injection" in ATTACK_PATTERNS
-        assert len(ATTACK_PATTERNS["sql_injection"]) > 0
-
-    def test_xss_patterns_exist(self):
-        """Test XSS patterns are defined."""
-        assert "xss" in ATTACK_PATTERNS
-        assert len(ATTACK_PATTERNS["xss"]) > 0
-
-    def test_path_traversal_patterns_exist(self):
-        """Test path traversal patterns are defined."""
-        assert "path_traversal" in ATTACK_PATTERNS
-        assert len(ATTACK_PATTERNS["path_traversal"]) > 0
-
-    def test_suspicious_paths_include_common_targets(self):
-        """Test suspicious paths include common attack targets."""
-        assert "/wp-admin" in SUSPICIOUS_PATHS
-        assert "/.env" in SUSPICIOUS_PATHS
-        assert "/phpmyadmin" in SUSPICIOUS_PATHS
+    @pytest.mark.parametrize(
+        "category", ["sql_injection", "xss", "path_traversal"]
+    )
+    def test_attack_patterns_exist(self, category):
+        """Test each attack category has patterns."""
+        assert ATTACK_PATTERNS[category]
+
+    @pytest.mark.parametrize("path", ["/wp-admin", "/.env", "/phpmyadmin"])
+    def test_suspicious_paths_include_common_targets(self, path):
+        """Test common attack targets are in suspicious paths."""
+        assert path in SUSPICIOUS_PATHS
+
+
+class TestDetectThreat:
+    """Tests for request classification."""
+
+    @pytest.mark.parametrize(
+        "url, user_agent, expected",
+        [
+            ("/?id=1%27%20or%201=1", "", "sql_injection"),
+            ("/search?q=<script>alert(1)</script>", "", "xss"),
+            ("/static/../../etc/passwd", "", "path_traversal"),
+            ("/.env", "", "reconnaissance"),
+            ("/about", "Mozilla/5.0 sqlmap/1.7", "scanner"),
+            ("/ABOUT", "Nikto/2.5", "scanner"),
+            ("/PHPMyAdmin/index", "", "reconnaissance"),
+            ("/?q=UNION%20SELECT", "", "sql_injection"),
+            ("/about", "Mozilla/5.0", "probe"),
+            ("/", "Mozilla/5.0", "probe"),
+            ("/favicon.ico", "masscan/1.3", "scanner"),
+        ],
+    )
+    async def test_classification(
+        self, http_honeypot, url, user_agent, expected
+    ):
+        """Test that requests are classified by the compiled patterns."""
+        request = make_mocked_request(
+            "GET", url, headers={"User-Agent": user_agent}
+        )
+        assert await http_honeypot._detect_threat(request, None) == expected
+
+    async def test_large_body_scanned_in_pool(self, http_honeypot):
+        """Test that large bodies are classified in the scan pool."""
+        http_honeypot._scan_pool = ThreadPoolExecutor(max_workers=1)
+        request = make_mocked_request("POST", "/xmlrpc.php")
+        body = "a" * 10000 + "<script>alert(1)</script>"
+        try:
+            result = await http_honeypot._detect_threat(request, body)
+        finally:
+            http_honeypot._scan_pool.shutdown()
+        assert result == "xss"
+
+
+class TestCachedResponses:
+    """Tests for the pre-rendered response bodies."""
+
+    async def test_home_body_is_prerendered(self, http_honeypot):
+        """Test that the home page is served from the cached body."""
+        response = await http_honeypot._handle_home(
+            make_mocked_request("GET", "/")
+        )
+        assert response.body is http_honeypot._home_body
+        assert response.content_type == "text/html"
+        assert response.charset == "utf-8"
+        assert response.headers["X-Powered-By"] == "PHP/7.4.3"
+
+    async def test_not_found_page(self, http_honeypot):
+        """Test that unmatched paths get the cached 404 page."""
+        response = await http_honeypot._handle_catchall(
+            make_mocked_request("GET", "/missing")
+        )
+        assert response.status == 404
+        assert b"font-family: sans-serif;" in response.body
+        assert b"{{" not in response.body
+
+
+class TestRecording:
+    """Tests for queued attack recording."""
+
+    async def test_credential_linked_to_attack(
+        self, http_honeypot, session_factory
+    ):
+        """Test that a captured login is written with its attack."""
+        http_honeypot.recorder = BatchWriter(
+            flush_interval=60, session_factory=session_factory
+        )
+        http_honeypot.recorder.start()
+
+        http_honeypot._record_credential("10.0.0.1", "admin", "hunter2")
+        await http_honeypot.recorder.stop()
+
+        async with session_factory() as session:
+            attack = (await session.scalars(select(Attack))).one()
+            credential = (await session.scalars(select(Credential))).one()
+
+        assert attack.threat_type == "credential_attack"
+        assert credential.attack_id == attack.id
+        assert credential.password == "hunter2"
+
+    def test_payload_keeps_selected_headers(self, http_honeypot):
+        """Test that only whitelisted headers and a capped body are kept."""
+        http_honeypot.recorder = MagicMock()
+        request = make_mocked_request(
+            "POST",
+            "/xmlrpc.php",
+            headers={"User-Agent": "curl/8.0", "X-Padding": "x" * 100},
+        )
+
+        http_honeypot._record_attack("10.0.0.1", request, "a" * 5000, "probe")
+
+        _, row, _ = http_honeypot.recorder.add.call_args.args
+        assert row["payload"]["headers"] == {"User-Agent": "curl/8.0"}
+        assert len(row["payload"]["body"]) == 1000
+
+    def test_identical_requests_share_key(self, http_honeypot):
+        """Test that repeated requests are keyed for merging."""
+        http_honeypot.recorder = MagicMock()
+        for ip in ("10.0.0.1", "10.0.0.1", "10.0.0.2"):
+            request = make_mocked_request("GET", "/.env?x=1")
+            http_honeypot._record_attack(ip, request, None, "probe")
+
+        keys = [
+            call.args[2] for call in http_honeypot.recorder.add.call_args_list
+        ]
+        assert keys[0] == keys[1] != keys[2]
